@@ -16,6 +16,9 @@ import os
 import logging
 import argparse
 import importlib
+import inspect
+import pkgutil
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 
@@ -27,11 +30,17 @@ sys.path.insert(0, str(PROJECT_ROOT))
 
 # Import backtesting utilities from src
 from src.backtesting.data_cleaner import clean_data, apply_quality_filters
+from src.backtesting.engine import BacktestData
 from src.backtesting.indicators import calculate_indicators
 from src.backtesting.performance import calculate_performance_metrics
 from src.backtesting.plot import plot_backtest_results
 from src.backtesting.transaction_costs import apply_transaction_costs
 from src.backtesting.slippage import slippage_cost
+from src.backtesting.snapshot import DEFAULT_SNAPSHOT_DIR, PriceSnapshot
+from src.backtesting.indicator_cache import DEFAULT_INDICATOR_CACHE_DIR, DEFAULT_MAX_BYTES, IndicatorCache
+from src.backtesting.sweep import job_indicators, run_backtests
+from src.backtesting.universe import Universe
+from src.backtesting import strategies
 
 # Configure logging
 logging.basicConfig(
@@ -57,7 +66,11 @@ def run_backtest(
     rebalance_days: int = 7,
     output_plot: str = "backtest_results.png",
     metrics_filename: str = None,
-    sma: int = None
+    sma: int = None,
+    snapshot: PriceSnapshot = None,
+    refresh_snapshot: bool = True,
+    indicator_cache: IndicatorCache = None,
+    vectorized: bool = False,
 ):
     """
     Run the complete backtesting workflow with a given strategy module.
@@ -68,6 +81,10 @@ def run_backtest(
         rebalance_days: Days between rebalancing
         output_plot: Plot filename (saved in backtesting/)
         metrics_filename: Optional metrics filename (saved in performance/)
+        snapshot: Optional local price snapshot to load instead of querying Postgres
+        refresh_snapshot: Refresh the snapshot incrementally before loading it
+        indicator_cache: Optional disk cache for indicator columns, shared across runs
+        vectorized: Use the matrix backtest, for strategies that support it
     """
     logger.info("=" * 60)
     logger.info("Starting Backtesting Workflow")
@@ -75,26 +92,42 @@ def run_backtest(
     
     # Step 1: Clean data
     logger.info("\n📊 Step 1: Cleaning and filtering data...")
-    df_cleaned = clean_data()
+    df_cleaned = clean_data(snapshot=snapshot, refresh_snapshot=refresh_snapshot)
     if df_cleaned.empty:
         logger.error("No data available after cleaning. Exiting.")
         return None
     
+    if not hasattr(strategy_module, "backtest_strategy"):
+        logger.error(f"Strategy module {strategy_module.__name__} does not have `backtest_strategy` function!")
+        return None
+
+    accepted = inspect.signature(strategy_module.backtest_strategy).parameters
+    if vectorized and "vectorized" not in accepted:
+        logger.error(f"Strategy {strategy_module.__name__} has no vectorized mode")
+        return None
+    params = strategy_params(strategy_module, sma, vectorized)
+
     # Step 2: Calculate indicators
     logger.info("\n📈 Step 2: Calculating technical indicators...")
-    df_with_indicators = calculate_indicators(df_cleaned)
+    columns = None
+    if hasattr(strategy_module, "required_indicators"):
+        columns = strategy_module.required_indicators(**params)
+        logger.info(f"Indicators required by the strategy: {columns}")
+    df_with_indicators = calculate_indicators(df_cleaned, columns=columns, cache=indicator_cache)
     
+    # Point-in-time quality filter for every date, shared with the cache
+    universe_params = {}
+    if "universe" in accepted:
+        universe_params["universe"] = Universe.from_frame(df_cleaned, cache=indicator_cache)
+
     # Step 3: Run strategy-specific backtest
     logger.info(f"\n🎯 Step 3: Running backtest strategy: {strategy_module.__name__}...")
-    if not hasattr(strategy_module, "backtest_strategy"):
-        logger.error(f"Strategy module {strategy_module.__name__} does not have `backtest_strategy` function!")
-        return None
-    
     portfolio_df = strategy_module.backtest_strategy(
         df_with_indicators,
         initial_capital=initial_capital,
         rebalance_days=rebalance_days,
-        sma_period=sma
+        **params,
+        **universe_params
     )
     if portfolio_df.empty:
         logger.error("Backtest produced no results. Exiting.")
@@ -124,44 +157,233 @@ def run_backtest(
         "metrics": metrics
     }
 
+def strategy_params(strategy_module, sma: int = None, vectorized: bool = False) -> dict:
+    """Keyword arguments the CLI options translate to for one strategy's `backtest_strategy`."""
+    params = {}
+    accepted = inspect.signature(strategy_module.backtest_strategy).parameters
+    if sma is not None and "sma_period" in accepted:
+        params["sma_period"] = sma
+    if vectorized and "vectorized" in accepted:
+        params["vectorized"] = True
+    return params
+
+
+def output_stem(strategy_name: str, params: dict) -> str:
+    """
+    Base name of a strategy's metrics and plot files.
+
+    The SMA period is appended only when the strategy takes one, so
+    strategies without it do not get an `--sma` suffix they ignored.
+    """
+    sma = params.get("sma_period")
+    return f"{strategy_name}{sma}" if sma is not None else strategy_name
+
+
+def run_backtest_batch(
+    strategy_modules,
+    initial_capital: float = 10000,
+    rebalance_days: int = 7,
+    sma: int = None,
+    snapshot: PriceSnapshot = None,
+    refresh_snapshot: bool = True,
+    indicator_cache: IndicatorCache = None,
+    vectorized: bool = False,
+    workers: int = None,
+    comparison_filename: str = "comparison.csv",
+):
+    """
+    Run several strategies on one data load.
+
+    Prices are cleaned once, the indicators any of the strategies reads are
+    computed once, and the strategies run concurrently on the shared panel
+    (see `run_backtests`). Each strategy gets the metrics file and plot a
+    single run would write, and one comparison table of all metrics is
+    saved as `comparison_filename` (in performance/metrics/).
+
+    Args:
+        strategy_modules: Strategy modules, each with `backtest_strategy` and `required_indicators`
+        vectorized: Use the matrix backtest for the strategies that support it
+        workers: Worker processes (default: one per core)
+
+    Returns:
+        dict: portfolio_df and metrics per strategy name, plus the `comparison` table
+    """
+    logger.info("=" * 60)
+    logger.info(f"Starting Backtesting Workflow for {len(strategy_modules)} strategies")
+    logger.info("=" * 60)
+
+    # Step 1: Clean data, once
+    logger.info("\n📊 Step 1: Cleaning and filtering data...")
+    df_cleaned = clean_data(snapshot=snapshot, refresh_snapshot=refresh_snapshot)
+    if df_cleaned.empty:
+        logger.error("No data available after cleaning. Exiting.")
+        return None
+
+    jobs = [
+        (module, {"rebalance_days": rebalance_days, **strategy_params(module, sma, vectorized)})
+        for module in strategy_modules
+    ]
+
+    # Step 2: Every indicator any strategy reads, once
+    logger.info("\n📈 Step 2: Calculating technical indicators...")
+    columns = job_indicators(jobs)
+    logger.info(f"Indicators required by the strategies: {columns}")
+    df_with_indicators = calculate_indicators(df_cleaned, columns=columns, cache=indicator_cache)
+    data = BacktestData(
+        df_with_indicators,
+        columns,
+        universe=Universe.from_frame(df_cleaned, cache=indicator_cache),
+    )
+
+    # Step 3: All strategies on the shared panel
+    logger.info("\n🎯 Step 3: Running backtests...")
+    portfolios = run_backtests(data, jobs, initial_capital=initial_capital, workers=workers)
+
+    # Step 4: Per-strategy outputs and the comparison table
+    logger.info("\n📊 Step 4: Calculating performance metrics and plots...")
+    results = {}
+    plot_paths = []
+    for (module, params), portfolio_df in zip(jobs, portfolios):
+        name = module.__name__.rsplit(".", 1)[-1]
+        stem = output_stem(name, params)
+        metrics = calculate_performance_metrics(
+            portfolio_df,
+            initial_capital=initial_capital,
+            filename=(METRICS_DIR / f"{stem}_metrics.json").as_posix(),
+            verbose=False,
+        )
+        results[name] = {"portfolio_df": portfolio_df, "metrics": metrics}
+        plot_paths.append(str(PLOTS_DIR / f"{stem}_plot.png"))
+
+    # Rendering dominates once the data is shared: spread the plots out too
+    plot_workers = max(1, min(workers or os.cpu_count() or 1, len(plot_paths)))
+    if plot_workers == 1:
+        list(map(plot_backtest_results, portfolios, plot_paths))
+    else:
+        with ProcessPoolExecutor(max_workers=plot_workers) as pool:
+            list(pool.map(plot_backtest_results, portfolios, plot_paths))
+
+    comparison = pd.DataFrame({name: result["metrics"] for name, result in results.items()}).T
+    comparison.index.name = "strategy"
+    comparison = comparison.sort_values("sharpe_ratio", ascending=False)
+    comparison.to_csv(METRICS_DIR / comparison_filename)
+
+    logger.info("\n" + comparison.to_string())
+    logger.info("\n✅ Backtesting complete!")
+    logger.info(f"Plots saved to: {PLOTS_DIR}")
+    logger.info(f"Comparison saved to: {METRICS_DIR / comparison_filename}")
+
+    return {**results, "comparison": comparison}
+
+
+def all_strategies():
+    """Every module in src/backtesting/strategies, by name."""
+    return sorted(info.name for info in pkgutil.iter_modules(strategies.__path__))
+
 # ----------------------------------------------------------------------
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
-        description="Run backtesting workflow with a specific strategy"
+        description="Run backtesting workflow with one or more strategies"
     )
     parser.add_argument(
-        "strategy_name",
+        "strategy_names",
         type=str,
-        help="Name of the strategy in src/backtesting/strategies (without .py)"
+        nargs="+",
+        metavar="strategy_name",
+        help="Strategies in src/backtesting/strategies (without .py), or 'all'; "
+             "several share one data load and are compared in one table",
     )
     parser.add_argument("--capital", type=float, default=10000)
     parser.add_argument("--rebalance", type=int, default=7)
     parser.add_argument("--sma", type=int)
+    parser.add_argument(
+        "--snapshot",
+        nargs="?",
+        const=str(DEFAULT_SNAPSHOT_DIR),
+        help="Load prices from a local snapshot (refreshed incrementally) instead of Postgres",
+    )
+    parser.add_argument(
+        "--no-refresh",
+        action="store_true",
+        help="Use the snapshot as is, without checking the database for new rows",
+    )
+    parser.add_argument(
+        "--indicator-cache",
+        nargs="?",
+        const=str(DEFAULT_INDICATOR_CACHE_DIR),
+        help="Reuse indicator columns computed by earlier runs on the same prices",
+    )
+    parser.add_argument(
+        "--indicator-cache-gb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / 1024 ** 3,
+        help="Evict least recently used indicator columns beyond this size",
+    )
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="Run rebalance-and-hold strategies as matrix operations instead of the day loop",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes when running several strategies (default: one per core)",
+    )
 
     args = parser.parse_args()
 
-    # Dynamically import the strategy module
-    try:
-        strategy_module = importlib.import_module(
-            f"src.backtesting.strategies.{args.strategy_name}"
-        )
-    except ModuleNotFoundError:
-        logger.error(
-            f"Strategy '{args.strategy_name}' not found in src/backtesting/strategies/"
+    strategy_names = args.strategy_names
+    if strategy_names == ["all"]:
+        strategy_names = all_strategies()
+
+    # Dynamically import the strategy modules
+    strategy_modules = []
+    for strategy_name in strategy_names:
+        try:
+            strategy_modules.append(importlib.import_module(
+                f"src.backtesting.strategies.{strategy_name}"
+            ))
+        except ModuleNotFoundError:
+            logger.error(
+                f"Strategy '{strategy_name}' not found in src/backtesting/strategies/"
+            )
+            exit(1)
+
+    data_options = dict(
+        snapshot=PriceSnapshot(args.snapshot) if args.snapshot else None,
+        refresh_snapshot=not args.no_refresh,
+        indicator_cache=(
+            IndicatorCache(args.indicator_cache, max_bytes=int(args.indicator_cache_gb * 1024 ** 3))
+            if args.indicator_cache else None
+        ),
+    )
+
+    if len(strategy_modules) > 1:
+        run_backtest_batch(
+            strategy_modules,
+            initial_capital=args.capital,
+            rebalance_days=args.rebalance,
+            sma=args.sma,
+            vectorized=args.vectorized,
+            workers=args.workers,
+            **data_options,
         )
-        exit(1)
+        exit(0)
 
-    # Auto-generate filenames from strategy name
-    metrics_filename = f"{args.strategy_name}{args.sma}_metrics.json"
-    plot_filename = f"{args.strategy_name}{args.sma}_plot.png"
+    # Auto-generate filenames from strategy name and the parameters it takes
+    stem = output_stem(strategy_names[0], strategy_params(strategy_modules[0], args.sma))
+    metrics_filename = f"{stem}_metrics.json"
+    plot_filename = f"{stem}_plot.png"
 
     # Run the backtest
     run_backtest(
-        strategy_module=strategy_module,
+        strategy_module=strategy_modules[0],
         initial_capital=args.capital,
         rebalance_days=args.rebalance,
         output_plot=plot_filename,
         metrics_filename=metrics_filename,
-        sma=args.sma
+        sma=args.sma,
+        vectorized=args.vectorized,
+        **data_options,
     )
 
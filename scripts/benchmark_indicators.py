@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized indicator engine against the per-token loop.
+
+Generates a synthetic universe (random-walk prices, staggered listings) and
+times `calculate_indicators` and `calculate_indicators_legacy` on it,
+checking that both produce identical frames (equal to rounding error with
+--kernel prefix).
+
+Usage:
+    python scripts/benchmark_indicators.py --tokens 1000 10000 --days 365
+    python scripts/benchmark_indicators.py --kernel prefix --sma-family 5 200
+"""
+
+import sys
+import time
+import argparse
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.backtesting.indicators import INDICATOR_COLUMNS, calculate_indicators, calculate_indicators_legacy
+
+
+def synthetic_prices(n_tokens: int, n_days: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2022-01-01", periods=n_days, freq="D", tz="UTC")
+    starts = rng.integers(0, n_days // 2, n_tokens)
+    lengths = n_days - starts
+    codes = np.repeat(np.arange(n_tokens), lengths)
+    day_idx = np.concatenate([np.arange(s, n_days) for s in starts])
+    returns = rng.normal(0, 0.05, len(codes))
+    # Restart the random walk at each token's first row
+    log_price = np.cumsum(returns)
+    first = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    log_price -= np.repeat(log_price[first] - returns[first], lengths)
+    tokens = np.array([f"0x{t:040x}" for t in range(n_tokens)], dtype=object)
+    return pd.DataFrame({
+        "token_address": tokens[codes],
+        "timestamp": dates[day_idx],
+        "value": np.exp(log_price),
+        "market_cap": rng.random(len(codes)) * 1e8,
+        "total_volume": rng.random(len(codes)) * 1e6,
+    })
+
+
+def timed(func, df):
+    started = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument(
+        "--legacy-max-tokens",
+        type=int,
+        default=None,
+        help="Skip the per-token loop above this many tokens (it is quadratic)",
+    )
+    parser.add_argument("--kernel", choices=["rolling", "prefix"], default="rolling")
+    parser.add_argument(
+        "--sma-family",
+        type=int,
+        nargs=2,
+        metavar=("FIRST", "LAST"),
+        help="Only time SMAs FIRST..LAST (no legacy comparison)",
+    )
+    args = parser.parse_args()
+
+    if args.sma_family:
+        first, last = args.sma_family
+        columns = [f"sma_{w}" for w in range(first, last + 1)]
+        print(f"{'tokens':>8} {'rows':>10} {'rolling':>10} {'prefix':>10}")
+        for n_tokens in args.tokens:
+            df = synthetic_prices(n_tokens, args.days)
+            _, t_rolling = timed(partial(calculate_indicators, columns=columns), df)
+            _, t_prefix = timed(partial(calculate_indicators, columns=columns, kernel="prefix"), df)
+            print(f"{n_tokens:>8} {len(df):>10} {t_rolling:>9.2f}s {t_prefix:>9.2f}s")
+        return
+
+    vectorized = partial(calculate_indicators, columns=INDICATOR_COLUMNS, kernel=args.kernel)
+    print(f"{'tokens':>8} {'rows':>10} {'vectorized':>12} {'legacy':>10} {'speedup':>8}")
+    for n_tokens in args.tokens:
+        df = synthetic_prices(n_tokens, args.days)
+        result, t_vec = timed(vectorized, df)
+
+        if args.legacy_max_tokens is not None and n_tokens > args.legacy_max_tokens:
+            print(f"{n_tokens:>8} {len(df):>10} {t_vec:>11.2f}s {'-':>10} {'-':>8}")
+            continue
+
+        expected, t_legacy = timed(calculate_indicators_legacy, df)
+        pd.testing.assert_frame_equal(result, expected, check_exact=args.kernel == "rolling", rtol=1e-7)
+        print(f"{n_tokens:>8} {len(df):>10} {t_vec:>11.2f}s {t_legacy:>9.2f}s {t_legacy / t_vec:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 Data collection script.
 
 Fetches tokens from 1inch API and stores historical prices from Alchemy in the database.
+Prices are written while they are being fetched, so memory stays flat and an
+interrupted run keeps everything stored up to that point.
 """
 import psycopg2
 import logging
@@ -14,12 +16,19 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
-from src.data import DBService, get_available_tokens, fetch_and_store_all_historical_prices
+from src.data import DBService, get_available_tokens
+from src.data.pipeline import run_price_pipeline
 from src.db_config import DB_CONFIG
-from src.sql import CREATE_CONTRACTS_TABLE_SQL, SELECT_COUNT_CONTRACTS
+from src.sql.public import CREATE_CONTRACTS_TABLE_SQL, SELECT_COUNT_CONTRACTS
 
 logger = logging.getLogger(__name__)
 
+# Concurrent Alchemy requests; throughput is capped by the shared rate limiter
+MAX_WORKERS = 4
+# Price rows buffered before each DB flush
+BATCH_SIZE = 5000
+
+
 def main():
     """Main data collection workflow."""
     with psycopg2.connect(**DB_CONFIG) as conn:
@@ -47,24 +56,17 @@ def main():
             len(tokens),
         )
 
-        # Fetch historical prices (no DB work here)
-        logger.info("Fetching historical prices for %s tokens...", len(tokens))
-        prices_by_token = fetch_all_historical_prices(
+        # Fetch historical prices and store them as each window arrives
+        logger.info("Fetching and storing historical prices for %s tokens...", len(tokens))
+        total_prices = run_price_pipeline(
             tokens=tokens,
+            db_service=db_service,
             network="arb-mainnet",
+            max_workers=MAX_WORKERS,
+            batch_size=BATCH_SIZE,
             # start_date=...,  # optional override
             # end_date=...,    # optional override
         )
-        logger.info("Completed fetching historical prices.")
-
-        # Store prices in DB AFTER fetching
-        logger.info("Storing historical prices in DB...")
-        total_prices = 0
-        for token_address, prices in prices_by_token.items():
-            if not prices:
-                continue
-            db_service.store_prices(token_address, prices)
-            total_prices += len(prices)
 
         logger.info("Stored %s total price records.", total_prices)
         logger.info("Completed workflow.")
@@ -72,4 +74,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Parameter sweep script.
+
+Runs one strategy over a grid of parameters, loading prices and computing
+indicators once:
+1. Data cleaning and filtering
+2. Indicator calculation for every column the grid reads
+3. Backtests of every combination on a process pool sharing the panel
+4. One consolidated metrics table (CSV)
+
+Example:
+    python scripts/sweep.py sma_strategy --sma 10 19 50 200 --rebalance 1 7 14
+    python scripts/sweep.py high_volatility --param top_pct=0.05,0.1,0.2 --workers 4
+"""
+
+import sys
+from pathlib import Path
+import ast
+import logging
+import argparse
+import importlib
+
+# ----------------------------------------------------------------------
+# Add project root to sys.path so 'src' imports work from scripts/
+PROJECT_ROOT = Path(__file__).resolve().parent.parent  # scripts/ -> project root
+sys.path.insert(0, str(PROJECT_ROOT))
+# ----------------------------------------------------------------------
+
+from src.backtesting.data_cleaner import clean_data
+from src.backtesting.engine import BacktestData
+from src.backtesting.indicators import calculate_indicators
+from src.backtesting.snapshot import DEFAULT_SNAPSHOT_DIR, PriceSnapshot
+from src.backtesting.indicator_cache import DEFAULT_INDICATOR_CACHE_DIR, DEFAULT_MAX_BYTES, IndicatorCache
+from src.backtesting.sweep import parameter_grid, run_sweep, sweep_indicators
+from src.backtesting.universe import Universe
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+SWEEPS_DIR = PROJECT_ROOT / "src" / "backtesting" / "performance" / "sweeps"
+
+
+def _parse_param(text: str):
+    """NAME=V1,V2,... -> (NAME, [V1, V2, ...]), values as Python literals where possible."""
+    name, sep, values = text.partition("=")
+    if not sep or not name or not values:
+        raise argparse.ArgumentTypeError(f"Expected NAME=V1,V2,..., got '{text}'")
+
+    def literal(value):
+        try:
+            return ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return value
+
+    return name, [literal(v) for v in values.split(",")]
+
+
+# ----------------------------------------------------------------------
+def run_parameter_sweep(
+    strategy_module,
+    axes: dict,
+    initial_capital: float = 10000,
+    workers: int = None,
+    output_csv: Path = None,
+    snapshot: PriceSnapshot = None,
+    refresh_snapshot: bool = True,
+    indicator_cache: IndicatorCache = None,
+):
+    """
+    Backtest `strategy_module` for every combination of `axes`
+    (parameter name -> values) and write the results table to `output_csv`.
+    """
+    grid = parameter_grid(axes)
+    logger.info(f"Sweeping {len(grid)} combinations of {strategy_module.__name__}: {axes}")
+
+    # Step 1: Clean data
+    logger.info("\n📊 Step 1: Cleaning and filtering data...")
+    df_cleaned = clean_data(snapshot=snapshot, refresh_snapshot=refresh_snapshot)
+    if df_cleaned.empty:
+        logger.error("No data available after cleaning. Exiting.")
+        return None
+
+    # Step 2: Every indicator the grid reads, once
+    logger.info("\n📈 Step 2: Calculating technical indicators...")
+    columns = sweep_indicators(strategy_module, grid)
+    logger.info(f"Indicators required by the sweep: {columns}")
+    df_with_indicators = calculate_indicators(df_cleaned, columns=columns, cache=indicator_cache)
+    data = BacktestData(
+        df_with_indicators,
+        columns,
+        universe=Universe.from_frame(df_cleaned, cache=indicator_cache),
+    )
+
+    # Step 3: Fan the combinations out
+    logger.info("\n🎯 Step 3: Running backtests...")
+    results = run_sweep(data, strategy_module, grid, initial_capital=initial_capital, workers=workers)
+
+    # Step 4: Consolidated table
+    if output_csv:
+        output_csv.parent.mkdir(parents=True, exist_ok=True)
+        results.to_csv(output_csv, index=False)
+        logger.info(f"Results saved to: {output_csv}")
+
+    best = results.sort_values("sharpe_ratio", ascending=False).head(10)
+    logger.info("\nTop combinations by Sharpe ratio:\n" + best.to_string(index=False))
+    return results
+
+
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backtest a strategy over a grid of parameters"
+    )
+    parser.add_argument(
+        "strategy_name",
+        type=str,
+        help="Name of the strategy in src/backtesting/strategies (without .py)"
+    )
+    parser.add_argument("--capital", type=float, default=10000)
+    parser.add_argument("--rebalance", type=int, nargs="+", default=[7])
+    parser.add_argument("--sma", type=int, nargs="+", help="SMA periods (sma_period) to sweep")
+    parser.add_argument(
+        "--param",
+        type=_parse_param,
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2,...",
+        help="Any other backtest_strategy parameter to sweep, e.g. top_pct=0.05,0.1",
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--output", type=Path, help="Results CSV (default: performance/sweeps/<strategy>_sweep.csv)")
+    parser.add_argument(
+        "--snapshot",
+        nargs="?",
+        const=str(DEFAULT_SNAPSHOT_DIR),
+        help="Load prices from a local snapshot (refreshed incrementally) instead of Postgres",
+    )
+    parser.add_argument(
+        "--no-refresh",
+        action="store_true",
+        help="Use the snapshot as is, without checking the database for new rows",
+    )
+    parser.add_argument(
+        "--indicator-cache",
+        nargs="?",
+        const=str(DEFAULT_INDICATOR_CACHE_DIR),
+        help="Reuse indicator columns computed by earlier runs on the same prices",
+    )
+    parser.add_argument(
+        "--indicator-cache-gb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / 1024 ** 3,
+        help="Evict least recently used indicator columns beyond this size",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        strategy_module = importlib.import_module(
+            f"src.backtesting.strategies.{args.strategy_name}"
+        )
+    except ModuleNotFoundError:
+        logger.error(
+            f"Strategy '{args.strategy_name}' not found in src/backtesting/strategies/"
+        )
+        exit(1)
+
+    axes = {"rebalance_days": args.rebalance}
+    if args.sma:
+        axes["sma_period"] = args.sma
+    axes.update(args.param)
+
+    run_parameter_sweep(
+        strategy_module=strategy_module,
+        axes=axes,
+        initial_capital=args.capital,
+        workers=args.workers,
+        output_csv=args.output or SWEEPS_DIR / f"{args.strategy_name}_sweep.csv",
+        snapshot=PriceSnapshot(args.snapshot) if args.snapshot else None,
+        refresh_snapshot=not args.no_refresh,
+        indicator_cache=(
+            IndicatorCache(args.indicator_cache, max_bytes=int(args.indicator_cache_gb * 1024 ** 3))
+            if args.indicator_cache else None
+        ),
+    )
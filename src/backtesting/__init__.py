@@ -2,9 +2,15 @@
 
 from .data_cleaner import clean_data, apply_quality_filters
 from .indicators import calculate_indicators, calculate_rsi
+from .indicator_cache import IndicatorCache
 from .performance import calculate_performance_metrics
 from .plot import plot_backtest_results
+from .panel import PricePanel
+from .engine import BacktestData, Day, equal_weights, run_backtest_engine, run_vectorized_backtest
+from .snapshot import PriceSnapshot
 from .stablecoins import ARBITRUM_STABLECOINS
+from .sweep import SharedBacktestData, parameter_grid, run_backtests, run_sweep
+from .universe import Universe
 
 __all__ = [
     'run_backtest',
@@ -16,4 +22,17 @@ __all__ = [
     'calculate_performance_metrics',
     'plot_backtest_results',
     'ARBITRUM_STABLECOINS',
+    'PriceSnapshot',
+    'PricePanel',
+    'IndicatorCache',
+    'Universe',
+    'BacktestData',
+    'Day',
+    'run_backtest_engine',
+    'equal_weights',
+    'run_vectorized_backtest',
+    'SharedBacktestData',
+    'parameter_grid',
+    'run_backtests',
+    'run_sweep',
 ]
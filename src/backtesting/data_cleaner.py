@@ -5,28 +5,73 @@ from src.data.db import DBService
 from src.db_config import DB_CONFIG
 from src.backtesting.stablecoins import ARBITRUM_STABLECOINS
 
-def clean_data():
-    with psycopg2.connect(**DB_CONFIG) as conn:
-        db_service = DBService(conn)
-        df = db_service.get_prices()
+PRICE_COLUMNS = ['token_address', 'value', 'timestamp', 'market_cap', 'total_volume']
 
-        # Remove stablecoins
-        stablecoin_addresses = list(ARBITRUM_STABLECOINS.keys())
-        df = df[~df['token_address'].isin(stablecoin_addresses)]
+# Quality filter rules (see apply_quality_filters and universe.Universe)
+MIN_HISTORY_DAYS = 90
+MIN_MARKET_CAP = 5_000_000
+RECENT_DAYS = 30
+MAX_ZERO_VOLUME_SHARE = 0.1
+MAX_ABS_RETURN = 2.0
 
-        print(f"Tokens after stablecoin removal: {df['token_address'].nunique()}")
 
-        # Basic sanity cleanup only
-        df = df.dropna(subset=['value', 'market_cap'])
-        df = df[df['value'] > 0]
+def _utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts
 
-        return df
+
+def clean_data(start=None, end=None, tokens=None, snapshot=None, refresh_snapshot=True):
+    """
+    Load non-stablecoin prices for backtesting.
+
+    Column projection, the optional date range / token list and the
+    stablecoin exclusion are applied in SQL by `DBService.read_prices`.
+    With a `PriceSnapshot`, prices are loaded from the local snapshot instead
+    (after an incremental refresh unless `refresh_snapshot` is False) and the
+    same filters are applied in memory.
+    """
+    stablecoin_addresses = list(ARBITRUM_STABLECOINS.keys())
+
+    if snapshot is not None:
+        if refresh_snapshot:
+            with psycopg2.connect(**DB_CONFIG) as conn:
+                snapshot.refresh(DBService(conn))
+        df = snapshot.load()
+
+        mask = ~df['token_address'].isin(stablecoin_addresses)
+        if start is not None:
+            mask &= df['timestamp'] >= _utc(start)
+        if end is not None:
+            mask &= df['timestamp'] <= _utc(end)
+        if tokens is not None:
+            mask &= df['token_address'].isin(list(tokens))
+        df = df[mask]
+    else:
+        with psycopg2.connect(**DB_CONFIG) as conn:
+            db_service = DBService(conn)
+            df = db_service.read_prices(
+                columns=PRICE_COLUMNS,
+                start=start,
+                end=end,
+                tokens=tokens,
+                exclude_tokens=stablecoin_addresses,
+            )
+
+    print(f"Tokens after stablecoin removal: {df['token_address'].nunique()}")
+
+    # Basic sanity cleanup only
+    df = df.dropna(subset=['value', 'market_cap'])
+    df = df[df['value'] > 0]
+
+    return df
 
 
 def apply_quality_filters(df, current_date):
     """
     Time-safe universe selection.
     Uses only information available up to current_date.
+
+    `universe.Universe` precomputes the same decision for every date at once.
     """
     eligible_tokens = []
 
@@ -35,22 +80,22 @@ def apply_quality_filters(df, current_date):
             .sort_values('timestamp')
 
         # Token must exist by now
-        if len(token_data) < 90:
+        if len(token_data) < MIN_HISTORY_DAYS:
             continue
 
         # Latest market cap (NO future averaging)
         latest_mcap = token_data['market_cap'].iloc[-1]
-        if latest_mcap < 5_000_000:
+        if latest_mcap < MIN_MARKET_CAP:
             continue
 
         # Liquidity filter (recent)
-        recent_volume = token_data['total_volume'].tail(30)
-        if (recent_volume == 0).mean() > 0.1:
+        recent_volume = token_data['total_volume'].tail(RECENT_DAYS)
+        if (recent_volume == 0).mean() > MAX_ZERO_VOLUME_SHARE:
             continue
 
         # Recent volatility filter (NO future max)
-        recent_returns = token_data['value'].pct_change().tail(30)
-        if recent_returns.abs().max() > 2.0:
+        recent_returns = token_data['value'].pct_change().tail(RECENT_DAYS)
+        if recent_returns.abs().max() > MAX_ABS_RETURN:
             continue
 
         eligible_tokens.append(token_addr)
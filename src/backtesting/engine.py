@@ -0,0 +1,307 @@
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.backtesting.panel import PricePanel
+from src.backtesting.slippage import slippage_cost
+from src.backtesting.transaction_costs import apply_transaction_costs
+from src.backtesting.universe import Universe
+
+# Positions down more than this from their entry price are closed
+STOP_LOSS = -0.08
+STOP_LOSS_POOL_LIQUIDITY = 100_000_000
+
+
+class BacktestData:
+    """
+    Dates x tokens arrays a backtest runs on, built once from the
+    indicator frame.
+
+    `panel` holds value and the indicator columns strategies read;
+    `row_order[d, t]` is the position of (date, token) in the source frame,
+    which fixes the order tokens are bought in, and therefore the order
+    position returns are summed in, exactly as a scan of the frame would.
+    """
+
+    def __init__(self, df: pd.DataFrame, fields: Iterable[str] = (), universe: Optional[Universe] = None):
+        fields = list(dict.fromkeys(['value', *fields]))
+        missing = [f for f in fields if f not in df.columns]
+        if missing:
+            raise ValueError(f"Required columns {missing} not found in dataframe")
+
+        self.panel = PricePanel.from_frame(df, fields=fields)
+        self.dates = self.panel.dates
+        self.value = self.panel.value
+        self.valid = self.panel.valid
+
+        self.row_order = np.full(self.panel.shape, -1, dtype=np.int64)
+        self.row_order[self.dates.get_indexer(df['timestamp']), self.panel.tokens.get_indexer(df['token_address'])] = \
+            np.arange(len(df))
+
+        self._df = df
+        self._universe = universe
+        self._universe_tokens = None
+
+    @classmethod
+    def from_parts(cls, panel: PricePanel, row_order: np.ndarray, universe: Universe) -> "BacktestData":
+        """Reassemble data built elsewhere (e.g. attached from shared memory), without the source frame."""
+        data = cls.__new__(cls)
+        data.panel = panel
+        data.dates = panel.dates
+        data.value = panel.value
+        data.valid = panel.valid
+        data.row_order = row_order
+        data._df = None
+        data._universe = universe
+        data._universe_tokens = None
+        return data
+
+    @property
+    def universe(self) -> Universe:
+        # Built on first use: strategies without quality filters never need it
+        if self._universe is None:
+            self._universe = Universe.from_frame(self._df)
+        return self._universe
+
+    def eligible(self, i: int) -> np.ndarray:
+        """Tokens passing the quality filters on date `i`."""
+        if self._universe_tokens is None:
+            self._universe_tokens = self.universe.tokens.get_indexer(self.panel.tokens)
+        row = self.universe.row(self.dates[i])
+        return np.where(self._universe_tokens >= 0, row[self._universe_tokens], False)
+
+
+class Day:
+    """What a signal function sees on one date: rows of every panel field."""
+
+    def __init__(self, data: BacktestData, i: int):
+        self.data = data
+        self.index = i
+        self.date = data.dates[i]
+
+    def field(self, name: str) -> np.ndarray:
+        return self.data.panel.fields[name][self.index]
+
+    @property
+    def listed(self) -> np.ndarray:
+        """Tokens with a row today."""
+        return self.data.valid[self.index]
+
+    @property
+    def eligible(self) -> np.ndarray:
+        return self.data.eligible(self.index)
+
+    def rows(self, *fields: str, eligible: bool = True) -> np.ndarray:
+        """
+        Tokens with a row today and no NaN in `fields` (value included),
+        restricted to the eligible universe unless `eligible` is False.
+        """
+        mask = self.listed.copy()
+        if eligible:
+            mask &= self.eligible
+        for name in ('value', *fields):
+            mask &= ~np.isnan(self.field(name))
+        return mask
+
+    def in_row_order(self, mask: np.ndarray) -> np.ndarray:
+        """Token indexes where `mask` is set, in source-frame order."""
+        tokens = np.flatnonzero(mask)
+        return tokens[np.argsort(self.data.row_order[self.index, tokens], kind='stable')]
+
+    def nsmallest(self, n: int, field: str, mask: np.ndarray) -> np.ndarray:
+        """The `n` masked tokens with the smallest `field`, ties in frame order (DataFrame.nsmallest)."""
+        tokens = self.in_row_order(mask)
+        return tokens[np.argsort(self.field(field)[tokens], kind='stable')[:n]]
+
+    def nlargest(self, n: int, field: str, mask: np.ndarray) -> np.ndarray:
+        """The `n` masked tokens with the largest `field`, ties in frame order (DataFrame.nlargest)."""
+        tokens = self.in_row_order(mask)
+        return tokens[np.argsort(-self.field(field)[tokens], kind='stable')[:n]]
+
+
+def _stop_loss_penalty(allocation):
+    slippage = slippage_cost(allocation, pool_liquidity=STOP_LOSS_POOL_LIQUIDITY)
+    tx_cost = apply_transaction_costs(allocation) / allocation
+    return slippage + tx_cost
+
+
+def run_backtest_engine(
+    data: BacktestData,
+    select: Callable[[Day], np.ndarray],
+    initial_capital: float = 10000,
+    rebalance_days: int = 7,
+    exit_signal: Optional[Callable[[Day], np.ndarray]] = None,
+    vectorized: bool = False,
+) -> pd.DataFrame:
+    """
+    Run the shared day loop for one strategy.
+
+    Every `rebalance_days` dates, `select(day)` returns the token indexes to
+    hold; the capital is split equally between them, with transaction costs
+    folded into each entry price. Each day, held positions earn their
+    price change weighted by allocation / capital, positions more than 8%
+    under their entry price are stopped out (paying slippage and
+    transaction costs), and tokens flagged by the optional
+    `exit_signal(day)` mask are closed.
+
+    Positions are parallel arrays of token index, entry price and
+    allocation, and prices are array lookups, so a day costs O(held
+    positions) on top of the vectorized `select` calls. With `vectorized`,
+    rebalance-and-hold strategies (no `exit_signal`) run through
+    `run_vectorized_backtest` instead.
+
+    Returns:
+        pd.DataFrame: date, portfolio_value and n_tokens per date
+    """
+    if vectorized:
+        if exit_signal is not None:
+            raise ValueError("The vectorized backtest does not support exit signals")
+        weights = equal_weights(data, select, rebalance_days)
+        return run_vectorized_backtest(data, weights, initial_capital=initial_capital, rebalance_days=rebalance_days)
+
+    value, valid = data.value, data.valid
+    capital = initial_capital
+    held = np.zeros(0, dtype=np.int64)
+    entry_price = np.zeros(0)
+    allocation = np.zeros(0)
+    portfolio_history = []
+
+    last_rebalance_idx = -rebalance_days
+
+    for i, current_date in enumerate(data.dates):
+        day = Day(data, i)
+
+        if i - last_rebalance_idx >= rebalance_days:
+            held = np.asarray(select(day), dtype=np.int64)
+            if len(held):
+                position_allocation = capital / len(held)
+                entry_cost = 1 + apply_transaction_costs(position_allocation) / position_allocation
+                entry_price = value[i, held] * entry_cost
+                allocation = np.full(len(held), position_allocation)
+            last_rebalance_idx = i
+
+        daily_return = 0.0
+        exits = np.zeros(len(held), dtype=bool)
+
+        if i > 0:
+            for k, token in enumerate(held):
+                if not (valid[i, token] and valid[i - 1, token]):
+                    continue
+                today_price = value[i, token]
+                yesterday_price = value[i - 1, token]
+
+                pnl = (today_price - entry_price[k]) / entry_price[k]
+                weight = allocation[k] / capital
+
+                daily_return += ((today_price - yesterday_price) / yesterday_price) * weight
+                if pnl < STOP_LOSS:
+                    daily_return -= _stop_loss_penalty(allocation[k])
+                    exits[k] = True
+
+        if exit_signal is not None and len(held):
+            exits |= valid[i, held] & exit_signal(day)[held]
+
+        if exits.any():
+            keep = ~exits
+            held, entry_price, allocation = held[keep], entry_price[keep], allocation[keep]
+
+        capital *= (1 + daily_return)
+
+        portfolio_history.append(
+            {"date": current_date, "portfolio_value": capital, "n_tokens": len(held)}
+        )
+
+    return pd.DataFrame(portfolio_history)
+
+
+def equal_weights(data: BacktestData, select: Callable[[Day], np.ndarray], rebalance_days: int = 7) -> np.ndarray:
+    """
+    Dates x tokens target weights: 1 / n on the tokens `select` picks on each
+    rebalance date, NaN on the dates in between (hold).
+    """
+    weights = np.full(data.panel.shape, np.nan)
+    for i in range(0, len(data.dates), rebalance_days):
+        weights[i] = 0.0
+        tokens = np.asarray(select(Day(data, i)), dtype=np.int64)
+        if len(tokens):
+            weights[i, tokens] = 1 / len(tokens)
+    return weights
+
+
+def run_vectorized_backtest(
+    data: BacktestData,
+    weights: np.ndarray,
+    initial_capital: float = 10000,
+    rebalance_days: int = 7,
+) -> pd.DataFrame:
+    """
+    Rebalance-and-hold backtest on a dates x tokens target-weight matrix.
+
+    Same rules as `run_backtest_engine` without an exit signal: on every
+    `rebalance_days`-th date the capital is allocated by the weights row
+    (held until the next rebalance), positions earn allocation-weighted
+    price changes on days with a price today and yesterday, and are stopped
+    out below -8% from entry. Within a rebalance period everything is
+    matrix algebra: stop-loss exits come from a cumulative mask over the
+    period's pnl matrix, and capital follows the linear recurrence
+    C[d] = C[d-1] * (1 - stop penalties[d]) + allocations . returns[d],
+    solved with cumulative products. Only the loop over rebalance periods is
+    sequential (entry costs depend on the capital at each rebalance).
+
+    Results agree with the loop engine to rounding error (sums are taken in
+    a different order).
+
+    Returns:
+        pd.DataFrame: date, portfolio_value and n_tokens per date
+    """
+    value, valid = data.value, data.valid
+    n_dates = len(data.dates)
+    portfolio_value = np.empty(n_dates)
+    n_tokens = np.zeros(n_dates, dtype=np.int64)
+    capital = float(initial_capital)
+
+    for start in range(0, n_dates, rebalance_days):
+        end = min(start + rebalance_days, n_dates)
+        row = np.nan_to_num(weights[start])
+        held = np.flatnonzero(row > 0)
+        if not len(held):
+            portfolio_value[start:end] = capital
+            continue
+
+        w = row[held]
+        allocation = capital * w
+        entry_price = value[start, held] * (1 + apply_transaction_costs(allocation) / allocation)
+        # Equal weights: one scalar penalty per period, not one per position
+        levels, level = np.unique(allocation, return_inverse=True)
+        penalty = np.array([_stop_loss_penalty(a) for a in levels])[level]
+
+        # Day d of the period against day d - 1; the first date has no yesterday
+        first = max(start, 1)
+        today = value[first:end][:, held]
+        yesterday = value[first - 1:end - 1][:, held]
+        counted = valid[first:end][:, held] & valid[first - 1:end - 1][:, held]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = np.where(counted, (today - yesterday) / yesterday, 0.0)
+            stop = counted & ((today - entry_price) / entry_price < STOP_LOSS)
+        stopped_before = (np.cumsum(stop, axis=0) - stop) > 0
+        returns[stopped_before] = 0.0
+        stop &= ~stopped_before
+
+        growth = returns @ w
+        decay = 1 - stop @ penalty
+        cumulative_decay = np.cumprod(decay)
+        path = cumulative_decay * (1 + np.cumsum(growth / cumulative_decay))
+
+        portfolio_value[start:first] = capital  # only when start == 0: no returns on day 0
+        portfolio_value[first:end] = capital * path
+        n_tokens[start:end] = len(held)
+        n_tokens[first:end] -= np.cumsum(stop.sum(axis=1))
+        capital = portfolio_value[end - 1]
+
+    return pd.DataFrame({
+        "date": data.dates,
+        "portfolio_value": portfolio_value,
+        "n_tokens": n_tokens,
+    })
@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDICATOR_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "indicator_cache"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+class IndicatorCache:
+    """
+    Disk cache of computed indicator columns.
+
+    Each column is stored as a .npy file under
+    `{directory}/{data fingerprint}/{spec}/{column}.npy`, where the
+    fingerprint identifies the input prices (see `fingerprint`) and `spec`
+    the indicator definitions (kernel and definitions version), and the
+    column name carries its own parameters (sma_19). Reads refresh a file's
+    mtime; `evict` deletes least recently used files until the cache fits in
+    `max_bytes`.
+    """
+
+    def __init__(self, directory=DEFAULT_INDICATOR_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def fingerprint(frame: pd.DataFrame) -> str:
+        """SHA-256 over the price rows (tokens, timestamps and numeric columns), in frame order."""
+        digest = hashlib.sha256()
+        codes, tokens = pd.factorize(frame["token_address"])
+        digest.update("\n".join(map(str, tokens)).encode())
+        digest.update(codes.astype(np.int64).tobytes())
+        digest.update(pd.DatetimeIndex(frame["timestamp"]).as_unit("ns").asi8.tobytes())
+        for column in ("value", "market_cap", "total_volume"):
+            digest.update(frame[column].to_numpy(dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def _path(self, fingerprint: str, spec: str, column: str) -> Path:
+        return self.directory / fingerprint[:32] / spec / f"{column}.npy"
+
+    def get(self, fingerprint: str, spec: str, column: str) -> Optional[np.ndarray]:
+        path = self._path(fingerprint, spec, column)
+        try:
+            array = np.load(path)
+            os.utime(path)
+        except (FileNotFoundError, ValueError, EOFError):
+            # Missing, evicted meanwhile or truncated: recompute
+            return None
+        return array
+
+    def put(self, fingerprint: str, spec: str, column: str, array: np.ndarray):
+        path = self._path(fingerprint, spec, column)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{column}-", suffix=".npy")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.glob("*/*/*.npy"))
+
+    def evict(self) -> int:
+        """
+        Delete least recently used columns until the cache fits in `max_bytes`.
+
+        Returns:
+            int: Number of bytes freed
+        """
+        entries = []
+        for path in self.directory.glob("*/*/*.npy"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            freed += size
+            for parent in (path.parent, path.parent.parent):
+                try:
+                    parent.rmdir()
+                except OSError:
+                    break
+        if freed:
+            logger.info("Evicted %d bytes from indicator cache %s", freed, self.directory)
+        return freed
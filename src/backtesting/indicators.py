@@ -1,9 +1,279 @@
+import re
+from typing import Callable, Dict, NamedTuple, Tuple
+
 import pandas as pd
 import numpy as np
+from pandas.api.indexers import BaseIndexer
+
+from src.backtesting.window_sums import WindowSums
+
+SMA_WINDOWS = list(range(5, 31)) + [50, 200]
+
+KERNELS = ('rolling', 'prefix')
+
+# Bump when an indicator definition changes, so cached columns are recomputed
+INDICATORS_VERSION = 1
 
-def calculate_indicators(df):
+INDICATOR_COLUMNS = (
+    ['returns']
+    + [f'sma_{i}' for i in SMA_WINDOWS]
+    + ['bb_middle', 'bb_std', 'bb_upper', 'bb_lower', 'bb_position', 'rsi',
+       'momentum_7d', 'momentum_30d', 'volume_sma_20', 'volume_ratio',
+       'volatility_30d', 'sma_crossover', 'mom_vol_ratio']
+)
+
+
+class _TokenWindowIndexer(BaseIndexer):
+    """
+    Trailing windows of `window_size` rows over token-contiguous data that
+    never reach back into the previous token (`token_start` holds the first
+    row of each row's token).
+    """
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        start = np.maximum(end - self.window_size, self.token_start).astype(np.int64)
+        return start, end
+
+
+class IndicatorContext:
+    """
+    Token-contiguous price data plus the indicators computed on it so far.
+
+    Rows are laid out token by token (tokens in order of first appearance,
+    each sorted by timestamp). Rolling windows and shifts are clipped at token
+    boundaries, which makes pandas restart its running sums there exactly as
+    it does for a single token. Indicators are computed on first use and
+    cached, so shared intermediates are computed once.
+
+    With kernel='prefix', window means and stds come from one set of prefix
+    sums per input series (`WindowSums`) instead of a rolling pass per
+    window. Results then agree with the rolling kernel to floating-point
+    rounding rather than bit for bit.
+    """
+
+    def __init__(self, df, kernel='rolling'):
+        if kernel not in KERNELS:
+            raise ValueError(f"Unknown indicator kernel '{kernel}', expected one of {KERNELS}")
+        self.kernel = kernel
+        codes, tokens = pd.factorize(df['token_address'])
+        time_rank = pd.factorize(df['timestamp'], sort=True)[0]
+        order = np.lexsort((time_rank, codes))
+        self.frame = df.iloc[order].reset_index(drop=True)
+
+        counts = np.bincount(codes, minlength=len(tokens))
+        self.token_start = np.repeat(np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+        self.obs = np.arange(len(self.frame)) - self.token_start  # position within the token
+        self._cache = {
+            'value': self.frame['value'].astype(np.float64),
+            'total_volume': self.frame['total_volume'].astype(np.float64),
+        }
+        self._window_sums = {}
+
+    def __getitem__(self, name):
+        if name not in self._cache:
+            indicator = _resolve(name)
+            self._cache[name] = indicator.compute(self, *(self[i] for i in indicator.inputs))
+        return self._cache[name]
+
+    def preload(self, name, values):
+        """Use precomputed `values` (in frame order) for indicator `name`."""
+        self._cache[name] = pd.Series(values, index=self.frame.index)
+
+    def rolling(self, series, window):
+        indexer = _TokenWindowIndexer(window_size=window, token_start=self.token_start)
+        return series.rolling(indexer, min_periods=window)
+
+    def _sums(self, series):
+        # Keyed by identity; the series is kept alongside so the id stays unique
+        if id(series) not in self._window_sums:
+            self._window_sums[id(series)] = (series, WindowSums(series.to_numpy(), self.token_start))
+        return self._window_sums[id(series)][1]
+
+    def window_mean(self, series, window):
+        if self.kernel == 'prefix':
+            return pd.Series(self._sums(series).mean(window), index=series.index)
+        return self.rolling(series, window).mean()
+
+    def window_std(self, series, window):
+        if self.kernel == 'prefix':
+            return pd.Series(self._sums(series).std(window), index=series.index)
+        return self.rolling(series, window).std()
+
+    def shift(self, series, periods):
+        shifted = np.full(len(series), np.nan)
+        rows = np.flatnonzero(self.obs >= periods)
+        shifted[rows] = series.to_numpy()[rows - periods]
+        return pd.Series(shifted, index=series.index)
+
+    def pct_change(self, series, periods=1):
+        return series / self.shift(series, periods) - 1
+
+
+class Indicator(NamedTuple):
+    inputs: Tuple[str, ...]
+    compute: Callable
+
+
+# name -> Indicator; inputs are other indicators or the base columns value / total_volume
+INDICATORS: Dict[str, Indicator] = {}
+
+_SMA_PATTERN = re.compile(r'^sma_(\d+)$')
+
+
+def register_indicator(name, inputs=()):
+    """Register `func(ctx, *input_series)` as the indicator `name`."""
+    def decorator(func):
+        INDICATORS[name] = Indicator(tuple(inputs), func)
+        return func
+    return decorator
+
+
+def _resolve(name):
+    if name in INDICATORS:
+        return INDICATORS[name]
+    match = _SMA_PATTERN.match(name)
+    if match:
+        # Any SMA window, e.g. sma_45 for a strategy's sma_period
+        window = int(match.group(1))
+        return Indicator(('value',), lambda ctx, value: ctx.window_mean(value, window))
+    raise KeyError(f"Unknown indicator '{name}'")
+
+
+def indicator_closure(columns):
+    """Return `columns` and everything they depend on, dependencies first."""
+    ordered = []
+
+    def visit(name, path):
+        if name in ordered or name in ('value', 'total_volume'):
+            return
+        if name in path:
+            raise ValueError(f"Circular indicator dependency: {' -> '.join(path + [name])}")
+        for dependency in _resolve(name).inputs:
+            visit(dependency, path + [name])
+        ordered.append(name)
+
+    for name in columns:
+        visit(name, [])
+    return ordered
+
+
+# Returns
+register_indicator('returns', ['value'])(lambda ctx, value: ctx.pct_change(value))
+
+# Moving averages for trend
+for _window in SMA_WINDOWS:
+    register_indicator(f'sma_{_window}', ['value'])(
+        lambda ctx, value, window=_window: ctx.window_mean(value, window)
+    )
+
+# Bollinger Bands for mean reversion (the middle band is the 20-day SMA)
+register_indicator('bb_middle', ['sma_20'])(lambda ctx, sma_20: sma_20)
+register_indicator('bb_std', ['value'])(lambda ctx, value: ctx.window_std(value, 20))
+register_indicator('bb_upper', ['bb_middle', 'bb_std'])(lambda ctx, middle, std: middle + (2 * std))
+register_indicator('bb_lower', ['bb_middle', 'bb_std'])(lambda ctx, middle, std: middle - (2 * std))
+register_indicator('bb_position', ['value', 'bb_lower', 'bb_upper'])(
+    lambda ctx, value, lower, upper: (value - lower) / (upper - lower)
+)
+
+
+# RSI for mean-reversion signals (calculate_rsi, per token)
+@register_indicator('price_delta', ['value'])
+def _price_delta(ctx, value):
+    return value - ctx.shift(value, 1)
+
+
+@register_indicator('rsi', ['price_delta'])
+def _rsi(ctx, delta):
+    gain = ctx.window_mean(delta.where(delta > 0, 0), 14)
+    loss = ctx.window_mean(-delta.where(delta < 0, 0), 14)
+    return 100 - (100 / (1 + gain / loss))
+
+
+# Momentum indicators
+register_indicator('momentum_7d', ['value'])(lambda ctx, value: ctx.pct_change(value, 7))
+register_indicator('momentum_30d', ['value'])(lambda ctx, value: ctx.pct_change(value, 30))
+
+# Volume trend
+register_indicator('volume_sma_20', ['total_volume'])(lambda ctx, volume: ctx.window_mean(volume, 20))
+register_indicator('volume_ratio', ['total_volume', 'volume_sma_20'])(lambda ctx, volume, sma: volume / sma)
+
+# Volatility
+register_indicator('volatility_30d', ['returns'])(
+    lambda ctx, returns: ctx.window_std(returns, 30) * np.sqrt(365)
+)
+
+# Trend confirmation: positive = short-term above mid-term (uptrend)
+register_indicator('sma_crossover', ['sma_20', 'sma_50'])(lambda ctx, sma_20, sma_50: sma_20 - sma_50)
+register_indicator('mom_vol_ratio', ['momentum_30d', 'volatility_30d'])(
+    lambda ctx, momentum, volatility: momentum / volatility
+)
+
+
+def calculate_indicators(df, columns=None, kernel='rolling', cache=None):
     """
     Calculate technical indicators for trend + mean-reversion strategy.
+
+    Vectorized: every indicator is computed for all tokens at once (see
+    `IndicatorContext`), and the output (rows, columns and values) is
+    identical to `calculate_indicators_legacy`.
+
+    With `columns`, only those indicators and their dependencies are
+    computed, and only the requested ones are added to the frame.
+
+    kernel='prefix' derives every moving average and rolling std from
+    prefix sums, so each extra window in a large SMA family (e.g. sma_5 ..
+    sma_200) costs a few array passes; values match the default kernel to
+    rounding error.
+
+    With an `IndicatorCache`, columns already computed for the same prices,
+    kernel and definitions are loaded from disk, and only the missing ones
+    are computed (and stored).
+    
+    Includes:
+    - Dual SMA: sma_20, sma_50, sma_200
+    - Bollinger Bands for mean reversion
+    - RSI for oversold/overbought
+    - Momentum (7d, 30d)
+    - Volume trends
+    - 30-day volatility
+    """
+    if columns is None:
+        columns = INDICATOR_COLUMNS
+    requested = set(columns)
+    output = [c for c in INDICATOR_COLUMNS if c in requested]
+    output += [c for c in dict.fromkeys(columns) if c not in INDICATOR_COLUMNS]
+
+    ctx = IndicatorContext(df, kernel=kernel)
+
+    cached = set()
+    if cache is not None:
+        fingerprint = cache.fingerprint(ctx.frame)
+        spec = f'{kernel}-v{INDICATORS_VERSION}'
+        for name in output:
+            values = cache.get(fingerprint, spec, name)
+            if values is not None and len(values) == len(ctx.frame):
+                ctx.preload(name, values)
+                cached.add(name)
+
+    # Dependencies are computed on demand, so cached columns skip theirs
+    for name in output:
+        ctx[name]
+
+    if cache is not None and len(cached) < len(output):
+        for name in output:
+            if name not in cached:
+                cache.put(fingerprint, spec, name, ctx[name].to_numpy())
+        cache.evict()
+    return pd.concat([ctx.frame, pd.DataFrame({name: ctx[name] for name in output})], axis=1)
+
+
+def calculate_indicators_legacy(df):
+    """
+    Calculate technical indicators one token at a time.
+
+    Reference implementation of `calculate_indicators`, kept for equivalence
+    tests and benchmarks.
     
     Includes:
     - Dual SMA: sma_20, sma_50, sma_200
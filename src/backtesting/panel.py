@@ -0,0 +1,130 @@
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+PANEL_FIELDS = ("value", "market_cap", "total_volume")
+
+
+class PricePanel:
+    """
+    Dense dates x tokens view of the cleaned long-format price data.
+
+    `dates` is the sorted set of timestamps present in the data (the dates a
+    strategy iterates over) and `tokens` the sorted token addresses. Every
+    field in PANEL_FIELDS is a float64 array of shape (n_dates, n_tokens),
+    NaN where a token has no row; `valid[d, t]` is True where it has one.
+    Lookups by label go through pandas hash indexes, so single prices and
+    whole rows are O(1) instead of boolean scans over the long frame.
+    """
+
+    def __init__(
+        self,
+        dates: pd.DatetimeIndex,
+        tokens: pd.Index,
+        fields: Dict[str, np.ndarray],
+        valid: np.ndarray,
+    ):
+        shape = (len(dates), len(tokens))
+        for name, array in fields.items():
+            if array.shape != shape:
+                raise ValueError(f"Panel field '{name}' has shape {array.shape}, expected {shape}")
+        if valid.shape != shape:
+            raise ValueError(f"Panel mask has shape {valid.shape}, expected {shape}")
+
+        self.dates = dates
+        self.tokens = tokens
+        self.fields = fields
+        self.valid = valid
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, fields=PANEL_FIELDS) -> "PricePanel":
+        """
+        Pivot a long frame with token_address, timestamp and `fields` columns
+        (PANEL_FIELDS by default; indicator columns work the same way).
+        """
+        dates = pd.DatetimeIndex(df["timestamp"].unique()).sort_values()
+        token_codes, tokens = pd.factorize(df["token_address"], sort=True)
+        date_codes = dates.get_indexer(df["timestamp"])
+        shape = (len(dates), len(tokens))
+
+        arrays = {}
+        for name in fields:
+            array = np.full(shape, np.nan)
+            # Duplicate (date, token) rows: the last one wins, as with an upsert
+            array[date_codes, token_codes] = df[name].to_numpy(dtype=np.float64)
+            arrays[name] = array
+        valid = np.zeros(shape, dtype=bool)
+        valid[date_codes, token_codes] = True
+
+        return cls(dates, pd.Index(tokens, name="token_address"), arrays, valid)
+
+    # --- Lookups ---
+    @property
+    def shape(self):
+        return self.valid.shape
+
+    @property
+    def value(self) -> np.ndarray:
+        return self.fields["value"]
+
+    @property
+    def market_cap(self) -> np.ndarray:
+        return self.fields["market_cap"]
+
+    @property
+    def total_volume(self) -> np.ndarray:
+        return self.fields["total_volume"]
+
+    def date_loc(self, date) -> int:
+        date = pd.Timestamp(date)
+        if date.tzinfo is None and self.dates.tz is not None:
+            date = date.tz_localize(self.dates.tz)
+        return self.dates.get_loc(date)
+
+    def token_loc(self, token_address: str) -> int:
+        return self.tokens.get_loc(token_address)
+
+    def get(self, date, token_address: str, field: str = "value") -> float:
+        """Return one field for (date, token), NaN if the token has no row that day."""
+        try:
+            return float(self.fields[field][self.date_loc(date), self.token_loc(token_address)])
+        except KeyError:
+            return np.nan
+
+    def row(self, date, field: str = "value") -> np.ndarray:
+        """Return one field for every token on `date` (a view, NaN where missing)."""
+        return self.fields[field][self.date_loc(date)]
+
+    # --- Persistence ---
+    def save(self, directory):
+        """Write the panel as .npy arrays plus an index file, loadable with mmap."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "dates.npy", self.dates.as_unit("ns").asi8)
+        for name, array in self.fields.items():
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(array))
+        np.save(directory / "valid.npy", self.valid)
+        with open(directory / "panel.json", "w") as f:
+            json.dump({
+                "tokens": [str(t) for t in self.tokens],
+                "fields": list(self.fields),
+                "tz": str(self.dates.tz) if self.dates.tz is not None else None,
+                "shape": list(self.shape),
+            }, f)
+
+    @classmethod
+    def load(cls, directory, mmap: bool = True) -> "PricePanel":
+        """Load a saved panel; arrays are memory-mapped read-only when `mmap` is set."""
+        directory = Path(directory)
+        mmap_mode: Optional[str] = "r" if mmap else None
+        with open(directory / "panel.json") as f:
+            meta = json.load(f)
+        dates = pd.DatetimeIndex(np.load(directory / "dates.npy").view("datetime64[ns]"))
+        if meta["tz"] is not None:
+            dates = dates.tz_localize("UTC").tz_convert(meta["tz"])
+        fields = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in meta["fields"]}
+        valid = np.load(directory / "valid.npy", mmap_mode=mmap_mode)
+        return cls(dates, pd.Index(meta["tokens"], name="token_address"), fields, valid)
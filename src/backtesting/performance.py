@@ -8,8 +8,8 @@ from src.data.db import DBService
 from src.db_config import DB_CONFIG
 from src.backtesting.stablecoins import ARBITRUM_STABLECOINS
 
-def calculate_performance_metrics(portfolio_df, initial_capital=10000, filename=None):
-    """Calculate strategy performance metrics and optionally save to a file"""
+def calculate_performance_metrics(portfolio_df, initial_capital=10000, filename=None, verbose=True):
+    """Calculate strategy performance metrics, print them unless `verbose` is False, and optionally save to a file"""
 
     final_value = portfolio_df['portfolio_value'].iloc[-1]
     total_return = (final_value - initial_capital) / initial_capital
@@ -58,23 +58,24 @@ def calculate_performance_metrics(portfolio_df, initial_capital=10000, filename=
     # -----------------------------
     # Pretty print
     # -----------------------------
-    print("\n" + "=" * 60)
-    print("RESULTS")
-    print("=" * 60)
-    print(f"Initial Capital        : ${metrics['initial_capital_usd']:,}")
-    print(f"Final Portfolio Value  : ${metrics['final_value_usd']:,}")
-    print(f"Total Return           : {metrics['total_return_pct']}%")
-    print(f"Annualized Return      : {metrics['annualized_return_pct']}%")
-    print(f"Annualized Volatility  : {metrics['volatility_pct']}%")
-    print(f"Sharpe Ratio           : {metrics['sharpe_ratio']}")
-    print(f"Calmar Ratio           : {metrics['calmar_ratio']}")
-    print(f"Maximum Drawdown       : {metrics['max_drawdown_pct']}%")
-    print(f"Win Rate               : {metrics['win_rate_pct']}%")
-    print(f"Backtest Days          : {metrics['backtest_days']}")
-    print(f"Avg Tokens Held        : {metrics['avg_tokens_held']}")
-    print("=" * 60)
-    print("\nBitcoin benchmark ~70% annualized over similar period")
-    print("=" * 60)
+    if verbose:
+        print("\n" + "=" * 60)
+        print("RESULTS")
+        print("=" * 60)
+        print(f"Initial Capital        : ${metrics['initial_capital_usd']:,}")
+        print(f"Final Portfolio Value  : ${metrics['final_value_usd']:,}")
+        print(f"Total Return           : {metrics['total_return_pct']}%")
+        print(f"Annualized Return      : {metrics['annualized_return_pct']}%")
+        print(f"Annualized Volatility  : {metrics['volatility_pct']}%")
+        print(f"Sharpe Ratio           : {metrics['sharpe_ratio']}")
+        print(f"Calmar Ratio           : {metrics['calmar_ratio']}")
+        print(f"Maximum Drawdown       : {metrics['max_drawdown_pct']}%")
+        print(f"Win Rate               : {metrics['win_rate_pct']}%")
+        print(f"Backtest Days          : {metrics['backtest_days']}")
+        print(f"Avg Tokens Held        : {metrics['avg_tokens_held']}")
+        print("=" * 60)
+        print("\nBitcoin benchmark ~70% annualized over similar period")
+        print("=" * 60)
 
     # -----------------------------
     # Save metrics
@@ -83,7 +84,8 @@ def calculate_performance_metrics(portfolio_df, initial_capital=10000, filename=
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         with open(filename, "w") as f:
             json.dump(metrics, f, indent=4)
-        print(f"\nMetrics saved to {filename}")
+        if verbose:
+            print(f"\nMetrics saved to {filename}")
 
     return metrics
 
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.db import DBService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parents[2] / "data" / "snapshots"
+
+# Rows written up to this long before the stored watermark are read again on
+# refresh, so transactions that committed late are not missed
+WATERMARK_OVERLAP = timedelta(minutes=10)
+
+SNAPSHOT_VERSION = 1
+NUMERIC_COLUMNS = ("timestamp", "value", "market_cap", "total_volume")
+SNAPSHOT_COLUMNS = ("token_address",) + NUMERIC_COLUMNS
+SNAPSHOT_FILES = ("tokens.json", "token_codes.npy") + tuple(f"{c}.npy" for c in NUMERIC_COLUMNS)
+
+
+class SnapshotError(RuntimeError):
+    """Raised when a snapshot is missing or fails validation."""
+
+
+class PriceSnapshot:
+    """
+    Local columnar copy of `{schema}.prices` for fast repeated backtests.
+
+    Each column is stored as a .npy file that is memory-mapped on load:
+    token_codes (int32 indexes into tokens.json), timestamp (int64 epoch
+    seconds), value, market_cap and total_volume (float64). Rows are sorted by
+    (token_address, timestamp). meta.json records the row count, a SHA-256
+    checksum over the column files and the `updated_at` watermark of the last
+    refresh, so `refresh` only reads rows written since then.
+    """
+
+    def __init__(self, directory=DEFAULT_SNAPSHOT_DIR, schema: str = "backtest"):
+        self.schema = schema
+        self.path = Path(directory) / schema
+        # Metadata and file signatures of the snapshot last checksummed or written
+        self._verified = None
+
+    @property
+    def meta_path(self) -> Path:
+        return self.path / "meta.json"
+
+    def exists(self) -> bool:
+        return self.meta_path.exists()
+
+    def read_meta(self) -> dict:
+        if not self.exists():
+            raise SnapshotError(f"No price snapshot at {self.path}")
+        with open(self.meta_path) as f:
+            return json.load(f)
+
+    # --- Reading ---
+    @staticmethod
+    def _checksum(directory: Path) -> str:
+        digest = hashlib.sha256()
+        for name in SNAPSHOT_FILES:
+            with open(directory / name, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        return digest.hexdigest()
+
+    def _signature(self, meta: dict) -> tuple:
+        files = tuple((name, os.stat(self.path / name).st_size, os.stat(self.path / name).st_mtime_ns)
+                      for name in SNAPSHOT_FILES)
+        return meta, files
+
+    def validate(self) -> dict:
+        """
+        Check the stored row count and checksum; return the metadata.
+
+        The checksum is computed once per instance: files left unchanged since
+        the last validation or write (same metadata, sizes and modification
+        times) are not read again, so a refresh followed by a load hashes the
+        snapshot once.
+        """
+        meta = self.read_meta()
+        try:
+            signature = self._signature(meta)
+        except FileNotFoundError as e:
+            raise SnapshotError(f"Price snapshot {self.path} is incomplete: {e}")
+        if signature == self._verified:
+            return meta
+        checksum = self._checksum(self.path)
+        if checksum != meta["checksum"]:
+            raise SnapshotError(f"Price snapshot {self.path} is corrupt (checksum mismatch)")
+        n_rows = len(np.load(self.path / "token_codes.npy", mmap_mode="r"))
+        if n_rows != meta["n_rows"]:
+            raise SnapshotError(f"Price snapshot {self.path} has {n_rows} rows, expected {meta['n_rows']}")
+        self._verified = signature
+        return meta
+
+    def load(self, validate: bool = True, mmap: bool = True) -> pd.DataFrame:
+        """
+        Load the snapshot as a prices DataFrame.
+
+        Numeric columns are backed by memory-mapped arrays when `mmap` is set.
+        token_address is a string column and timestamp a UTC datetime column,
+        as returned by `DBService.read_prices`.
+        """
+        meta = self.validate() if validate else self.read_meta()
+        mmap_mode = "r" if mmap else None
+        with open(self.path / "tokens.json") as f:
+            tokens = np.asarray(json.load(f), dtype=object)
+        codes = np.load(self.path / "token_codes.npy", mmap_mode=mmap_mode)
+        columns = {c: np.load(self.path / f"{c}.npy", mmap_mode=mmap_mode) for c in NUMERIC_COLUMNS}
+
+        df = pd.DataFrame({
+            "token_address": tokens[codes] if len(tokens) else np.empty(0, dtype=object),
+            "value": columns["value"],
+            "timestamp": pd.to_datetime(columns["timestamp"], unit="s", utc=True),
+            "market_cap": columns["market_cap"],
+            "total_volume": columns["total_volume"],
+        }, copy=False)
+        logger.info("Loaded %d prices from snapshot %s (watermark %s)", meta["n_rows"], self.path, meta["watermark"])
+        return df
+
+    # --- Writing ---
+    def _write(self, df: pd.DataFrame, watermark: Optional[datetime]):
+        df = df.sort_values(["token_address", "timestamp"], kind="stable", ignore_index=True)
+        codes, tokens = pd.factorize(df["token_address"], sort=True)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.path.parent, prefix=f".{self.schema}-"))
+        try:
+            with open(tmp_dir / "tokens.json", "w") as f:
+                json.dump([str(t) for t in tokens], f)
+            np.save(tmp_dir / "token_codes.npy", codes.astype(np.int32))
+            epoch_seconds = (df["timestamp"] - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)
+            np.save(tmp_dir / "timestamp.npy", epoch_seconds.to_numpy(dtype=np.int64))
+            for c in ("value", "market_cap", "total_volume"):
+                np.save(tmp_dir / f"{c}.npy", df[c].to_numpy(dtype=np.float64))
+
+            meta = {
+                "version": SNAPSHOT_VERSION,
+                "schema": self.schema,
+                "n_rows": len(df),
+                "n_tokens": len(tokens),
+                "checksum": self._checksum(tmp_dir),
+                "watermark": watermark.isoformat() if watermark is not None else None,
+                "refreshed_at": datetime.now(timezone.utc).isoformat(),
+            }
+            with open(tmp_dir / "meta.json", "w") as f:
+                json.dump(meta, f, indent=2)
+
+            # Swap directories so readers never see a half-written snapshot
+            old_dir = None
+            if self.path.exists():
+                old_dir = self.path.with_name(f".{self.schema}-old-{os.getpid()}")
+                os.replace(self.path, old_dir)
+            os.replace(tmp_dir, self.path)
+            if old_dir is not None:
+                shutil.rmtree(old_dir, ignore_errors=True)
+            # Checksummed while writing: no need to hash the files again on load
+            self._verified = self._signature(meta)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def refresh(self, db_service: DBService, full: bool = False) -> int:
+        """
+        Bring the snapshot up to date with `{schema}.prices`.
+
+        Only rows written since the stored watermark are read and merged in;
+        a full rebuild happens when there is no valid snapshot yet, when `full`
+        is set, or when the merged row count disagrees with the table.
+
+        Returns:
+            int: Number of rows read from the database
+        """
+        db_service.ensure_price_schema(self.schema)
+        watermark, n_rows = db_service.get_price_watermark(self.schema)
+
+        meta = None
+        if not full and self.exists():
+            try:
+                meta = self.validate()
+            except SnapshotError as e:
+                logger.warning(f"{e}; rebuilding")
+
+        if meta is not None:
+            stored = datetime.fromisoformat(meta["watermark"]) if meta["watermark"] else None
+            if stored == watermark and meta["n_rows"] == n_rows:
+                logger.info("Price snapshot %s is up to date (%d rows)", self.path, n_rows)
+                return 0
+
+            changed = db_service.read_prices(
+                schema=self.schema,
+                columns=SNAPSHOT_COLUMNS,
+                changed_since=stored - WATERMARK_OVERLAP if stored is not None else None,
+            )
+            merged = pd.concat([self.load(validate=False, mmap=False), changed], ignore_index=True)
+            merged = merged.drop_duplicates(["token_address", "timestamp"], keep="last")
+            if len(merged) == n_rows:
+                self._write(merged, watermark)
+                logger.info("Refreshed price snapshot %s with %d changed rows", self.path, len(changed))
+                return len(changed)
+            logger.warning(
+                f"Price snapshot {self.path} has {len(merged)} rows after merging, table has {n_rows}; rebuilding"
+            )
+
+        df = db_service.read_prices(schema=self.schema, columns=SNAPSHOT_COLUMNS)
+        self._write(df, watermark)
+        logger.info("Built price snapshot %s with %d rows", self.path, len(df))
+        return len(df)
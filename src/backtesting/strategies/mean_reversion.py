@@ -1,13 +1,24 @@
 import pandas as pd
-import numpy as np
-from src.backtesting.data_cleaner import apply_quality_filters
-from src.backtesting.transaction_costs import apply_transaction_costs
-from src.backtesting.slippage import slippage_cost
+from src.backtesting.engine import BacktestData, Day, run_backtest_engine
+from src.backtesting.universe import Universe
+
+def required_indicators(**params):
+    """Indicator columns `backtest_strategy` reads."""
+    return ["bb_lower", "bb_upper", "bb_position", "rsi"]
+
+
+def select(day: Day):
+    """Mean-reversion: buy if price near lower BB and RSI oversold."""
+    today = day.rows(*required_indicators())
+    return day.in_row_order(today & (day.field("bb_position") <= 0.2) & (day.field("rsi") < 30))
+
 
 def backtest_strategy(
     df: pd.DataFrame,
     initial_capital: float = 10000,
     rebalance_days: int = 7,
+    universe: Universe = None,
+    data: BacktestData = None,
 ):
     """
     Mean-Reversion strategy based on RSI + Bollinger Bands.
@@ -16,98 +27,6 @@ def backtest_strategy(
     - df is already cleaned
     - indicators ['bb_lower', 'bb_upper', 'bb_position', 'rsi'] are calculated
     """
-
-    dates = sorted(df["timestamp"].unique())
-    capital = initial_capital
-    current_positions = {}
-    portfolio_history = []
-
-    last_rebalance_idx = -rebalance_days
-
-    for i, current_date in enumerate(dates):
-
-        # ------------------------
-        # Rebalance / entry
-        # ------------------------
-        if i - last_rebalance_idx >= rebalance_days:
-            eligible_tokens = apply_quality_filters(df, current_date)
-
-            today = df[
-                (df["timestamp"] == current_date)
-                & (df["token_address"].isin(eligible_tokens))
-            ][["token_address", "value", "bb_lower", "bb_upper", "bb_position", "rsi"]].dropna()
-
-            # Mean-reversion: buy if price near lower BB and RSI oversold
-            selected = today[(today["bb_position"] <= 0.2) & (today["rsi"] < 30)]
-
-            current_positions = {}
-
-            if not selected.empty:
-                allocation = capital / len(selected)
-
-                for _, row in selected.iterrows():
-                    tx_cost = apply_transaction_costs(allocation)
-                    entry_price = row["value"] * (1 + tx_cost / allocation)
-
-                    current_positions[row["token_address"]] = {
-                        "entry_price": entry_price,
-                        "allocation": allocation,
-                    }
-
-            last_rebalance_idx = i
-
-        # ------------------------
-        # Daily update / PnL
-        # ------------------------
-        daily_return = 0.0
-        exits = []
-
-        for token, pos in current_positions.items():
-            today_row = df[
-                (df["timestamp"] == current_date)
-                & (df["token_address"] == token)
-            ]
-
-            if i == 0 or today_row.empty:
-                continue
-
-            yesterday_row = df[
-                (df["timestamp"] == dates[i - 1])
-                & (df["token_address"] == token)
-            ]
-
-            if yesterday_row.empty:
-                continue
-
-            today_price = today_row["value"].iloc[0]
-            yesterday_price = yesterday_row["value"].iloc[0]
-
-            pnl = (today_price - pos["entry_price"]) / pos["entry_price"]
-            weight = pos["allocation"] / capital
-
-            # Stop-loss
-            if pnl < -0.08:
-                slippage = slippage_cost(pos["allocation"], pool_liquidity=100_000_000)
-                tx_cost = apply_transaction_costs(pos["allocation"]) / pos["allocation"]
-                penalty = slippage + tx_cost
-
-                daily_return += ((today_price - yesterday_price) / yesterday_price) * weight
-                daily_return -= penalty
-                exits.append(token)
-            else:
-                daily_return += ((today_price - yesterday_price) / yesterday_price) * weight
-
-        for token in exits:
-            current_positions.pop(token, None)
-
-        capital *= (1 + daily_return)
-
-        portfolio_history.append(
-            {
-                "date": current_date,
-                "portfolio_value": capital,
-                "n_tokens": len(current_positions),
-            }
-        )
-
-    return pd.DataFrame(portfolio_history)
+    if data is None:
+        data = BacktestData(df, required_indicators(), universe=universe)
+    return run_backtest_engine(data, select, initial_capital=initial_capital, rebalance_days=rebalance_days)
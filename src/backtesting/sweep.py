@@ -0,0 +1,222 @@
+import importlib
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.backtesting.engine import BacktestData
+from src.backtesting.panel import PricePanel
+from src.backtesting.performance import calculate_performance_metrics
+from src.backtesting.universe import Universe
+
+logger = logging.getLogger(__name__)
+
+
+def parameter_grid(axes: Dict[str, Sequence]) -> List[Dict]:
+    """Every combination of the axes' values, in order, the last axis varying fastest."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+def job_indicators(jobs: List[Tuple[object, Dict]]) -> List[str]:
+    """Indicator columns any (strategy module, params) job reads, so they are computed once for all of them."""
+    columns = {}
+    for strategy_module, params in jobs:
+        columns.update(dict.fromkeys(strategy_module.required_indicators(**params)))
+    return list(columns)
+
+
+def sweep_indicators(strategy_module, grid: List[Dict]) -> List[str]:
+    """Indicator columns any combination of the grid reads."""
+    return job_indicators([(strategy_module, params) for params in grid])
+
+
+class SharedBacktestData:
+    """
+    BacktestData arrays copied once into shared memory blocks.
+
+    `spec` is a small picklable description of the blocks (names, shapes,
+    dtypes) plus the date and token indexes; `attach(spec)` in a worker
+    process maps the same blocks as read-only numpy arrays, so every worker
+    reads one copy of the panel instead of unpickling its own. The owner
+    frees the blocks on `close()` or when leaving the `with` block.
+    """
+
+    def __init__(self, data: BacktestData):
+        arrays = {f"field:{name}": array for name, array in data.panel.fields.items()}
+        arrays["valid"] = data.valid
+        arrays["row_order"] = data.row_order
+        arrays["eligible"] = data.universe.eligible
+
+        self._blocks = []
+        blocks = {}
+        try:
+            for key, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(shm)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+                blocks[key] = (shm.name, array.shape, array.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+        self.spec = {
+            "blocks": blocks,
+            "dates": data.dates,
+            "tokens": data.panel.tokens,
+            "universe_dates": data.universe.dates,
+            "universe_tokens": data.universe.tokens,
+        }
+
+    @staticmethod
+    def attach(spec) -> Tuple[BacktestData, list]:
+        """
+        Map the blocks described by `spec` as a BacktestData.
+
+        Returns:
+            (BacktestData, handles): keep `handles` alive as long as the data is used
+        """
+        handles, arrays = [], {}
+        for key, (name, shape, dtype) in spec["blocks"].items():
+            shm = shared_memory.SharedMemory(name=name)
+            handles.append(shm)
+            array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            array.flags.writeable = False
+            arrays[key] = array
+
+        fields = {key.split(":", 1)[1]: array for key, array in arrays.items() if key.startswith("field:")}
+        panel = PricePanel(spec["dates"], spec["tokens"], fields, arrays["valid"])
+        universe = Universe(spec["universe_dates"], spec["universe_tokens"], arrays["eligible"])
+        return BacktestData.from_parts(panel, arrays["row_order"], universe), handles
+
+    def close(self):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _run_job(data: BacktestData, strategy_module, params: Dict, initial_capital: float) -> pd.DataFrame:
+    return strategy_module.backtest_strategy(None, initial_capital=initial_capital, data=data, **params)
+
+
+# Per-process state of pool workers, set once by `_init_worker`
+_worker = {}
+
+
+def _init_worker(spec):
+    data, handles = SharedBacktestData.attach(spec)
+    _worker.update(data=data, handles=handles)
+
+
+def _run_in_worker(index: int, strategy_name: str, params: Dict, initial_capital: float) -> Tuple[int, pd.DataFrame]:
+    strategy_module = importlib.import_module(strategy_name)
+    return index, _run_job(_worker["data"], strategy_module, params, initial_capital)
+
+
+def run_backtests(
+    data: BacktestData,
+    jobs: List[Tuple[object, Dict]],
+    initial_capital: float = 10000,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, Tuple[object, Dict]], None]] = None,
+) -> List[pd.DataFrame]:
+    """
+    Run `strategy_module.backtest_strategy(data=data, **params)` for every
+    (strategy module, params) job on the same data.
+
+    `data` must hold every indicator the jobs read (see
+    `job_indicators`). With more than one worker it is placed in shared
+    memory once and the jobs fan out to a process pool; each result depends
+    only on its job, so results are the same for any number of workers.
+    `progress(done, total, job)` is called as jobs finish (default: a log
+    line with elapsed time and ETA).
+
+    Returns:
+        List[pd.DataFrame]: the portfolio history of each job, in job order
+    """
+    total = len(jobs)
+    workers = max(1, min(workers or os.cpu_count() or 1, total))
+    if progress is None:
+        progress = _log_progress(time.perf_counter())
+
+    results: List[Optional[pd.DataFrame]] = [None] * total
+    if workers == 1:
+        for i, (strategy_module, params) in enumerate(jobs):
+            results[i] = _run_job(data, strategy_module, params, initial_capital)
+            progress(i + 1, total, jobs[i])
+    else:
+        logger.info(f"Running {total} backtests on {workers} workers")
+        with SharedBacktestData(data) as shared, ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shared.spec,),
+        ) as pool:
+            futures = [
+                pool.submit(_run_in_worker, i, strategy_module.__name__, params, initial_capital)
+                for i, (strategy_module, params) in enumerate(jobs)
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                i, portfolio_df = future.result()
+                results[i] = portfolio_df
+                progress(done, total, jobs[i])
+    return results
+
+
+def run_sweep(
+    data: BacktestData,
+    strategy_module,
+    grid: List[Dict],
+    initial_capital: float = 10000,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, Dict], None]] = None,
+) -> pd.DataFrame:
+    """
+    Backtest one strategy for every parameter combination in `grid`.
+
+    Each combination is passed to `strategy_module.backtest_strategy` as
+    keyword arguments (e.g. sma_period, rebalance_days, top_pct) together
+    with the shared `data`; see `run_backtests` for how the combinations are
+    spread over `workers`. `progress(done, total, params)` is called as
+    combinations finish.
+
+    Returns:
+        pd.DataFrame: one row per combination, in grid order: the parameters, then the metrics
+    """
+    on_done = None if progress is None else (lambda done, total, job: progress(done, total, job[1]))
+    portfolios = run_backtests(
+        data,
+        [(strategy_module, params) for params in grid],
+        initial_capital=initial_capital,
+        workers=workers,
+        progress=on_done,
+    )
+    return pd.DataFrame([
+        {**params, **calculate_performance_metrics(portfolio_df, initial_capital=initial_capital, verbose=False)}
+        for params, portfolio_df in zip(grid, portfolios)
+    ])
+
+
+def _log_progress(start: float) -> Callable[[int, int, Tuple[object, Dict]], None]:
+    def log(done, total, job):
+        strategy_module, params = job
+        elapsed = time.perf_counter() - start
+        remaining = elapsed / done * (total - done)
+        logger.info(
+            f"[{done}/{total}] {strategy_module.__name__.rsplit('.', 1)[-1]} {params} "
+            f"({elapsed:.1f}s elapsed, ~{remaining:.1f}s left)"
+        )
+    return log
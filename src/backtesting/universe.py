@@ -0,0 +1,154 @@
+import json
+import logging
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.backtesting.data_cleaner import (
+    MAX_ABS_RETURN,
+    MAX_ZERO_VOLUME_SHARE,
+    MIN_HISTORY_DAYS,
+    MIN_MARKET_CAP,
+    RECENT_DAYS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the eligibility rules change, so cached masks are rebuilt
+UNIVERSE_VERSION = 1
+
+
+def eligible_rows(df: pd.DataFrame) -> np.ndarray:
+    """
+    Whether each row would pass `apply_quality_filters` on its own date.
+
+    `df` must be sorted by (token_address, timestamp). A token's eligibility
+    only changes when it gets a new row, so this per-row flag, carried
+    forward to later dates, is the whole point-in-time universe.
+    """
+    codes = pd.factorize(df['token_address'])[0]
+    n = len(codes)
+    first = np.r_[True, codes[1:] != codes[:-1]] if n else np.zeros(0, dtype=bool)
+    token_start = np.maximum.accumulate(np.where(first, np.arange(n), 0)) if n else np.zeros(0, dtype=int)
+    obs = np.arange(n) - token_start
+
+    value = df['value'].to_numpy(dtype=np.float64)
+    market_cap = df['market_cap'].to_numpy(dtype=np.float64)
+    zero_volume = (df['total_volume'].to_numpy(dtype=np.float64) == 0)
+
+    # Same arithmetic as pct_change(): NaN on each token's first row
+    returns = np.full(n, np.nan)
+    returns[1:] = value[1:] / value[:-1] - 1
+    returns[first] = np.nan
+
+    # Trailing RECENT_DAYS-row windows; only read where obs >= MIN_HISTORY_DAYS - 1,
+    # so they never reach into the previous token
+    pad = RECENT_DAYS - 1
+    zeros = np.cumsum(np.r_[np.zeros(RECENT_DAYS), zero_volume])
+    zero_share = (zeros[RECENT_DAYS:] - zeros[:n]) / RECENT_DAYS
+    padded = np.r_[np.full(pad, np.nan), np.abs(returns)]
+    max_abs_return = np.fmax.reduce(sliding_window_view(padded, RECENT_DAYS), axis=1) if n else padded
+
+    with np.errstate(invalid='ignore'):
+        return (
+            (obs >= MIN_HISTORY_DAYS - 1)
+            & ~(market_cap < MIN_MARKET_CAP)
+            & ~(zero_share > MAX_ZERO_VOLUME_SHARE)
+            & ~(max_abs_return > MAX_ABS_RETURN)
+        )
+
+
+class Universe:
+    """
+    Point-in-time dates x tokens eligibility matrix.
+
+    `eligible[d, t]` is True when token `t` passes the quality filters using
+    only its rows up to `dates[d]`, exactly as `apply_quality_filters(df,
+    dates[d])` decides. Built in one vectorized pass over the sorted prices,
+    so a rebalance is a row lookup instead of a groupby over the full frame.
+    """
+
+    def __init__(self, dates: pd.DatetimeIndex, tokens: pd.Index, eligible: np.ndarray):
+        if eligible.shape != (len(dates), len(tokens)):
+            raise ValueError(f"Universe mask has shape {eligible.shape}, expected {(len(dates), len(tokens))}")
+        self.dates = dates
+        self.tokens = tokens
+        self.eligible = eligible
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, cache=None) -> "Universe":
+        """
+        Build the universe for cleaned prices; with an `IndicatorCache`, the
+        mask is loaded from (or stored to) it under the prices' fingerprint.
+        """
+        df = df.sort_values(['token_address', 'timestamp'], kind='stable', ignore_index=True)
+        dates = pd.DatetimeIndex(df['timestamp'].unique()).sort_values()
+        token_codes, tokens = pd.factorize(df['token_address'], sort=True)
+        tokens = pd.Index(tokens, name='token_address')
+        shape = (len(dates), len(tokens))
+
+        spec = f'universe-v{UNIVERSE_VERSION}'
+        if cache is not None:
+            fingerprint = cache.fingerprint(df)
+            eligible = cache.get(fingerprint, spec, 'eligible')
+            if eligible is not None and eligible.shape == shape:
+                return cls(dates, tokens, eligible)
+
+        # Carry each token's latest row forward: row indexes grow with time
+        # within a token, so a running max along dates finds the last one
+        last_row = np.full(shape, -1, dtype=np.int64)
+        last_row[dates.get_indexer(df['timestamp']), token_codes] = np.arange(len(df))
+        last_row = np.maximum.accumulate(last_row, axis=0)
+        passes = np.r_[eligible_rows(df), False]  # index -1: no row yet
+        eligible = passes[last_row]
+
+        if cache is not None:
+            cache.put(fingerprint, spec, 'eligible', eligible)
+            cache.evict()
+        logger.info(f"Built universe mask for {shape[0]} dates x {shape[1]} tokens")
+        return cls(dates, tokens, eligible)
+
+    def date_loc(self, date) -> int:
+        """Index of the last date on or before `date`, -1 if there is none."""
+        date = pd.Timestamp(date)
+        if date.tzinfo is None and self.dates.tz is not None:
+            date = date.tz_localize(self.dates.tz)
+        return int(self.dates.searchsorted(date, side='right')) - 1
+
+    def row(self, date) -> np.ndarray:
+        """Eligibility of every token on `date`."""
+        loc = self.date_loc(date)
+        if loc < 0:
+            return np.zeros(len(self.tokens), dtype=bool)
+        return self.eligible[loc]
+
+    def eligible_tokens(self, date) -> List[str]:
+        """Eligible token addresses on `date`, as `apply_quality_filters` returns them."""
+        return self.tokens[self.row(date)].tolist()
+
+    # --- Persistence ---
+    def save(self, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "dates.npy", self.dates.as_unit("ns").asi8)
+        np.save(directory / "eligible.npy", self.eligible)
+        with open(directory / "universe.json", "w") as f:
+            json.dump({
+                "version": UNIVERSE_VERSION,
+                "tokens": [str(t) for t in self.tokens],
+                "tz": str(self.dates.tz) if self.dates.tz is not None else None,
+            }, f)
+
+    @classmethod
+    def load(cls, directory, mmap: bool = True) -> "Universe":
+        directory = Path(directory)
+        with open(directory / "universe.json") as f:
+            meta = json.load(f)
+        dates = pd.DatetimeIndex(np.load(directory / "dates.npy").view("datetime64[ns]"))
+        if meta["tz"] is not None:
+            dates = dates.tz_localize("UTC").tz_convert(meta["tz"])
+        eligible = np.load(directory / "eligible.npy", mmap_mode="r" if mmap else None)
+        return cls(dates, pd.Index(meta["tokens"], name="token_address"), eligible)
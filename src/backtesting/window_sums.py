@@ -0,0 +1,116 @@
+import numpy as np
+
+# A window whose result is smaller than this fraction of the token's running
+# total has lost too many digits to cancellation between two prefix sums; it
+# is recomputed directly from the window's values instead
+CANCELLATION_TOLERANCE = 1e-7
+
+# Rows gathered at once when recomputing windows directly
+_GATHER_ROWS = 1 << 20
+
+
+class WindowSums:
+    """
+    Per-token prefix sums over token-contiguous data, for trailing windows of
+    any length.
+
+    Built once per series in O(n); the mean or sample std of every row's
+    trailing `window` rows is then a difference of two prefix sums, O(1) per
+    row, so a whole family of windows (sma_5 .. sma_200) costs about as much
+    as a single rolling pass. Results match `rolling(window, min_periods=window)`
+    per token to rounding error: NaN until a token has `window` rows, and NaN
+    for any window containing a NaN.
+
+    Prefix sums restart at every token, so one token's magnitude never costs
+    another token precision. Squares are summed around the token's mean, and
+    the few windows where the difference of prefix sums cancels badly (tiny
+    variance after a large move, near-zero means of signed series) are
+    recomputed directly.
+    """
+
+    def __init__(self, values: np.ndarray, token_start: np.ndarray):
+        self.values = np.asarray(values, dtype=np.float64)
+        n = len(self.values)
+        self.obs = np.arange(n) - token_start
+        self.bounds = np.append(np.flatnonzero(self.obs == 0), n)
+
+        self.valid = ~np.isnan(self.values)
+        self._all_valid = bool(self.valid.all())
+        self._count = np.concatenate(([0], np.cumsum(self.valid)))
+        self._filled = np.where(self.valid, self.values, 0.0)
+        self._sums = None
+        self._squares = None
+
+    def _token_cumsum(self, x):
+        """Inclusive and exclusive prefix sums of `x`, restarting at each token."""
+        inclusive = np.empty_like(x)
+        for start, end in zip(self.bounds[:-1], self.bounds[1:]):
+            np.cumsum(x[start:end], out=inclusive[start:end])
+        exclusive = np.concatenate(([0.0], inclusive[:-1]))
+        exclusive[self.bounds[:-1]] = 0.0
+        return inclusive, exclusive
+
+    @staticmethod
+    def _window_diff(inclusive, exclusive, window):
+        # Row r's window is [r - window + 1, r]; rows without a full window are
+        # masked by `_complete`, so differences across tokens never survive
+        diff = np.empty(len(inclusive))
+        diff[:window - 1] = np.nan
+        np.subtract(inclusive[window - 1:], exclusive[:len(inclusive) - window + 1], out=diff[window - 1:])
+        return diff
+
+    def _complete(self, window):
+        if self._all_valid:
+            return self.obs >= window - 1
+        complete = np.zeros(len(self.values), dtype=bool)
+        counts = self._count[window:] - self._count[:len(self.values) - window + 1]
+        complete[window - 1:] = counts == window
+        return complete & (self.obs >= window - 1)
+
+    def mean(self, window: int) -> np.ndarray:
+        if self._sums is None:
+            inclusive, exclusive = self._token_cumsum(self._filled)
+            signed = (self._filled < 0).any()
+            magnitude = self._token_cumsum(np.abs(self._filled))[0] if signed else inclusive
+            self._sums = inclusive, exclusive, CANCELLATION_TOLERANCE * magnitude, signed
+        inclusive, exclusive, threshold, signed = self._sums
+
+        complete = self._complete(window)
+        total = self._window_diff(inclusive, exclusive, window)
+        cancelled = (np.abs(total) if signed else total) <= threshold
+        rows = np.flatnonzero(cancelled & complete)
+        if len(rows):
+            total[rows] = self._direct(rows, window, lambda w: w.sum(axis=1))
+        total /= window
+        total[~complete] = np.nan
+        return total
+
+    def std(self, window: int) -> np.ndarray:
+        """Sample standard deviation (ddof=1), as `rolling().std()`."""
+        if self._squares is None:
+            token = np.repeat(np.arange(len(self.bounds) - 1), np.diff(self.bounds))
+            n_valid = np.bincount(token, weights=self.valid)
+            token_mean = np.divide(np.bincount(token, weights=self._filled), n_valid,
+                                   out=np.zeros(len(n_valid)), where=n_valid > 0)
+            centred = np.where(self.valid, self.values - token_mean[token], 0.0)
+            self._squares = self._token_cumsum(centred) + self._token_cumsum(centred * centred)
+        inclusive, exclusive, sq_inclusive, sq_exclusive = self._squares
+
+        complete = self._complete(window)
+        s = self._window_diff(inclusive, exclusive, window)
+        sq = self._window_diff(sq_inclusive, sq_exclusive, window)
+        ss = sq - s * s / window
+        rows = np.flatnonzero(complete & (ss <= CANCELLATION_TOLERANCE * sq_inclusive))
+        if len(rows):
+            ss[rows] = self._direct(rows, window, lambda w: w.var(axis=1) * window)
+        return np.where(complete, np.sqrt(np.maximum(ss, 0.0) / (window - 1)), np.nan)
+
+    def _direct(self, rows, window, reduce):
+        """Apply `reduce` to each row's (rows, window) block of values, in chunks."""
+        result = np.empty(len(rows))
+        lags = np.arange(window - 1, -1, -1)
+        step = max(1, _GATHER_ROWS // window)
+        for i in range(0, len(rows), step):
+            chunk = rows[i:i + step]
+            result[i:i + step] = reduce(self.values[chunk[:, None] - lags])
+        return result
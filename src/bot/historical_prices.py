@@ -15,18 +15,48 @@ def get_live_latest_timestamp(schema: str = "live"):
         return db_service.get_latest_price_date(schema=schema)
 
 
-def get_prices():
+def get_prices(network: str = "arb-mainnet", max_workers: int = 1, schema: str = "live"):
+    """
+    Bring the live prices table up to date, spending quota only on missing days.
+
+    Per-token coverage is read from the DB and turned into the minimal set of
+    request windows: tokens without data get the last DEFAULT_LOOKBACK_DAYS,
+    tokens with data get their interior gaps and the days since their last
+    stored price. Days the fetch journal lists as already returned empty are
+    not requested again (except after a token's last stored day, where prices
+    may still be published). Tokens in the negative cache are skipped until
+    their re-probe interval has passed.
+
+    Returns:
+        int: Number of price rows written
+    """
     # 1) check if there are new tokens
     check_new_tokens()
 
-    # 2) determine start date
-    latest_ts = get_live_latest_timestamp(schema="live")
+    today = datetime.now(timezone.utc).date()
+    default_start = today - timedelta(days=DEFAULT_LOOKBACK_DAYS)
 
-    if latest_ts is None:
-        start_date = datetime.now(timezone.utc) - timedelta(days=DEFAULT_LOOKBACK_DAYS)
-    else:
-        start_date = latest_ts
+    with psycopg2.connect(**DB_CONFIG) as conn:
+        db_service = data.DBService(conn)
 
-    # 3) fetch historical prices
-    tokens = data.get_available_tokens()
-    data.fetch_historical_prices(tokens, start_date=start_date)
+        # 2) plan request windows from per-token coverage
+        coverage = db_service.get_price_coverage(schema=schema)
+        tokens = data.skip_dead_tokens(data.get_available_tokens(), db_service, network)
+        windows = data.plan_fetch_windows(
+            tokens,
+            coverage,
+            start=default_start,
+            end=today,
+            known_empty=db_service.get_empty_fetch_windows(network, schema),
+        )
+
+        # 3) fetch missing windows and store them as they arrive
+        batches = data.iter_planned_prices(windows, network=network, max_workers=max_workers)
+        return data.stream_prices_to_db(
+            batches,
+            db_service,
+            schema=schema,
+            journal_network=network,
+            dead_token_network=network,
+            live_tokens=coverage,
+        )
@@ -3,10 +3,12 @@ import os
 class OneInchSettings:
     API_KEY: str = os.environ.get("ONEINCH_API_KEY", "")
     CHAIN_ID: int = int(os.environ.get("ONEINCH_CHAIN_ID", 42161))
+    HOST: str = "api.1inch.dev"
+    TIMEOUT: float = float(os.environ.get("ONEINCH_TIMEOUT", 30))
 
     @property
     def get_tokens_url(self) -> str:
-        return f"https://api.1inch.dev/swap/v6.1/{self.CHAIN_ID}/tokens"
+        return f"https://{self.HOST}/swap/v6.1/{self.CHAIN_ID}/tokens"
 
     @property
     def headers(self) -> dict:
@@ -17,10 +19,25 @@ class OneInchSettings:
 
 class AlchemySettings:
     API_KEY: str = os.environ.get("ALCHEMY_API_KEY", "")
+    # 300 requests per hour allowed: start at 1 request per 13 seconds and let the
+    # adaptive limiter ramp up towards the quota as long as the API doesn't throttle
+    REQUESTS_PER_HOUR: float = float(os.environ.get("ALCHEMY_REQUESTS_PER_HOUR", 3600 / 13))
+    MAX_REQUESTS_PER_HOUR: float = float(os.environ.get("ALCHEMY_MAX_REQUESTS_PER_HOUR", 300))
+    BURST: int = int(os.environ.get("ALCHEMY_BURST", 1))
+    HOST: str = "api.g.alchemy.com"
+    TIMEOUT: float = float(os.environ.get("ALCHEMY_TIMEOUT", 30))
+    # On-disk response cache; empty disables it. OFFLINE replays the cache without network
+    CACHE_DIR: str = os.environ.get("ALCHEMY_CACHE_DIR", "")
+    CACHE_OPEN_WINDOW_TTL: float = float(os.environ.get("ALCHEMY_CACHE_OPEN_WINDOW_TTL", 3600))
+    CACHE_SETTLE_DAYS: float = float(os.environ.get("ALCHEMY_CACHE_SETTLE_DAYS", 7))
+    OFFLINE: bool = os.environ.get("ALCHEMY_OFFLINE", "").lower() in ("1", "true", "yes")
+    # Tokens that returned no prices are skipped until re-probed; errors are retried sooner
+    DEAD_TOKEN_REPROBE_DAYS: float = float(os.environ.get("ALCHEMY_DEAD_TOKEN_REPROBE_DAYS", 30))
+    FAILED_TOKEN_REPROBE_HOURS: float = float(os.environ.get("ALCHEMY_FAILED_TOKEN_REPROBE_HOURS", 24))
 
     @property
     def get_token_historical_prices_url(self) -> str:
-        return f"https://api.g.alchemy.com/prices/v1/{self.API_KEY}/tokens/historical"
+        return f"https://{self.HOST}/prices/v1/{self.API_KEY}/tokens/historical"
 
     @property
     def headers(self) -> dict:
@@ -29,6 +46,12 @@ class AlchemySettings:
         }
 
 
+class HTTPSettings:
+    # Pooled keep-alive connections per API host; should cover the fetch workers
+    POOL_MAXSIZE: int = int(os.environ.get("HTTP_POOL_MAXSIZE", 10))
+
+
 # Singleton instances
 oneinch_settings = OneInchSettings()
 alchemy_settings = AlchemySettings()
+http_settings = HTTPSettings()
@@ -1,11 +1,30 @@
 """Data collection and storage modules."""
-from .db import DBService
+from .db import DBService, UpsertCounts
 from .fetcher import get_available_tokens, get_token_prices
-from .historical_prices import fetch_historical_prices 
+from .historical_prices import PriceBatch, fetch_historical_prices, iter_historical_prices, iter_planned_prices
+from .coverage import TokenCoverage, plan_fetch_windows
+from .pipeline import run_price_pipeline, skip_dead_tokens, stream_prices_to_db
+from .rate_limiter import AdaptiveRateLimiter, TokenBucketRateLimiter
+from .http_client import HTTPClient
+from .response_cache import CacheMissError, ResponseCache
 
 __all__ = [
     "DBService",
+    "UpsertCounts",
     "get_available_tokens",
     "get_token_prices",
-    "fetch_historical_prices"
+    "fetch_historical_prices",
+    "iter_historical_prices",
+    "iter_planned_prices",
+    "TokenCoverage",
+    "plan_fetch_windows",
+    "PriceBatch",
+    "run_price_pipeline",
+    "stream_prices_to_db",
+    "skip_dead_tokens",
+    "TokenBucketRateLimiter",
+    "AdaptiveRateLimiter",
+    "HTTPClient",
+    "ResponseCache",
+    "CacheMissError",
 ]
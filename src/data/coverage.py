@@ -0,0 +1,145 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from src.data.historical_prices import MAX_DAYS_PER_REQUEST
+
+
+class TokenCoverage(NamedTuple):
+    """Days of price data stored for one token."""
+    first_day: date
+    last_day: date
+    n_days: int
+    gaps: List[Tuple[date, date]]  # inclusive (start, end) ranges of missing days
+
+
+def missing_ranges(
+    coverage: Optional[TokenCoverage],
+    start: date,
+    end: date,
+) -> List[Tuple[date, date]]:
+    """
+    Return the inclusive day ranges a token is missing.
+
+    Uncovered tokens miss all of [start, end]. Covered tokens miss the days
+    before their first stored day (if `start` is earlier), every interior gap,
+    and the days after their last stored day up to `end`, all clipped to
+    [start, end].
+    """
+    if coverage is None:
+        return [(start, end)] if start <= end else []
+
+    one_day = timedelta(days=1)
+    ranges = []
+    if start < coverage.first_day:
+        ranges.append((start, min(end, coverage.first_day - one_day)))
+    for gap_start, gap_end in coverage.gaps:
+        gap_start, gap_end = max(gap_start, start), min(gap_end, end)
+        if gap_start <= gap_end:
+            ranges.append((gap_start, gap_end))
+    if coverage.last_day < end:
+        ranges.append((max(start, coverage.last_day + one_day), end))
+    return [(s, e) for s, e in ranges if s <= e]
+
+
+def subtract_ranges(
+    ranges: Iterable[Tuple[date, date]],
+    holes: Iterable[Tuple[date, date]],
+) -> List[Tuple[date, date]]:
+    """Return the parts of the inclusive day `ranges` not covered by any of `holes`."""
+    one_day = timedelta(days=1)
+    holes = sorted(holes)
+    result = []
+    for range_start, range_end in ranges:
+        current = range_start
+        for hole_start, hole_end in holes:
+            if hole_end < current or hole_start > range_end:
+                continue
+            if hole_start > current:
+                result.append((current, hole_start - one_day))
+            current = hole_end + one_day
+            if current > range_end:
+                break
+        if current <= range_end:
+            result.append((current, range_end))
+    return result
+
+
+def merge_ranges(
+    ranges: Iterable[Tuple[date, date]],
+    max_days: int = MAX_DAYS_PER_REQUEST,
+) -> List[Tuple[date, date]]:
+    """
+    Cover day ranges with the fewest request windows of at most `max_days`.
+
+    Windows are opened greedily at the first uncovered missing day and extended
+    over every following range they can reach, which is optimal for
+    fixed-length windows. Each window ends at the last missing day it covers.
+    """
+    span = timedelta(days=max_days - 1)
+    one_day = timedelta(days=1)
+    windows: List[Tuple[date, date]] = []
+
+    for range_start, range_end in sorted(ranges):
+        current = range_start
+        if windows:
+            window_start, window_end = windows[-1]
+            reach = window_start + span
+            if current <= reach:
+                covered_end = min(range_end, reach)
+                windows[-1] = (window_start, max(window_end, covered_end))
+                current = covered_end + one_day
+        while current <= range_end:
+            window_end = min(range_end, current + span)
+            windows.append((current, window_end))
+            current = window_end + one_day
+
+    return windows
+
+
+def plan_fetch_windows(
+    tokens: Iterable[str],
+    coverage: Mapping[str, TokenCoverage],
+    start: date,
+    end: date,
+    max_days: int = MAX_DAYS_PER_REQUEST,
+    known_empty: Iterable[Tuple[str, date, date]] = (),
+) -> List[Tuple[str, datetime, datetime]]:
+    """
+    Plan the minimal set of price requests needed to complete each token.
+
+    Days inside `known_empty` windows (the API already returned nothing for
+    them, e.g. 'empty' fetch journal entries) are not requested again when
+    they lie before a token's last stored day: those are permanent holes
+    upstream. Days after the last stored day are always requested, since
+    recent prices may simply not have been published yet.
+
+    Args:
+        tokens: Token addresses to plan for
+        coverage: Stored coverage per token, e.g. from `DBService.get_price_coverage`
+        start: First day wanted for tokens without stored data
+        end: Last day wanted (inclusive)
+        max_days: Maximum number of days per request window
+        known_empty: (token_address, window_start, window_end) windows known to have no prices
+
+    Returns:
+        List of (token_address, window_start, window_end) request windows
+    """
+    empty_by_token: Dict[str, List[Tuple[date, date]]] = {}
+    for token_address, window_start, window_end in known_empty:
+        empty_by_token.setdefault(token_address, []).append((window_start, window_end))
+
+    plan = []
+    for token_address in dict.fromkeys(tokens):
+        token_coverage = coverage.get(token_address)
+        ranges = missing_ranges(token_coverage, start, end)
+        if token_coverage is not None and token_address in empty_by_token:
+            settled = [r for r in ranges if r[1] < token_coverage.last_day]
+            pending = [r for r in ranges if r[1] >= token_coverage.last_day]
+            ranges = subtract_ranges(settled, empty_by_token[token_address]) + pending
+        for window_start, window_end in merge_ranges(ranges, max_days):
+            plan.append((
+                token_address,
+                datetime.combine(window_start, datetime.min.time()),
+                datetime.combine(window_end, datetime.min.time()),
+            ))
+    return plan
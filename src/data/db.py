@@ -1,21 +1,75 @@
+import csv
+import io
 import logging
+import time
 import psycopg2
 import pandas as pd
 from psycopg2.extensions import connection as Connection
 from psycopg2.extras import execute_values
 from psycopg2 import sql
-from typing import List
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+from src.data.coverage import TokenCoverage
 from src.sql.public import (
     CREATE_CONTRACTS_TABLE_SQL,
     INSERT_CONTRACTS_SQL,
     SELECT_CONTRACTS_SQL,
+    CREATE_FETCH_JOURNAL_TABLE_SQL,
+    UPSERT_FETCH_JOURNAL_SQL,
+    SELECT_FINISHED_FETCH_WINDOWS_SQL,
+    SELECT_COMPLETED_FETCH_TOKENS_SQL,
+    SELECT_EMPTY_FETCH_WINDOWS_SQL,
+    CREATE_TOKEN_INCEPTION_TABLE_SQL,
+    UPSERT_TOKEN_INCEPTION_SQL,
+    SELECT_TOKEN_INCEPTION_SQL,
+    CREATE_DEAD_TOKENS_TABLE_SQL,
+    UPSERT_DEAD_TOKENS_SQL,
+    DELETE_DEAD_TOKENS_SQL,
+    SELECT_DEAD_TOKENS_SQL,
+    CREATE_PRICES_STAGING_TABLE_SQL,
+    COPY_PRICES_STAGING_SQL,
 )
 
 logger = logging.getLogger(__name__)
 
+# Columns of {schema}.prices that `read_prices` can project, with their decoded dtypes
+PRICE_COLUMNS = ("token_address", "value", "timestamp", "market_cap", "total_volume")
+PRICE_FLOAT_COLUMNS = ("value", "market_cap", "total_volume")
+PRICE_COLUMN_DTYPES = {
+    "token_address": str,
+    "value": "float64",
+    "timestamp": "int64",
+    "market_cap": "float64",
+    "total_volume": "float64",
+}
+
+
+class UpsertCounts(NamedTuple):
+    """Outcome of a change-detecting price upsert."""
+    inserted: int
+    updated: int
+    skipped: int  # rows identical to the stored ones, left untouched
+
+
+def _utc_instant(timestamp):
+    """Normalize an ISO timestamp to an aware UTC datetime (naive ones are taken as UTC)."""
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        except ValueError:
+            # Left for Postgres to parse (or reject)
+            return timestamp
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            return timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.astimezone(timezone.utc)
+    return timestamp
+
+
 class DBService:
     def __init__(self, conn: Connection):
         self.conn = conn
+        self._price_schemas: Set[str] = set()
 
     # --- Tokens ---
     def store_tokens(self, tokens: List[str]):
@@ -40,14 +94,246 @@ class DBService:
             logger.exception("Failed to select contract addresses")
             raise
 
+    # --- Fetch journal ---
+    def record_fetch_windows(
+        self,
+        network: str,
+        entries: List[Tuple[str, date, date, str, int, Optional[str]]],
+        schema: str = "backtest",
+    ):
+        """
+        Record the outcome of fetched request windows.
+
+        Args:
+            network: Network identifier
+            entries: (token_address, window_start, window_end, status, n_prices, error)
+                tuples, status being one of 'completed', 'empty' or 'failed'
+            schema: Schema whose prices table the windows were written to
+        """
+        rows = [(network, schema, *entry) for entry in entries]
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(CREATE_FETCH_JOURNAL_TABLE_SQL)
+                execute_values(curs, UPSERT_FETCH_JOURNAL_SQL, rows)
+            self.conn.commit()
+            logger.info("Recorded %d fetch journal entries", len(rows))
+        except Exception as e:
+            self.conn.rollback()
+            logger.exception("Failed to record fetch journal entries")
+            raise e
+
+    def get_finished_fetch_windows(self, network: str, schema: str = "backtest") -> Set[Tuple[str, date, date]]:
+        """Return (token_address, window_start, window_end) windows written to `schema` that need no refetch."""
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(CREATE_FETCH_JOURNAL_TABLE_SQL)
+                curs.execute(SELECT_FINISHED_FETCH_WINDOWS_SQL, (network, schema))
+                rows = curs.fetchall()
+            self.conn.commit()
+            return {(row[0], row[1], row[2]) for row in rows}
+        except Exception:
+            self.conn.rollback()
+            logger.exception("Failed to select finished fetch windows")
+            raise
+
+    def get_empty_fetch_windows(self, network: str, schema: str = "backtest") -> Set[Tuple[str, date, date]]:
+        """Return (token_address, window_start, window_end) windows fetched for `schema` that returned no prices."""
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(CREATE_FETCH_JOURNAL_TABLE_SQL)
+                curs.execute(SELECT_EMPTY_FETCH_WINDOWS_SQL, (network, schema))
+                rows = curs.fetchall()
+            self.conn.commit()
+            return {(row[0], row[1], row[2]) for row in rows}
+        except Exception:
+            self.conn.rollback()
+            logger.exception("Failed to select empty fetch windows")
+            raise
+
+    def get_completed_fetch_tokens(self, network: str, schema: str = "backtest") -> Set[str]:
+        """Return tokens with at least one window the fetch journal lists as completed (returned prices) for `schema`."""
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(CREATE_FETCH_JOURNAL_TABLE_SQL)
+                curs.execute(SELECT_COMPLETED_FETCH_TOKENS_SQL, (network, schema))
+                rows = curs.fetchall()
+            self.conn.commit()
+            return {row[0] for row in rows}
+        except Exception:
+            self.conn.rollback()
+            logger.exception("Failed to select completed fetch tokens")
+            raise
+
+    # --- Token inception ---
+    def store_inception_dates(self, network: str, inception_dates: Dict[str, Optional[date]]):
+        """Cache each token's first priced day (None when no prices were found)."""
+        rows = [(network, token_address, d) for token_address, d in inception_dates.items()]
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(CREATE_TOKEN_INCEPTION_TABLE_SQL)
+                execute_values(curs, UPSERT_TOKEN_INCEPTION_SQL, rows)
+            self.conn.commit()
+            logger.info("Stored %d token inception dates", len(rows))
+        except Exception as e:
+            self.conn.rollback()
+            logger.exception("Failed to store token inception dates")
+            raise e
+
+    def get_inception_dates(self, network: str) -> Dict[str, Optional[date]]:
+        """Return cached inception dates keyed by token address."""
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(CREATE_TOKEN_INCEPTION_TABLE_SQL)
+                curs.execute(SELECT_TOKEN_INCEPTION_SQL, (network,))
+                rows = curs.fetchall()
+            self.conn.commit()
+            return {row[0]: row[1] for row in rows}
+        except Exception:
+            self.conn.rollback()
+            logger.exception("Failed to select token inception dates")
+            raise
+
+    # --- Dead tokens (negative cache) ---
+    def mark_dead_tokens(self, network: str, tokens: Dict[str, Tuple[str, Optional[str]]]):
+        """
+        Record tokens whose fetch returned no prices.
+
+        Args:
+            network: Network identifier
+            tokens: Mapping of token_address to (reason, error), reason being
+                'empty' or 'failed'
+        """
+        rows = [(network, token_address, reason, error) for token_address, (reason, error) in tokens.items()]
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(CREATE_DEAD_TOKENS_TABLE_SQL)
+                execute_values(curs, UPSERT_DEAD_TOKENS_SQL, rows)
+            self.conn.commit()
+            logger.info("Marked %d tokens as dead", len(rows))
+        except Exception as e:
+            self.conn.rollback()
+            logger.exception("Failed to mark dead tokens")
+            raise e
+
+    def clear_dead_tokens(self, network: str, tokens: List[str]):
+        """Remove tokens that returned prices again from the negative cache."""
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(CREATE_DEAD_TOKENS_TABLE_SQL)
+                curs.execute(DELETE_DEAD_TOKENS_SQL, (network, list(tokens)))
+                cleared = curs.rowcount
+            self.conn.commit()
+            if cleared:
+                logger.info("Cleared %d tokens from the dead token list", cleared)
+        except Exception as e:
+            self.conn.rollback()
+            logger.exception("Failed to clear dead tokens")
+            raise e
+
+    def get_dead_tokens(
+        self,
+        network: str,
+        empty_reprobe_after: timedelta,
+        failed_reprobe_after: timedelta,
+    ) -> Set[str]:
+        """Return dead tokens whose last probe is more recent than their re-probe interval."""
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(CREATE_DEAD_TOKENS_TABLE_SQL)
+                curs.execute(SELECT_DEAD_TOKENS_SQL, (network, empty_reprobe_after, failed_reprobe_after))
+                rows = curs.fetchall()
+            self.conn.commit()
+            return {row[0] for row in rows}
+        except Exception:
+            self.conn.rollback()
+            logger.exception("Failed to select dead tokens")
+            raise
+
     # --- Prices ---
-    def store_prices(self, token_address: str, prices: List[dict], schema: str="backtest"):
+    def _create_price_schema(self, curs, schema: str):
+        # Look the table up in the catalog first: the DDL below locks prices
+        # (ALTER TABLE takes an ACCESS EXCLUSIVE lock even when it is a no-op),
+        # blocking concurrent readers and writers, so it only runs until the
+        # table has its latest column
+        curs.execute(
+            """
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = 'prices' AND column_name = 'updated_at'
+            """,
+            (schema,),
+        )
+        if curs.fetchone() is not None:
+            return
+        curs.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(schema)))
+        curs.execute(
+            sql.SQL("""
+                CREATE TABLE IF NOT EXISTS {}.prices(
+                    uid UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+                    token_address TEXT NOT NULL,
+                    value NUMERIC NOT NULL,
+                    timestamp TIMESTAMPTZ NOT NULL,
+                    market_cap NUMERIC,
+                    total_volume NUMERIC,
+                    created_at TIMESTAMPTZ DEFAULT NOW(),
+                    UNIQUE(token_address, timestamp)
+                )
+            """).format(sql.Identifier(schema))
+        )
+        curs.execute(
+            sql.SQL("""
+                CREATE INDEX IF NOT EXISTS idx_prices_token_address ON {}.prices(token_address)
+            """).format(sql.Identifier(schema))
+        )
+        curs.execute(
+            sql.SQL("""
+                CREATE INDEX IF NOT EXISTS idx_prices_timestamp ON {}.prices(timestamp)
+            """).format(sql.Identifier(schema))
+        )
+        # Last write time of each row; the watermark for incremental snapshot refreshes
+        curs.execute(
+            sql.SQL("""
+                ALTER TABLE {}.prices ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW()
+            """).format(sql.Identifier(schema))
+        )
+        curs.execute(
+            sql.SQL("""
+                CREATE INDEX IF NOT EXISTS idx_prices_updated_at ON {}.prices(updated_at)
+            """).format(sql.Identifier(schema))
+        )
+
+    def ensure_price_schema(self, schema: str = "backtest"):
+        """
+        Create `{schema}.prices` and its indexes if needed.
+
+        Checks the catalog once per schema and DBService instance and runs the
+        DDL only when the table or its latest column is missing; later calls
+        (and the store methods, which call it lazily) are no-ops.
+        """
+        if schema in self._price_schemas:
+            return
+        try:
+            with self.conn.cursor() as curs:
+                self._create_price_schema(curs, schema)
+            self.conn.commit()
+            self._price_schemas.add(schema)
+        except Exception as e:
+            self.conn.rollback()
+            logger.exception("Failed to create prices table")
+            raise e
+
+    def store_prices(self, token_address: str, prices: List[dict], schema: str="backtest") -> UpsertCounts:
         """
         Store daily price data for a token.
+
+        Existing rows are only rewritten when value, market_cap or total_volume
+        changed, so overlapping refreshes don't create dead tuples.
         
         Args:
             token_address: The token contract address
             prices: List of price dictionaries with keys: value, timestamp, marketCap, totalVolume
+
+        Returns:
+            UpsertCounts: Number of inserted, updated and skipped rows
         """
         rows = [
             (
@@ -61,62 +347,131 @@ class DBService:
         ]
         try:
             with self.conn.cursor() as curs:
-                curs.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(schema)))
-                curs.execute(
-                    sql.SQL("""
-                        CREATE TABLE IF NOT EXISTS {}.prices(
-                            uid UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-                            token_address TEXT NOT NULL,
-                            value NUMERIC NOT NULL,
-                            timestamp TIMESTAMPTZ NOT NULL,
-                            market_cap NUMERIC,
-                            total_volume NUMERIC,
-                            created_at TIMESTAMPTZ DEFAULT NOW(),
-                            UNIQUE(token_address, timestamp)
-                        )
-                    """).format(sql.Identifier(schema))
-                )
-                curs.execute(
-                    sql.SQL("""
-                        CREATE INDEX IF NOT EXISTS idx_prices_token_address ON {}.prices(token_address)
-                    """).format(sql.Identifier(schema))
-                )
-                curs.execute(
-                    sql.SQL("""
-                        CREATE INDEX IF NOT EXISTS idx_prices_timestamp ON {}.prices(timestamp)
-                    """).format(sql.Identifier(schema))
-                )
-                execute_values(
+                if schema not in self._price_schemas:
+                    self._create_price_schema(curs, schema)
+                written = execute_values(
                     curs,
                     sql.SQL("""
-                        INSERT INTO {}.prices(token_address, value, timestamp, market_cap, total_volume)
+                        INSERT INTO {}.prices AS p(token_address, value, timestamp, market_cap, total_volume)
                         VALUES %s
                         ON CONFLICT (token_address, timestamp) DO UPDATE SET
                             value = EXCLUDED.value,
                             market_cap = EXCLUDED.market_cap,
-                            total_volume = EXCLUDED.total_volume;
+                            total_volume = EXCLUDED.total_volume,
+                            updated_at = NOW()
+                        WHERE (p.value, p.market_cap, p.total_volume)
+                            IS DISTINCT FROM (EXCLUDED.value, EXCLUDED.market_cap, EXCLUDED.total_volume)
+                        RETURNING (xmax = 0);
                     """).format(sql.Identifier(schema)),
-                    rows)
+                    rows,
+                    fetch=True)
             self.conn.commit()
-            logger.info("Inserted %d prices for token %s", len(prices), token_address)
+            self._price_schemas.add(schema)
+            inserted = sum(1 for row in written if row[0])
+            counts = UpsertCounts(inserted, len(written) - inserted, len(rows) - len(written))
+            logger.info(
+                "Stored prices for token %s: %d inserted, %d updated, %d unchanged",
+                token_address, *counts,
+            )
+            return counts
         except Exception as e:
             self.conn.rollback()
             logger.exception("Failed to insert prices")
             raise e
 
-    def get_prices(self, schema: str="backtest"):
+    def store_prices_bulk(self, prices_by_token: Mapping[str, List[dict]], schema: str = "backtest") -> UpsertCounts:
+        """
+        Store daily price data for many tokens in one transaction.
+
+        Rows are streamed with COPY into a session-local staging table (temporary,
+        hence unlogged, and emptied on commit) and merged into `{schema}.prices`
+        with a single INSERT ... SELECT ... ON CONFLICT statement that only
+        rewrites rows whose value, market_cap or total_volume changed. Duplicate
+        (token, timestamp) rows keep the last occurrence, timestamps being
+        compared as UTC instants (so "...Z" and "...+00:00" are the same row);
+        rows without a value or timestamp are dropped.
+
+        Args:
+            prices_by_token: Mapping of token address to price dictionaries with
+                keys: value, timestamp, marketCap, totalVolume
+            schema: Target schema for the prices table
+
+        Returns:
+            UpsertCounts: Number of inserted, updated and skipped rows
+        """
+        rows = {}
+        for token_address, prices in prices_by_token.items():
+            for price in prices:
+                if price.get("value") is None or price.get("timestamp") is None:
+                    continue
+                timestamp = price.get("timestamp")
+                rows[(token_address, _utc_instant(timestamp))] = (
+                    timestamp, price.get("value"), price.get("marketCap"), price.get("totalVolume"),
+                )
+        if not rows:
+            return UpsertCounts(0, 0, 0)
+
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for (token_address, _), (timestamp, value, market_cap, total_volume) in rows.items():
+            writer.writerow((token_address, value, timestamp, market_cap, total_volume))
+        buf.seek(0)
+
+        self.ensure_price_schema(schema)
+        started = time.perf_counter()
         try:
             with self.conn.cursor() as curs:
+                curs.execute(CREATE_PRICES_STAGING_TABLE_SQL)
+                curs.copy_expert(COPY_PRICES_STAGING_SQL, buf)
                 curs.execute(
                     sql.SQL("""
-                        SELECT * FROM {}.prices;
+                        WITH merged AS (
+                            INSERT INTO {}.prices AS p(token_address, value, timestamp, market_cap, total_volume)
+                            SELECT DISTINCT ON (token_address, timestamp)
+                                token_address, value, timestamp, market_cap, total_volume
+                            FROM prices_staging
+                            ORDER BY token_address, timestamp
+                            ON CONFLICT (token_address, timestamp) DO UPDATE SET
+                                value = EXCLUDED.value,
+                                market_cap = EXCLUDED.market_cap,
+                                total_volume = EXCLUDED.total_volume,
+                                updated_at = NOW()
+                            WHERE (p.value, p.market_cap, p.total_volume)
+                                IS DISTINCT FROM (EXCLUDED.value, EXCLUDED.market_cap, EXCLUDED.total_volume)
+                            RETURNING (xmax = 0) AS inserted
+                        )
+                        SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted)
+                        FROM merged;
                     """).format(sql.Identifier(schema))
                 )
+                inserted, updated = curs.fetchone()
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            logger.exception("Failed to bulk insert prices")
+            raise e
+
+        elapsed = time.perf_counter() - started
+        counts = UpsertCounts(inserted, updated, len(rows) - inserted - updated)
+        logger.info(
+            "Bulk stored %d prices for %d tokens in %.2fs (%.0f rows/sec): %d inserted, %d updated, %d unchanged",
+            len(rows), len(prices_by_token), elapsed, len(rows) / elapsed if elapsed > 0 else float("inf"),
+            *counts,
+        )
+        return counts
+
+    def get_prices(self, schema: str="backtest"):
+        # Columns are listed: the table may carry more (updated_at) than this frame returns
+        columns = ['uid', 'token_address', 'value', 'timestamp', 'market_cap', 'total_volume', 'created_at']
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(
+                    sql.SQL("""
+                        SELECT {} FROM {}.prices;
+                    """).format(sql.SQL(", ").join(map(sql.Identifier, columns)), sql.Identifier(schema))
+                )
                 rows = curs.fetchall()
-                df = pd.DataFrame(rows, columns=[
-                    'uid', 'token_address', 'value', 'timestamp',
-                    'market_cap', 'total_volume', 'created_at'
-                ])
+                df = pd.DataFrame(rows, columns=columns)
                 # Convert to strings
                 df['uid'] = df['uid'].astype(str)
                 df['token_address'] = df['token_address'].astype(str)
@@ -132,6 +487,224 @@ class DBService:
             logger.exception("Failed to get all crypto prices")
             raise
 
+    @staticmethod
+    def _price_filters(
+        start: Optional[datetime],
+        end: Optional[datetime],
+        tokens: Optional[Iterable[str]],
+        exclude_tokens: Optional[Iterable[str]],
+        changed_since: Optional[datetime] = None,
+    ) -> Tuple[sql.Composable, list]:
+        """Build the WHERE clause (possibly empty) and its parameters for price reads."""
+        conditions, params = [], []
+        if changed_since is not None:
+            conditions.append(sql.SQL("updated_at > %s"))
+            params.append(changed_since)
+        if start is not None:
+            conditions.append(sql.SQL("timestamp >= %s"))
+            params.append(start)
+        if end is not None:
+            conditions.append(sql.SQL("timestamp <= %s"))
+            params.append(end)
+        if tokens is not None:
+            conditions.append(sql.SQL("token_address = ANY(%s)"))
+            params.append(list(tokens))
+        if exclude_tokens:
+            conditions.append(sql.SQL("NOT (token_address = ANY(%s))"))
+            params.append(list(exclude_tokens))
+        if not conditions:
+            return sql.SQL(""), params
+        return sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions), params
+
+    def read_prices(
+        self,
+        schema: str = "backtest",
+        columns: Optional[Sequence[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        tokens: Optional[Iterable[str]] = None,
+        exclude_tokens: Optional[Iterable[str]] = None,
+        changed_since: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """
+        Read selected price columns with filters applied in SQL.
+
+        Rows are streamed with COPY ... TO STDOUT as CSV and parsed straight
+        into typed columns: NUMERIC columns become float64, token_address is
+        a string and timestamp is read as epoch seconds (int64) and returned
+        as a UTC datetime64 column.
+
+        Args:
+            schema: Schema holding the prices table
+            columns: Columns to read (default: all of PRICE_COLUMNS)
+            start: Earliest timestamp to include
+            end: Latest timestamp to include
+            tokens: Only read these token addresses
+            exclude_tokens: Skip these token addresses (e.g. stablecoins)
+            changed_since: Only read rows inserted or updated after this time
+
+        Returns:
+            pd.DataFrame: One row per stored price with the requested columns
+        """
+        columns = list(columns or PRICE_COLUMNS)
+        unknown = [c for c in columns if c not in PRICE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown price columns: {unknown}")
+
+        select = [
+            sql.SQL("EXTRACT(EPOCH FROM timestamp)::BIGINT") if c == "timestamp"
+            else sql.SQL("{}::FLOAT8").format(sql.Identifier(c)) if c in PRICE_FLOAT_COLUMNS
+            else sql.Identifier(c)
+            for c in columns
+        ]
+        where, params = self._price_filters(start, end, tokens, exclude_tokens, changed_since)
+        query = sql.SQL("COPY (SELECT {} FROM {}.prices{}) TO STDOUT WITH (FORMAT csv)").format(
+            sql.SQL(", ").join(select),
+            sql.Identifier(schema),
+            where,
+        )
+
+        buf = io.StringIO()
+        try:
+            with self.conn.cursor() as curs:
+                statement = curs.mogrify(query, params)
+                if isinstance(statement, bytes):
+                    statement = statement.decode()
+                curs.copy_expert(statement, buf)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            logger.exception("Failed to read prices")
+            raise
+
+        buf.seek(0)
+        dtypes = {c: PRICE_COLUMN_DTYPES[c] for c in columns}
+        if not buf.getvalue():
+            df = pd.DataFrame({c: pd.Series(dtype=t) for c, t in dtypes.items()})
+        else:
+            df = pd.read_csv(buf, header=None, names=columns, dtype=dtypes, keep_default_na=False, na_values=[""])
+        if "timestamp" in df:
+            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", utc=True)
+        logger.info("Read %d prices (%s) from %s.prices", len(df), ", ".join(columns), schema)
+        return df
+
+    def iter_prices(
+        self,
+        schema: str = "backtest",
+        columns: Optional[Sequence[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        tokens: Optional[Iterable[str]] = None,
+        exclude_tokens: Optional[Iterable[str]] = None,
+        chunk_size: int = 100_000,
+        by_token: bool = False,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream prices ordered by (token_address, timestamp) in DataFrame chunks.
+
+        Rows are read through a named (server-side) cursor, so at most
+        `chunk_size` rows are held as Python tuples at a time. Columns are
+        typed as in `read_prices`.
+
+        With `by_token`, chunks are cut at token boundaries: every yielded
+        frame holds complete tokens (a token larger than `chunk_size` comes in
+        one frame of its own size), so consumers can process token groups
+        independently.
+
+        Args:
+            schema: Schema holding the prices table
+            columns: Columns to read (default: all of PRICE_COLUMNS)
+            start: Earliest timestamp to include
+            end: Latest timestamp to include
+            tokens: Only read these token addresses
+            exclude_tokens: Skip these token addresses (e.g. stablecoins)
+            chunk_size: Rows fetched from the server per round trip
+            by_token: Yield only complete token groups
+
+        Yields:
+            pd.DataFrame: Consecutive chunks of the ordered result
+        """
+        columns = list(columns or PRICE_COLUMNS)
+        unknown = [c for c in columns if c not in PRICE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown price columns: {unknown}")
+        if by_token and "token_address" not in columns:
+            raise ValueError("by_token requires the token_address column")
+
+        select = [
+            sql.SQL("{}::FLOAT8").format(sql.Identifier(c)) if c in PRICE_FLOAT_COLUMNS else sql.Identifier(c)
+            for c in columns
+        ]
+        where, params = self._price_filters(start, end, tokens, exclude_tokens)
+        query = sql.SQL("SELECT {} FROM {}.prices{} ORDER BY token_address, timestamp").format(
+            sql.SQL(", ").join(select),
+            sql.Identifier(schema),
+            where,
+        )
+
+        def to_frame(rows) -> pd.DataFrame:
+            df = pd.DataFrame.from_records(rows, columns=columns)
+            for c in columns:
+                if c in PRICE_FLOAT_COLUMNS:
+                    df[c] = df[c].astype("float64")
+                elif c == "timestamp":
+                    df[c] = pd.to_datetime(df[c], utc=True)
+            return df
+
+        carry = None
+        n_rows = 0
+        try:
+            with self.conn.cursor(name=f"iter_prices_{schema}") as curs:
+                curs.itersize = chunk_size
+                curs.execute(query, params)
+                while True:
+                    rows = curs.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    n_rows += len(rows)
+                    chunk = to_frame(rows)
+                    if not by_token:
+                        yield chunk
+                        continue
+
+                    if carry is not None:
+                        chunk = pd.concat([carry, chunk], ignore_index=True)
+                    is_last = chunk["token_address"].to_numpy() == chunk["token_address"].iat[-1]
+                    carry = chunk[is_last].reset_index(drop=True)
+                    if not is_last.all():
+                        yield chunk[~is_last].reset_index(drop=True)
+            self.conn.commit()
+        except GeneratorExit:
+            # Consumer stopped early: end the read transaction holding the cursor
+            self.conn.rollback()
+            raise
+        except Exception:
+            self.conn.rollback()
+            logger.exception("Failed to stream prices")
+            raise
+
+        if carry is not None and not carry.empty:
+            yield carry
+        logger.info("Streamed %d prices from %s.prices", n_rows, schema)
+
+    def get_price_watermark(self, schema: str = "backtest") -> Tuple[Optional[datetime], int]:
+        """Return the latest row write time (updated_at) and the row count of `{schema}.prices`."""
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(
+                    sql.SQL("""
+                        SELECT MAX(updated_at), COUNT(*)
+                        FROM {}.prices;
+                    """).format(sql.Identifier(schema))
+                )
+                row = curs.fetchone()
+            self.conn.commit()
+            return row[0], row[1]
+        except Exception:
+            self.conn.rollback()
+            logger.exception("Failed to get price watermark")
+            raise
+
     def get_latest_price_date(self, schema: str = "backtest"):
         try:
             with self.conn.cursor() as curs:
@@ -151,6 +724,44 @@ class DBService:
             logger.exception("Failed to get latest crypto price timestamp")
             raise
 
+    def get_price_coverage(self, schema: str = "backtest") -> Dict[str, TokenCoverage]:
+        """
+        Return per-token coverage (first day, last day, day count and missing-day
+        ranges) computed in a single aggregate query.
+        """
+        try:
+            with self.conn.cursor() as curs:
+                curs.execute(
+                    sql.SQL("""
+                        WITH days AS (
+                            SELECT
+                                token_address,
+                                (timestamp AT TIME ZONE 'UTC')::date AS day,
+                                LAG((timestamp AT TIME ZONE 'UTC')::date) OVER (
+                                    PARTITION BY token_address ORDER BY timestamp
+                                ) AS prev_day
+                            FROM {}.prices
+                        )
+                        SELECT
+                            token_address,
+                            MIN(day),
+                            MAX(day),
+                            COUNT(*),
+                            COALESCE(ARRAY_AGG(prev_day + 1 ORDER BY day) FILTER (WHERE day - prev_day > 1), ARRAY[]::date[]),
+                            COALESCE(ARRAY_AGG(day - 1 ORDER BY day) FILTER (WHERE day - prev_day > 1), ARRAY[]::date[])
+                        FROM days
+                        GROUP BY token_address;
+                    """).format(sql.Identifier(schema))
+                )
+                rows = curs.fetchall()
+                return {
+                    row[0]: TokenCoverage(row[1], row[2], row[3], list(zip(row[4], row[5])))
+                    for row in rows
+                }
+        except Exception:
+            logger.exception("Failed to get price coverage")
+            raise
+
     def get_prices_distinct_tokens(self, schema: str="backtest"):
         try:
             with self.conn.cursor() as curs:
@@ -2,17 +2,50 @@ import os
 import time
 import requests
 import logging
-from typing import Generator
+from typing import Generator, Optional
 from datetime import datetime
 from typing import Union
-from src.config import oneinch_settings, alchemy_settings
+from src.config import oneinch_settings, alchemy_settings, http_settings
+from src.data.http_client import HTTPClient
+from src.data.response_cache import ResponseCache
+from src.data.rate_limiter import (
+    AdaptiveRateLimiter,
+    TokenBucketRateLimiter,
+    backoff_delay,
+    parse_retry_after,
+)
 
 logger = logging.getLogger(__name__)
 
-# Rate limiting: 300 requests per hour = 1 request per 12 seconds
-# Use 13 seconds to be safe
-MIN_REQUEST_INTERVAL = 13  # seconds
-_last_request_time = 0
+# Keep-alive sessions shared by all 1inch and Alchemy calls
+http_client = HTTPClient(
+    pool_maxsize=http_settings.POOL_MAXSIZE,
+    timeouts={
+        oneinch_settings.HOST: oneinch_settings.TIMEOUT,
+        alchemy_settings.HOST: alchemy_settings.TIMEOUT,
+    },
+)
+
+# Rate limiting: one limiter shared by every thread issuing Alchemy requests
+_rate_limiter = AdaptiveRateLimiter(
+    requests_per_hour=alchemy_settings.REQUESTS_PER_HOUR,
+    burst=alchemy_settings.BURST,
+    max_requests_per_hour=alchemy_settings.MAX_REQUESTS_PER_HOUR,
+)
+
+# Optional on-disk cache of Alchemy responses (disabled unless ALCHEMY_CACHE_DIR is set)
+_response_cache = (
+    ResponseCache(
+        alchemy_settings.CACHE_DIR,
+        open_window_ttl=alchemy_settings.CACHE_OPEN_WINDOW_TTL,
+        offline=alchemy_settings.OFFLINE,
+        settle_period=alchemy_settings.CACHE_SETTLE_DAYS * 86400,
+    )
+    if alchemy_settings.CACHE_DIR else None
+)
+
+# Upper bound for a single backoff delay after a 429 without Retry-After
+MAX_RETRY_DELAY = 300  # seconds
 
 def get_available_tokens() -> Generator[str, None, None]:
     """
@@ -25,7 +58,7 @@ def get_available_tokens() -> Generator[str, None, None]:
         RuntimeError: If the API response does not contain a 'tokens' key.
         requests.HTTPError: If the API request fails.
     """
-    resp = requests.get(oneinch_settings.get_tokens_url, headers=oneinch_settings.headers)
+    resp = http_client.get(oneinch_settings.get_tokens_url, headers=oneinch_settings.headers)
     resp.raise_for_status()
     data = resp.json()
     tokens = data.get("tokens")
@@ -35,18 +68,80 @@ def get_available_tokens() -> Generator[str, None, None]:
         yield addr
 
 
-def _rate_limit():
-    """Ensure we don't exceed the API rate limit (300 requests/hour)."""
-    global _last_request_time
-    current_time = time.time()
-    time_since_last = current_time - _last_request_time
-    
-    if time_since_last < MIN_REQUEST_INTERVAL:
-        wait_time = MIN_REQUEST_INTERVAL - time_since_last
-        logger.info(f"Rate limiting: waiting {wait_time:.2f} seconds to respect API limit (300 req/hour)")
-        time.sleep(wait_time)
-    
-    _last_request_time = time.time()
+def get_rate_limiter() -> TokenBucketRateLimiter:
+    """Return the limiter shared by all `get_token_prices` calls."""
+    return _rate_limiter
+
+
+def set_rate_limiter(rate_limiter: TokenBucketRateLimiter):
+    """Replace the shared limiter, e.g. to use a different quota or burst size."""
+    global _rate_limiter
+    _rate_limiter = rate_limiter
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the response cache used by `get_token_prices`, if any."""
+    return _response_cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]):
+    """Enable, replace or (with None) disable the shared response cache."""
+    global _response_cache
+    _response_cache = cache
+
+
+def _rate_limit(rate_limiter: Optional[TokenBucketRateLimiter] = None):
+    """Ensure we don't exceed the API rate limit, blocking until a request slot is free."""
+    (rate_limiter or _rate_limiter).acquire()
+
+
+def _request_prices(
+    payload: dict,
+    limiter: TokenBucketRateLimiter,
+    max_retries: int,
+    retry_delay: float,
+) -> dict:
+    """POST a historical prices request, retrying on 429, and return the JSON body."""
+    resp = None
+    for attempt in range(max_retries + 1):
+        # Every attempt, including retries, consumes a slot of the shared quota
+        _rate_limit(limiter)
+        resp = http_client.post(
+            alchemy_settings.get_token_historical_prices_url,
+            json=payload,
+            headers=alchemy_settings.headers
+        )
+        logger.debug(f"Status code: {resp.status_code}")
+        logger.debug(f"Response body: {resp.text}")
+
+        if resp.status_code != 429:
+            resp.raise_for_status()
+            limiter.record_success(resp.headers)
+            break
+
+        # Rate limited: honour Retry-After, otherwise back off exponentially with jitter.
+        # The pause is applied to the shared limiter so all workers slow down together.
+        try:
+            error_data = resp.json() if resp.text else {}
+            error_msg = error_data.get("error", {}).get("message", "Rate limit exceeded")
+        except ValueError:
+            error_msg = "Rate limit exceeded"
+
+        wait_time = parse_retry_after(resp.headers)
+        if wait_time is None:
+            wait_time = backoff_delay(attempt, retry_delay, MAX_RETRY_DELAY)
+        limiter.record_throttle(wait_time)
+
+        if attempt >= max_retries:
+            logger.error(f"Rate limit exceeded after {max_retries} retries. Error: {error_msg}")
+            resp.raise_for_status()
+
+        logger.warning(
+            f"Rate limit exceeded (429). Waiting {wait_time:.1f} seconds before retry "
+            f"({attempt + 1}/{max_retries}). Error: {error_msg}"
+        )
+
+    return resp.json()
 
 
 def get_token_prices(
@@ -54,8 +149,10 @@ def get_token_prices(
     address: str = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48",
     start: Union[datetime, float] = 1704067200,
     end: Union[datetime, float] = 1706745599,
-    max_retries: int = 3,
-    retry_delay: int = 60,
+    max_retries: int = 5,
+    retry_delay: float = 5,
+    rate_limiter: Optional[TokenBucketRateLimiter] = None,
+    cache: Optional[ResponseCache] = None,
 ) -> Generator[dict, None, None]:
     """
     Yield historical token prices from the API.
@@ -65,8 +162,13 @@ def get_token_prices(
         address (str): Token contract address (default USDC).
         start (datetime | float): Start time (datetime or epoch timestamp).
         end (datetime | float): End time (datetime or epoch timestamp).
-        max_retries (int): Maximum number of retries for rate limit errors (default 3).
-        retry_delay (int): Delay in seconds before retrying after rate limit (default 60).
+        max_retries (int): Maximum number of retries for rate limit errors (default 5).
+        retry_delay (float): Base delay in seconds of the jittered exponential backoff
+            used when a 429 response has no Retry-After header (default 5).
+        rate_limiter (TokenBucketRateLimiter): Limiter to draw request slots from
+            (default: the module-wide shared limiter).
+        cache (ResponseCache): Response cache to read from and write to
+            (default: the module-wide cache, enabled by ALCHEMY_CACHE_DIR).
 
     Yields:
         dict: A dictionary representing a price point.
@@ -86,52 +188,12 @@ def get_token_prices(
         "withMarketData": True
     }
 
-    # Apply rate limiting
-    _rate_limit()
-
-    resp = None
-    for attempt in range(max_retries + 1):
-        try:
-            resp = requests.post(
-                alchemy_settings.get_token_historical_prices_url,
-                json=payload,
-                headers=alchemy_settings.headers
-            )
-            logger.debug(f"Status code: {resp.status_code}")
-            logger.debug(f"Response body: {resp.text}")
-            
-            # Handle rate limit errors
-            if resp.status_code == 429:
-                error_data = resp.json() if resp.text else {}
-                error_msg = error_data.get("error", {}).get("message", "Rate limit exceeded")
-                
-                if attempt < max_retries:
-                    wait_time = retry_delay * (attempt + 1)  # Exponential backoff
-                    logger.warning(
-                        f"Rate limit exceeded (429). Waiting {wait_time} seconds before retry "
-                        f"({attempt + 1}/{max_retries}). Error: {error_msg}"
-                    )
-                    time.sleep(wait_time)
-                    # Reset rate limiter after waiting
-                    global _last_request_time
-                    _last_request_time = time.time()
-                    continue
-                else:
-                    logger.error(f"Rate limit exceeded after {max_retries} retries. Error: {error_msg}")
-                    resp.raise_for_status()
-            
-            resp.raise_for_status()
-            
-            # Success - break out of retry loop
-            break
-            
-        except requests.exceptions.HTTPError as e:
-            # Check if it's a 429 error and we can retry
-            if resp and resp.status_code == 429 and attempt < max_retries:
-                continue  # Will retry (already handled above, but catch here too)
-            raise  # Re-raise if not a retryable error or out of retries
-
-    response_json = resp.json()
+    cache = cache or _response_cache
+    response_json = cache.get(payload) if cache is not None else None
+    if response_json is None:
+        response_json = _request_prices(payload, rate_limiter or _rate_limiter, max_retries, retry_delay)
+        if cache is not None:
+            cache.put(payload, response_json)
     
     # Check if 'data' key exists in response
     if "data" not in response_json:
@@ -1,6 +1,7 @@
 import logging
-from datetime import datetime, timedelta
-from typing import Iterable, Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, datetime, timedelta
+from typing import Container, Iterable, Iterator, Dict, List, Mapping, NamedTuple, Optional, Any, Tuple
 
 from src.data.fetcher import get_token_prices
 
@@ -13,23 +14,149 @@ DEFAULT_END_DATE = datetime.now()
 MAX_DAYS_PER_REQUEST = 365
 
 
-def fetch_historical_prices(
+class PriceBatch(NamedTuple):
+    """Prices returned for one token and one request window."""
+    token_address: str
+    start: datetime
+    end: datetime
+    prices: List[Any]
+    error: Optional[Exception] = None
+
+
+def split_date_range(
+    start_date: datetime,
+    end_date: datetime,
+    max_days: int = MAX_DAYS_PER_REQUEST,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Split an inclusive date range into consecutive request windows.
+
+    Args:
+        start_date: First day of the range
+        end_date: Last day of the range (inclusive)
+        max_days: Maximum number of days covered by one window
+
+    Returns:
+        List of (window_start, window_end) tuples
+    """
+    windows = []
+    current_start = start_date
+    while current_start <= end_date:
+        current_end = min(current_start + timedelta(days=max_days - 1), end_date)
+        windows.append((current_start, current_end))
+        current_start = current_end + timedelta(days=1)
+    return windows
+
+
+def _fetch_window(
+    network: str,
+    token_address: str,
+    start: datetime,
+    end: datetime,
+    batch_num: int,
+) -> List[Any]:
+    """Fetch one request window for one token and log the outcome."""
+    logger.info(
+        f"Fetching batch {batch_num} for token {token_address}: "
+        f"{start.date()} to {end.date()}"
+    )
+
+    batch_prices = list(
+        get_token_prices(
+            network=network,
+            address=token_address,
+            start=start,
+            end=end,
+        )
+    )
+
+    if batch_prices:
+        logger.info(
+            f"Fetched {len(batch_prices)} prices for batch {batch_num} "
+            f"of token {token_address}"
+        )
+    else:
+        logger.warning(f"No prices found for batch {batch_num} of token {token_address}")
+
+    return batch_prices
+
+
+def run_concurrently(func, tasks: Iterable[tuple], max_workers: int) -> Iterator[Tuple[tuple, Any, Optional[Exception]]]:
+    """
+    Run `func(*task)` for every task on a thread pool.
+
+    At most `2 * max_workers` tasks are in flight at any time, so a slow
+    consumer of this generator also throttles submission. With
+    `max_workers <= 1` tasks run inline, in order.
+
+    Yields:
+        (task, result, error) tuples in completion order
+    """
+    if max_workers <= 1:
+        for task in tasks:
+            try:
+                yield task, func(*task), None
+            except Exception as e:
+                yield task, None, e
+        return
+
+    task_iter = iter(tasks)
+    max_in_flight = 2 * max_workers
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        try:
+            while True:
+                for task in task_iter:
+                    pending[executor.submit(func, *task)] = task
+                    if len(pending) >= max_in_flight:
+                        break
+                if not pending:
+                    return
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = pending.pop(future)
+                    error = future.exception()
+                    yield task, (None if error else future.result()), error
+        finally:
+            # Consumer stopped early (generator closed): drop queued tasks, so
+            # only the requests already running are waited for
+            for future in pending:
+                future.cancel()
+
+
+def iter_historical_prices(
     tokens: Iterable[str],
     network: str = "arb-mainnet",
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-) -> Dict[str, List[Any]]:
+    max_workers: int = 1,
+    skip_windows: Optional[Container[Tuple[str, date, date]]] = None,
+    start_dates: Optional[Mapping[str, datetime]] = None,
+) -> Iterator[PriceBatch]:
     """
-    Fetch historical prices for the given tokens.
+    Stream historical prices for the given tokens, one window at a time.
+
+    A `PriceBatch` is yielded as soon as its request completes, so callers can
+    persist prices while the rest are still being fetched. Requests are
+    submitted lazily: a consumer that stops pulling also stops new requests.
+    A failed window yields a batch with `error` set and no prices; no further
+    windows of that token are requested, but windows already in flight are
+    yielded as usual.
 
     Args:
         tokens: Iterable of token addresses
         network: Network identifier
         start_date: Start date (default: Ethereum launch date)
         end_date: End date (default: now)
+        max_workers: Number of concurrent request workers (default: 1, sequential)
+        skip_windows: (token_address, window_start, window_end) dates of windows
+            already fetched, e.g. from the fetch journal; these are not requested
+        start_dates: Per-token start dates, e.g. inception dates; a token starts
+            at the window holding the later of its own start date and `start_date`
 
-    Returns:
-        Dict[token_address, list_of_prices]
+    Yields:
+        PriceBatch: (token_address, start, end, prices, error) per request window
     """
     if start_date is None:
         start_date = DEFAULT_START_DATE
@@ -39,59 +166,132 @@ def fetch_historical_prices(
     token_list = list(tokens)
     if not token_list:
         logger.info("No tokens provided. Skipping price fetch.")
-        return {}
+        return
 
     logger.info(f"Found {len(token_list)} tokens. Fetching historical prices...")
 
-    prices_by_token: Dict[str, List[Any]] = {}
+    windows = split_date_range(start_date, end_date)
     total_tokens = len(token_list)
+    failed = set()
+    skipped = 0
 
-    for i, token_address in enumerate(token_list, start=1):
-        try:
+    def token_windows(token_address: str) -> List[Tuple[datetime, datetime]]:
+        token_start = start_dates.get(token_address) if start_dates else None
+        if token_start is None or token_start <= start_date:
+            return windows
+        # Stay on the shared window grid, so windows match the inception
+        # probes and the fetch journal, starting at the one holding token_start
+        return [w for w in windows if w[1] >= token_start]
+
+    def tasks():
+        nonlocal skipped
+        for i, token_address in enumerate(token_list, start=1):
             logger.info(f"[{i}/{total_tokens}] Fetching prices for token: {token_address}")
+            for batch_num, (window_start, window_end) in enumerate(token_windows(token_address), start=1):
+                # Stop issuing requests for a token as soon as one of its windows failed
+                if token_address in failed:
+                    break
+                if skip_windows is not None and \
+                        (token_address, window_start.date(), window_end.date()) in skip_windows:
+                    skipped += 1
+                    continue
+                yield network, token_address, window_start, window_end, batch_num
 
-            all_prices: List[Any] = []
-            current_start = start_date
-            batch_num = 1
-
-            while current_start <= end_date:
-                current_end = min(
-                    current_start + timedelta(days=MAX_DAYS_PER_REQUEST - 1),
-                    end_date,
-                )
-
-                logger.info(
-                    f"Fetching batch {batch_num} for token {token_address}: "
-                    f"{current_start.date()} to {current_end.date()}"
-                )
-
-                batch_prices = list(
-                    get_token_prices(
-                        network=network,
-                        address=token_address,
-                        start=current_start,
-                        end=current_end,
-                    )
-                )
-
-                if batch_prices:
-                    all_prices.extend(batch_prices)
-                    logger.info(
-                        f"Fetched {len(batch_prices)} prices for batch {batch_num} "
-                        f"of token {token_address}"
-                    )
-                else:
-                    logger.warning(f"No prices found for batch {batch_num} of token {token_address}")
-
-                current_start = current_end + timedelta(days=1)
-                batch_num += 1
-
-            prices_by_token[token_address] = all_prices
-
-        except Exception as e:
-            logger.error(f"Error processing token {token_address}: {e}")
+    for task, batch_prices, error in run_concurrently(_fetch_window, tasks(), max_workers):
+        _, token_address, window_start, window_end, _ = task
+        if error is not None:
+            logger.error(f"Error processing token {token_address}: {error}")
+            failed.add(token_address)
+            yield PriceBatch(token_address, window_start, window_end, [], error)
             continue
+        # Windows already in flight when another window of the token failed
+        # are still yielded, so their prices are stored and journalled
+        yield PriceBatch(token_address, window_start, window_end, batch_prices)
 
+    if skipped:
+        logger.info(f"Skipped {skipped} windows already fetched in a previous run.")
     logger.info("Completed fetching historical prices.")
-    return prices_by_token
 
+
+def iter_planned_prices(
+    windows: Iterable[Tuple[str, datetime, datetime]],
+    network: str = "arb-mainnet",
+    max_workers: int = 1,
+) -> Iterator[PriceBatch]:
+    """
+    Stream prices for explicit request windows, e.g. from `plan_fetch_windows`.
+
+    Args:
+        windows: (token_address, window_start, window_end) request windows
+        network: Network identifier
+        max_workers: Number of concurrent request workers (default: 1, sequential)
+
+    Yields:
+        PriceBatch: (token_address, start, end, prices, error) per request window
+    """
+    window_list = list(windows)
+    logger.info(f"Fetching {len(window_list)} planned windows...")
+
+    batch_nums: Dict[str, int] = {}
+    tasks = []
+    for token_address, window_start, window_end in window_list:
+        batch_nums[token_address] = batch_nums.get(token_address, 0) + 1
+        tasks.append((network, token_address, window_start, window_end, batch_nums[token_address]))
+
+    for task, batch_prices, error in run_concurrently(_fetch_window, tasks, max_workers):
+        _, token_address, window_start, window_end, _ = task
+        if error is not None:
+            logger.error(f"Error processing token {token_address}: {error}")
+            yield PriceBatch(token_address, window_start, window_end, [], error)
+            continue
+        yield PriceBatch(token_address, window_start, window_end, batch_prices)
+
+    logger.info("Completed fetching planned windows.")
+
+
+def fetch_historical_prices(
+    tokens: Iterable[str],
+    network: str = "arb-mainnet",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    max_workers: int = 1,
+) -> Dict[str, List[Any]]:
+    """
+    Fetch historical prices for the given tokens.
+
+    With `max_workers > 1` the (token, window) requests are issued from a
+    thread pool. All workers draw from the shared rate limiter in
+    `src.data.fetcher`, so throughput is bounded by the API quota rather than
+    by request latency.
+
+    This keeps every price in memory; use `iter_historical_prices` or
+    `src.data.pipeline.run_price_pipeline` for large backfills.
+
+    Args:
+        tokens: Iterable of token addresses
+        network: Network identifier
+        start_date: Start date (default: Ethereum launch date)
+        end_date: End date (default: now)
+        max_workers: Number of concurrent request workers (default: 1, sequential)
+
+    Returns:
+        Dict[token_address, list_of_prices]
+    """
+    token_list = list(tokens)
+    batches: Dict[str, List[PriceBatch]] = {token_address: [] for token_address in token_list}
+    failed = set()
+
+    for batch in iter_historical_prices(token_list, network, start_date, end_date, max_workers):
+        if batch.error is not None:
+            failed.add(batch.token_address)
+            continue
+        batches[batch.token_address].append(batch)
+
+    prices_by_token: Dict[str, List[Any]] = {}
+    for token_address in token_list:
+        if token_address in failed:
+            continue
+        token_batches = sorted(batches[token_address], key=lambda b: b.start)
+        prices_by_token[token_address] = [price for b in token_batches for price in b.prices]
+
+    return prices_by_token
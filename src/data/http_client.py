@@ -0,0 +1,80 @@
+import logging
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30.0  # seconds
+DEFAULT_POOL_MAXSIZE = 10
+
+
+class HTTPClient:
+    """
+    Persistent keep-alive HTTP sessions, one per host.
+
+    Reusing a `requests.Session` keeps TCP+TLS connections open between calls,
+    so only the first request to a host pays the handshake. Each session has
+    a connection pool of `pool_maxsize` connections, large enough for the
+    concurrent fetch workers, and asks for gzip-compressed responses.
+    Sessions are created lazily and can be shared between threads.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = DEFAULT_TIMEOUT,
+    ):
+        """
+        Args:
+            pool_maxsize: Maximum number of pooled connections per host
+            timeouts: Request timeout in seconds per hostname
+            default_timeout: Timeout for hosts without an explicit entry
+        """
+        self.pool_maxsize = pool_maxsize
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        return session
+
+    def session(self, url: str) -> requests.Session:
+        """Return the pooled session for the host of `url`."""
+        host = urlparse(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                logger.debug(f"Opening pooled HTTP session for {host}")
+                session = self._sessions[host] = self._new_session()
+            return session
+
+    def timeout(self, url: str) -> float:
+        return self.timeouts.get(urlparse(url).hostname, self.default_timeout)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout(url))
+        return self.session(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
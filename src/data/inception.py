@@ -0,0 +1,190 @@
+import logging
+from datetime import date, datetime
+from typing import Any, Callable, Container, Dict, Iterable, List, Optional, Tuple
+
+from src.data.db import DBService
+from src.data.fetcher import get_token_prices
+from src.data.historical_prices import (
+    DEFAULT_START_DATE,
+    DEFAULT_END_DATE,
+    PriceBatch,
+    run_concurrently,
+    split_date_range,
+)
+
+logger = logging.getLogger(__name__)
+
+# Requests spent looking for the newest window with prices before a token is
+# reported without prices; later re-probes continue below journalled windows
+MAX_FALLBACK_PROBES = 3
+
+
+def _parse_timestamp(ts: str) -> datetime:
+    return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+
+
+def probe_inception(
+    token_address: str,
+    network: str = "arb-mainnet",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    known_empty: Optional[Container[Tuple[str, date, date]]] = None,
+    max_fallback_probes: int = MAX_FALLBACK_PROBES,
+) -> Tuple[Optional[date], List[PriceBatch]]:
+    """
+    Locate a token's first priced day with a coarse-to-fine window probe.
+
+    Probes are requests for the same windows `iter_historical_prices` fetches
+    (`split_date_range(start_date, end_date)`), and every probed window is
+    returned as a PriceBatch, so the caller can store and journal them
+    instead of requesting them again.
+
+    The newest window is probed first, then older ones newest first until one
+    has prices. A binary search over the windows below it then finds the first
+    window with data (price history is assumed to be contiguous once it
+    starts), and the earliest timestamp in that window is the inception date.
+    This costs about log2(n_windows) requests instead of one per empty window.
+    Windows in `known_empty` (e.g. journalled as empty) count as empty without
+    a request.
+
+    The newest-first scan issues at most `max_fallback_probes` requests, so a
+    token without recent prices costs a few requests rather than a full
+    backfill, and is reported without prices (the caller adds it to the
+    negative cache). Once the scanned windows are journalled as empty, the
+    next re-probe continues further back, so the history of a token delisted
+    long ago is still found eventually.
+
+    Args:
+        token_address: Token contract address
+        network: Network identifier
+        start_date: Earliest date to consider (default: Ethereum launch date)
+        end_date: Latest date to consider (default: now)
+        known_empty: (token_address, window_start, window_end) windows known to have no prices
+        max_fallback_probes: Maximum number of requests spent looking for the newest window with data
+
+    Returns:
+        (first day with a price or None, PriceBatch of every probed window)
+    """
+    if start_date is None:
+        start_date = DEFAULT_START_DATE
+    if end_date is None:
+        end_date = DEFAULT_END_DATE
+
+    windows = split_date_range(start_date, end_date)
+    batches: List[PriceBatch] = []
+
+    def probe(k: int) -> List[Any]:
+        window_start, window_end = windows[k]
+        if known_empty is not None and \
+                (token_address, window_start.date(), window_end.date()) in known_empty:
+            return []
+        prices = list(get_token_prices(
+            network=network,
+            address=token_address,
+            start=window_start,
+            end=window_end,
+        ))
+        batches.append(PriceBatch(token_address, window_start, window_end, prices))
+        return prices
+
+    # Coarse: the newest window with data, normally the most recent one
+    last = len(windows) - 1
+    first_prices: List[Any] = []
+    while last >= 0 and len(batches) < max_fallback_probes:
+        first_prices = probe(last)
+        if first_prices:
+            break
+        last -= 1
+    if not first_prices:
+        logger.info(f"No prices for token {token_address} ({len(batches)} probes)")
+        return None, batches
+
+    # Fine: binary search for the first window with data in [0, last]
+    lo, hi = 0, last
+    while lo < hi:
+        mid = (lo + hi) // 2
+        prices = probe(mid)
+        if prices:
+            hi = mid
+            first_prices = prices
+        else:
+            lo = mid + 1
+
+    inception = min(_parse_timestamp(p["timestamp"]) for p in first_prices).date()
+    logger.info(f"Token {token_address} first priced on {inception} ({len(batches)} probes)")
+    return inception, batches
+
+
+def find_inception_date(
+    token_address: str,
+    network: str = "arb-mainnet",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> Optional[date]:
+    """Return a token's first priced day (see `probe_inception`), or None if no prices were found."""
+    return probe_inception(token_address, network, start_date, end_date)[0]
+
+
+def resolve_inception_dates(
+    tokens: Iterable[str],
+    db_service: DBService,
+    network: str = "arb-mainnet",
+    end_date: Optional[datetime] = None,
+    max_workers: int = 1,
+    reprobe_unpriced: bool = False,
+    known_empty: Optional[Container[Tuple[str, date, date]]] = None,
+    on_probed: Optional[Callable[[List[PriceBatch]], None]] = None,
+) -> Dict[str, Optional[date]]:
+    """
+    Return inception dates for the given tokens, probing only uncached ones.
+
+    Results are stored in `public.token_inception`, so each token is probed
+    once; later fetches start at its inception instead of at the Ethereum
+    launch date. Probes always cover the full history so the cached date is
+    the true inception regardless of the caller's fetch range. Tokens whose
+    probe failed are left out of the result and the cache. With
+    `reprobe_unpriced`, tokens cached without an inception date are probed
+    again, e.g. once their negative cache entry is due for a re-probe.
+
+    Args:
+        tokens: Iterable of token addresses
+        db_service: DBService holding the inception cache
+        network: Network identifier
+        end_date: Latest date to probe (default: now)
+        max_workers: Number of concurrent probe workers
+        reprobe_unpriced: Probe tokens cached as having no prices again
+        known_empty: (token_address, window_start, window_end) windows known to have no prices
+        on_probed: Called with the PriceBatches of each successfully probed token,
+            e.g. to store them instead of fetching the same windows again
+
+    Returns:
+        Dict[token_address, inception_date or None]
+    """
+    token_list = list(dict.fromkeys(tokens))
+    cached = db_service.get_inception_dates(network)
+    if reprobe_unpriced:
+        cached = {t: d for t, d in cached.items() if d is not None}
+    result = {t: cached[t] for t in token_list if t in cached}
+
+    missing = [t for t in token_list if t not in cached]
+    if not missing:
+        return result
+
+    logger.info(f"Probing inception dates for {len(missing)} tokens ({len(result)} cached)")
+
+    tasks = ((t, network, DEFAULT_START_DATE, end_date, known_empty) for t in missing)
+    discovered: Dict[str, Optional[date]] = {}
+    for task, probed, error in run_concurrently(probe_inception, tasks, max_workers):
+        token_address = task[0]
+        if error is not None:
+            logger.error(f"Error probing inception for token {token_address}: {error}")
+            continue
+        inception, batches = probed
+        discovered[token_address] = inception
+        if on_probed is not None and batches:
+            on_probed(batches)
+
+    if discovered:
+        db_service.store_inception_dates(network, discovered)
+    result.update(discovered)
+    return result
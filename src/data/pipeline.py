@@ -0,0 +1,382 @@
+import logging
+import queue
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.config import alchemy_settings
+
+from src.data.db import DBService, UpsertCounts
+from src.data.historical_prices import DEFAULT_START_DATE, PriceBatch, iter_historical_prices
+from src.data.inception import resolve_inception_dates
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000   # price rows per DB flush
+DEFAULT_QUEUE_SIZE = 32     # fetched windows buffered between producer and writer
+PRODUCER_JOIN_WARNING = 5   # seconds to wait for a stopping producer before logging a warning
+
+# How long a token without prices stays in the negative cache before it is probed again
+DEAD_TOKEN_REPROBE_AFTER = timedelta(days=alchemy_settings.DEAD_TOKEN_REPROBE_DAYS)
+FAILED_TOKEN_REPROBE_AFTER = timedelta(hours=alchemy_settings.FAILED_TOKEN_REPROBE_HOURS)
+
+_DONE = object()
+
+
+class _ProducerError:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+def _put(out: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put `item` on the bounded queue, unless the writer stops first."""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce(batches: Iterable[PriceBatch], out: queue.Queue, stop: threading.Event):
+    """Push fetched batches onto the bounded queue until exhausted or stopped."""
+    batch_iter = iter(batches)
+    try:
+        # `stop` is checked between windows, so once the writer gives up at
+        # most the request in flight completes
+        while not stop.is_set():
+            try:
+                batch = next(batch_iter)
+            except StopIteration:
+                _put(out, _DONE, stop)
+                return
+            _put(out, batch, stop)
+        # Writer gave up: close the generator so no further requests are issued
+        close = getattr(batch_iter, "close", None)
+        if close is not None:
+            close()
+    except Exception as e:
+        _put(out, _ProducerError(e), stop)
+
+
+def _drain(pending: queue.Queue):
+    """Drop batches the writer will no longer consume."""
+    while True:
+        try:
+            pending.get_nowait()
+        except queue.Empty:
+            return
+
+
+def _journal_entry(batch: PriceBatch) -> tuple:
+    if batch.error is not None:
+        status = "failed"
+    elif batch.prices:
+        status = "completed"
+    else:
+        status = "empty"
+    error = None if batch.error is None else str(batch.error)
+    return (batch.token_address, batch.start.date(), batch.end.date(), status, len(batch.prices), error)
+
+
+def skip_dead_tokens(tokens: Iterable[str], db_service: DBService, network: str) -> List[str]:
+    """Drop tokens the negative cache lists as having no prices and not yet due for a re-probe."""
+    tokens = list(tokens)
+    dead = db_service.get_dead_tokens(network, DEAD_TOKEN_REPROBE_AFTER, FAILED_TOKEN_REPROBE_AFTER)
+    if not dead:
+        return tokens
+    kept = [t for t in tokens if t not in dead]
+    logger.info("Skipping %d known dead tokens", len(tokens) - len(kept))
+    return kept
+
+
+def update_dead_tokens(
+    db_service: DBService,
+    network: str,
+    outcomes: Dict[str, Tuple[bool, Optional[str]]],
+    live_tokens: Iterable[str] = (),
+):
+    """
+    Update the negative cache from the outcome of a fetch run.
+
+    Args:
+        db_service: DBService holding the negative cache
+        network: Network identifier
+        outcomes: token_address -> (returned prices, last error or None)
+        live_tokens: Tokens known to have prices; never marked dead
+    """
+    live = set(live_tokens)
+    priced = [t for t, (has_prices, _) in outcomes.items() if has_prices]
+    dead = {
+        t: ("failed", error) if error is not None else ("empty", None)
+        for t, (has_prices, error) in outcomes.items()
+        if not has_prices and t not in live
+    }
+    if dead:
+        db_service.mark_dead_tokens(network, dead)
+    if priced:
+        db_service.clear_dead_tokens(network, priced)
+
+
+def stream_prices_to_db(
+    batches: Iterable[PriceBatch],
+    db_service: DBService,
+    schema: str = "backtest",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    journal_network: Optional[str] = None,
+    dead_token_network: Optional[str] = None,
+    live_tokens: Iterable[str] = (),
+) -> int:
+    """
+    Write a stream of price batches to the database as they arrive.
+
+    Batches are consumed on a producer thread and handed to the calling
+    thread (which owns the DB connection) through a bounded queue. Buffered
+    rows of all tokens are written together with `DBService.store_prices_bulk`. When the
+    writer falls behind, the queue fills up and the producer - and therefore
+    the fetcher - blocks, so memory stays bounded by `queue_size` windows
+    plus `batch_size` buffered rows.
+
+    When `journal_network` is given, the outcome of every window is recorded
+    in the fetch journal (under `schema`, since windows written to one schema
+    say nothing about another) right after its prices are committed, so a
+    rerun can skip it.
+
+    When `dead_token_network` is given, tokens whose every batch came back
+    empty or failed are added to the negative cache once the stream is
+    exhausted, and tokens that returned prices are removed from it. Tokens in
+    `live_tokens` (e.g. ones with stored prices, whose newest window may
+    simply not be published yet) are never marked dead.
+
+    Args:
+        batches: PriceBatch stream, e.g. from `iter_historical_prices`
+        db_service: DBService used for writing
+        schema: Target schema for the prices table
+        batch_size: Number of price rows buffered before flushing to the DB
+        queue_size: Maximum number of batches waiting to be written
+        journal_network: Network to record window outcomes under (default: no journal)
+        dead_token_network: Network to update the negative cache for (default: none)
+        live_tokens: Tokens never to mark dead
+
+    Returns:
+        int: Total number of price rows written
+    """
+    pending: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    producer = threading.Thread(
+        target=_produce, args=(batches, pending, stop), name="price-producer", daemon=True
+    )
+
+    buffer: Dict[str, List[Any]] = {}
+    journal: List[tuple] = []
+    outcomes: Dict[str, Tuple[bool, Optional[str]]] = {}
+    buffered_rows = 0
+    total_rows = 0
+    upserts = UpsertCounts(0, 0, 0)
+
+    def flush():
+        nonlocal buffered_rows, total_rows, upserts
+        if buffer:
+            counts = db_service.store_prices_bulk(buffer, schema=schema)
+            upserts = UpsertCounts(*(a + b for a, b in zip(upserts, counts)))
+        if journal_network is not None and journal:
+            db_service.record_fetch_windows(journal_network, list(journal), schema=schema)
+        total_rows += buffered_rows
+        logger.info("Flushed %d prices for %d tokens (%d total)", buffered_rows, len(buffer), total_rows)
+        buffer.clear()
+        journal.clear()
+        buffered_rows = 0
+
+    started = time.perf_counter()
+    producer.start()
+    try:
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _ProducerError):
+                raise item.error
+            journal.append(_journal_entry(item))
+            had_prices, error = outcomes.get(item.token_address, (False, None))
+            outcomes[item.token_address] = (
+                had_prices or bool(item.prices),
+                str(item.error) if item.error is not None else error,
+            )
+            if item.error is not None or not item.prices:
+                continue
+
+            buffer.setdefault(item.token_address, []).extend(item.prices)
+            buffered_rows += len(item.prices)
+            if buffered_rows >= batch_size:
+                flush()
+
+        if buffer or journal:
+            flush()
+        if dead_token_network is not None and outcomes:
+            update_dead_tokens(db_service, dead_token_network, outcomes, live_tokens)
+    finally:
+        # On success the producer has already finished; on error this stops
+        # it between windows, and the run only returns once it stopped fetching
+        stop.set()
+        _drain(pending)
+        producer.join(timeout=PRODUCER_JOIN_WARNING)
+        if producer.is_alive():
+            logger.warning(
+                "Price producer still busy %ss after the writer stopped; waiting for its request in flight",
+                PRODUCER_JOIN_WARNING,
+            )
+            producer.join()
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Stored %d prices in %.1fs (%.0f rows/sec end to end): %d inserted, %d updated, %d unchanged",
+        total_rows, elapsed, total_rows / elapsed if elapsed > 0 else 0.0, *upserts,
+    )
+    return total_rows
+
+
+def run_price_pipeline(
+    tokens: Iterable[str],
+    db_service: DBService,
+    network: str = "arb-mainnet",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    max_workers: int = 1,
+    schema: str = "backtest",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    resume: bool = True,
+    discover_inception: bool = True,
+    skip_dead: bool = True,
+) -> int:
+    """
+    Fetch historical prices and store them while fetching.
+
+    With `resume` enabled, windows the fetch journal lists as completed or
+    empty for this network and schema are skipped, and failed windows are retried.
+
+    With `discover_inception` enabled, each token's first priced day is looked
+    up (and probed once if not cached) so fetching starts there instead of at
+    `start_date`; tokens without any prices are not fetched. Windows the
+    probes requested are stored and journalled right away and not fetched
+    again.
+
+    With `skip_dead` enabled, tokens in the negative cache cost no requests
+    until their re-probe interval has passed; tokens found without prices (or
+    failing) are added to it and tokens returning prices again are removed.
+    Tokens with stored prices or completed journal windows are never added.
+
+    Args:
+        tokens: Iterable of token addresses
+        db_service: DBService used for writing
+        network: Network identifier
+        start_date: Start date (default: Ethereum launch date)
+        end_date: End date (default: now)
+        max_workers: Number of concurrent request workers
+        schema: Target schema for the prices table
+        batch_size: Number of price rows buffered before flushing to the DB
+        queue_size: Maximum number of batches waiting to be written
+        resume: Skip windows already recorded in the fetch journal and record new ones
+        discover_inception: Start each token at its cached or probed inception date
+        skip_dead: Skip tokens in the negative cache and keep it up to date
+
+    Returns:
+        int: Total number of price rows written
+    """
+    tokens = list(tokens)
+    db_service.ensure_price_schema(schema)
+    if skip_dead:
+        tokens = skip_dead_tokens(tokens, db_service, network)
+
+    start_dates = None
+    live_tokens: List[str] = []
+    probed_windows: Set[Tuple[str, date, date]] = set()
+    if discover_inception:
+        probed: List[PriceBatch] = []
+        probed_tokens: Set[str] = set()
+        first_day = start_date or DEFAULT_START_DATE
+
+        def flush_probes():
+            stream_prices_to_db(
+                iter(probed),
+                db_service,
+                schema=schema,
+                batch_size=batch_size,
+                queue_size=queue_size,
+                journal_network=network if resume else None,
+            )
+            probed.clear()
+
+        def store_probes(batches: List[PriceBatch]):
+            # Probed windows are ordinary fetch windows: store and journal
+            # them so the backfill below does not request them again
+            batches = [b for b in batches if b.start >= first_day]
+            probed.extend(batches)
+            probed_windows.update((b.token_address, b.start.date(), b.end.date()) for b in batches)
+            probed_tokens.update(b.token_address for b in batches if b.prices)
+            if sum(len(b.prices) for b in probed) >= batch_size:
+                flush_probes()
+
+        inception_dates = resolve_inception_dates(
+            tokens,
+            db_service,
+            network=network,
+            end_date=end_date,
+            max_workers=max_workers,
+            reprobe_unpriced=skip_dead,
+            known_empty=db_service.get_empty_fetch_windows(network, schema) if resume else None,
+            on_probed=store_probes,
+        )
+        if probed:
+            flush_probes()
+        if skip_dead and probed_tokens:
+            # Re-probed tokens found with prices may have no window left to fetch
+            db_service.clear_dead_tokens(network, sorted(probed_tokens))
+        no_prices = {t for t, d in inception_dates.items() if d is None}
+        if no_prices:
+            logger.info("Skipping %d tokens without price data", len(no_prices))
+            tokens = [t for t in tokens if t not in no_prices]
+            if skip_dead:
+                db_service.mark_dead_tokens(network, {t: ("empty", None) for t in no_prices})
+        start_dates = {
+            t: datetime.combine(d, datetime.min.time())
+            for t, d in inception_dates.items() if d is not None
+        }
+        live_tokens = list(start_dates)
+
+    skip_windows = db_service.get_finished_fetch_windows(network, schema) if resume else None
+    if skip_windows:
+        logger.info("Fetch journal lists %d finished windows for %s in %s", len(skip_windows), network, schema)
+    if probed_windows:
+        skip_windows = set(skip_windows or ()) | probed_windows
+
+    if skip_dead:
+        # Tokens with prices from earlier runs are live even if every window
+        # fetched now (e.g. only the newest, after a resume) comes back empty
+        priced = db_service.get_completed_fetch_tokens(network, schema)
+        priced.update(db_service.get_prices_distinct_tokens(schema))
+        known_live = set(live_tokens)
+        live_tokens += [t for t in tokens if t in priced and t not in known_live]
+
+    batches = iter_historical_prices(
+        tokens,
+        network=network,
+        start_date=start_date,
+        end_date=end_date,
+        max_workers=max_workers,
+        skip_windows=skip_windows,
+        start_dates=start_dates,
+    )
+    return stream_prices_to_db(
+        batches,
+        db_service,
+        schema=schema,
+        batch_size=batch_size,
+        queue_size=queue_size,
+        journal_network=network if resume else None,
+        dead_token_network=network if skip_dead else None,
+        live_tokens=live_tokens,
+    )
@@ -0,0 +1,242 @@
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token-bucket rate limiter shared by concurrent API workers.
+
+    The bucket holds up to `burst` request slots and refills continuously at
+    `requests_per_hour / 3600` slots per second. Every caller reserves a slot
+    under the lock and then sleeps outside of it until its slot is due, so
+    waiting workers are served in arrival order and never busy-loop.
+
+    A pause moves the bucket's schedule to the end of the pause: requests
+    resume one at a time at the normal rate rather than in a burst, and
+    callers already asleep on a slot inside the pause reserve a new one when
+    they wake.
+    """
+
+    def __init__(
+        self,
+        requests_per_hour: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if requests_per_hour <= 0:
+            raise ValueError("requests_per_hour must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.requests_per_hour = float(requests_per_hour)
+        self.burst = int(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+        self._paused_until = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Refill rate in request slots per second."""
+        return self.requests_per_hour / 3600.0
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._updated_at)
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def _reserve(self) -> Tuple[float, float]:
+        # (seconds to wait, clock time the reserved slot is due)
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1.0
+            wait_time = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            slot = max(now + wait_time, self._paused_until)
+            return slot - now, slot
+
+    def reserve(self) -> float:
+        """
+        Reserve one request slot without blocking.
+
+        Returns:
+            float: Seconds the caller must wait before issuing its request.
+        """
+        return self._reserve()[0]
+
+    def _pause(self, seconds: float):
+        # Caller holds the lock
+        now = self._clock()
+        paused_until = now + seconds
+        if paused_until <= self._paused_until:
+            return
+        self._paused_until = paused_until
+        # Empty the bucket up to the end of the pause: the next slot is due
+        # then, and later ones follow at the normal rate
+        self._refill(now)
+        self._tokens = min(self._tokens, 1.0 - seconds * self.rate)
+
+    def pause(self, seconds: float):
+        """Hold back every request for at least `seconds` from now."""
+        with self._lock:
+            self._pause(seconds)
+
+    def record_success(self, headers: Optional[Mapping[str, str]] = None):
+        """Hook called after a successful request; the plain bucket ignores it."""
+
+    def record_throttle(self, retry_after: float):
+        """Hook called after a 429 response: pause all callers for `retry_after` seconds."""
+        self.pause(retry_after)
+
+    def acquire(self) -> float:
+        """
+        Block until a request slot is available.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            wait_time, slot = self._reserve()
+            if wait_time > 0:
+                logger.info(
+                    f"Rate limiting: waiting {wait_time:.2f} seconds to respect API limit "
+                    f"({self.requests_per_hour:.0f} req/hour)"
+                )
+                self._sleep(wait_time)
+            waited += wait_time
+            with self._lock:
+                if self._paused_until <= slot:
+                    return waited
+            # Paused while asleep: the slot falls inside the pause, take a new one
+
+
+def _header(headers: Optional[Mapping[str, str]], *names: str) -> Optional[float]:
+    if not headers:
+        return None
+    for name in names:
+        try:
+            value = headers.get(name)
+            if value is not None:
+                return float(value)
+        except (TypeError, ValueError, AttributeError):
+            continue
+    return None
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]], now: Optional[float] = None) -> Optional[float]:
+    """
+    Return the `Retry-After` delay in seconds, or None when absent or invalid.
+
+    Both forms are accepted: delta-seconds and an HTTP date.
+    """
+    if not headers:
+        return None
+    try:
+        value = headers.get("Retry-After")
+    except AttributeError:
+        return None
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, AttributeError, IndexError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float, rng: Callable[[], float] = random.random) -> float:
+    """
+    Jittered exponential backoff: half of `base_delay * 2**attempt` plus a random
+    share of the other half, capped at `max_delay`.
+    """
+    delay = min(max_delay, base_delay * (2 ** attempt))
+    return delay / 2 + rng() * delay / 2
+
+
+class AdaptiveRateLimiter(TokenBucketRateLimiter):
+    """
+    Token bucket whose rate follows the server's feedback (AIMD).
+
+    Every successful request adds `increase_step` req/hour to the rate - quickly
+    while below the last rate that triggered a 429, cautiously above it - up to
+    `max_requests_per_hour`. A 429 multiplies the rate by `decrease_factor`
+    (never below `min_requests_per_hour`) and pauses all callers for the
+    server's `Retry-After` delay. Remaining-quota headers, when present, cap the
+    rate so the remaining quota is spread over the time until reset.
+    """
+
+    def __init__(
+        self,
+        requests_per_hour: float,
+        burst: int = 1,
+        max_requests_per_hour: Optional[float] = None,
+        min_requests_per_hour: Optional[float] = None,
+        increase_step: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        super().__init__(requests_per_hour, burst=burst, clock=clock, sleep=sleep)
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+
+        self.max_requests_per_hour = float(max_requests_per_hour or requests_per_hour)
+        self.min_requests_per_hour = float(min_requests_per_hour or self.max_requests_per_hour / 20)
+        self.increase_step = float(increase_step or self.max_requests_per_hour / 100)
+        self.decrease_factor = decrease_factor
+        self.observed_ceiling = self.max_requests_per_hour
+
+    def _set_rate(self, requests_per_hour: float):
+        # Settle the bucket at the old rate before switching
+        self._refill(self._clock())
+        self.requests_per_hour = min(
+            self.max_requests_per_hour, max(self.min_requests_per_hour, requests_per_hour)
+        )
+
+    def record_success(self, headers: Optional[Mapping[str, str]] = None):
+        remaining = _header(headers, "X-RateLimit-Remaining", "RateLimit-Remaining")
+        reset = _header(headers, "X-RateLimit-Reset", "RateLimit-Reset")
+        if reset is not None and reset > 1e9:
+            # Epoch timestamp rather than delta-seconds
+            reset = max(0.0, reset - time.time())
+
+        with self._lock:
+            step = self.increase_step
+            if self.requests_per_hour >= self.observed_ceiling:
+                step /= 10
+            rate = self.requests_per_hour + step
+            if remaining is not None and reset:
+                rate = min(rate, remaining * 3600.0 / reset)
+            self._set_rate(rate)
+
+        if remaining is not None and remaining <= 0 and reset:
+            logger.warning(f"API quota exhausted; pausing requests for {reset:.0f} seconds")
+            self.pause(reset)
+
+    def record_throttle(self, retry_after: float):
+        with self._lock:
+            if self._clock() < self._paused_until:
+                # Concurrent workers hit the same limit: back off only once per pause
+                self._pause(retry_after)
+                return
+            self.observed_ceiling = self.requests_per_hour
+            self._set_rate(self.requests_per_hour * self.decrease_factor)
+            logger.warning(
+                f"Throttled by API; lowering rate to {self.requests_per_hour:.0f} req/hour "
+                f"(ceiling {self.observed_ceiling:.0f})"
+            )
+            self._pause(retry_after)
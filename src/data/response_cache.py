@@ -0,0 +1,132 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPEN_WINDOW_TTL = 3600  # seconds
+DEFAULT_SETTLE_PERIOD = 7 * 86400  # seconds after a window's last day before it is treated as final
+
+
+class CacheMissError(RuntimeError):
+    """Raised in offline mode when a request has no cached response."""
+
+
+class ResponseCache:
+    """
+    On-disk, content-addressed cache of API responses.
+
+    Entries are keyed on the SHA-256 of the canonical JSON request payload and
+    stored gzip-compressed under `directory/<key[:2]>/<key>.json.gz`.
+    Responses with prices, stored once `settle_period` seconds have passed
+    since the end of the window's last day, never expire: the provider may
+    still publish or backfill prices shortly after a window closes. Every
+    other entry - recent windows and empty responses, which must not outlive
+    the negative cache's re-probe - expires after `open_window_ttl` seconds.
+    In `offline` mode no request is ever sent: every cached entry is replayed,
+    stale or not, and a miss raises `CacheMissError`.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        open_window_ttl: float = DEFAULT_OPEN_WINDOW_TTL,
+        offline: bool = False,
+        clock: Callable[[], float] = time.time,
+        settle_period: float = DEFAULT_SETTLE_PERIOD,
+    ):
+        self.directory = Path(directory)
+        self.open_window_ttl = open_window_ttl
+        self.settle_period = settle_period
+        self.offline = offline
+        self._clock = clock
+
+    @staticmethod
+    def key(payload: dict) -> str:
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def _settled_at(self, payload: dict) -> Optional[float]:
+        """Time from which a window is final: `settle_period` after the end of its last day (UTC)."""
+        end_time = payload.get("endTime")
+        if not end_time:
+            return None
+        try:
+            end = datetime.fromisoformat(end_time.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if end.tzinfo is None:
+            end = end.replace(tzinfo=timezone.utc)
+        next_day = datetime.combine(end.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        return next_day.timestamp() + self.settle_period
+
+    def _is_final(self, entry: dict) -> bool:
+        """Whether an entry holds prices fetched after its window had settled."""
+        settled_at = self._settled_at(entry.get("payload") or {})
+        if settled_at is None or settled_at > entry.get("stored_at", 0):
+            return False
+        data = (entry.get("response") or {}).get("data")
+        if isinstance(data, dict):
+            data = data.get("prices")
+        return bool(data)
+
+    def get(self, payload: dict) -> Optional[Any]:
+        """
+        Return the cached response for `payload`, or None if absent or expired.
+
+        Raises:
+            CacheMissError: In offline mode when nothing is cached for `payload`.
+        """
+        key = self.key(payload)
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            if self.offline:
+                raise CacheMissError(f"No cached response for payload {payload}")
+            return None
+        except (OSError, ValueError):
+            logger.warning(f"Ignoring unreadable cache entry {path}")
+            if self.offline:
+                raise CacheMissError(f"Unreadable cached response for payload {payload}")
+            return None
+
+        if not self.offline and not self._is_final(entry):
+            age = self._clock() - entry.get("stored_at", 0)
+            if age > self.open_window_ttl:
+                logger.debug(f"Cache entry {key} expired ({age:.0f}s old)")
+                return None
+
+        logger.debug(f"Cache hit {key}")
+        return entry["response"]
+
+    def put(self, payload: dict, response: Any):
+        """Store `response` for `payload` atomically."""
+        key = self.key(payload)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "payload": payload,
+            "stored_at": self._clock(),
+            "response": response,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(json.dumps(entry, separators=(",", ":")).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
@@ -0,0 +1,11 @@
+# db_config_sample.py
+# Copy this to db_config.py and fill in your real credentials
+# Do NOT commit your real credentials
+
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "your_database_name",
+    "user": "your_username",
+    "password": "your_password"
+}
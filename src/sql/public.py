@@ -19,3 +19,128 @@ SELECT COUNT(*) FROM public.contracts;
 SELECT_CONTRACTS_SQL = """
 SELECT token_address FROM public.contracts;
 """
+
+# One row per (network, target schema, token, request window) attempted by the historical price fetcher
+CREATE_FETCH_JOURNAL_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS public.fetch_journal(
+    network TEXT NOT NULL,
+    target_schema TEXT NOT NULL,
+    token_address TEXT NOT NULL,
+    window_start DATE NOT NULL,
+    window_end DATE NOT NULL,
+    status TEXT NOT NULL CHECK (status IN ('completed', 'empty', 'failed')),
+    n_prices INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (network, target_schema, token_address, window_start, window_end)
+)
+"""
+
+UPSERT_FETCH_JOURNAL_SQL = """
+INSERT INTO public.fetch_journal(network, target_schema, token_address, window_start, window_end, status, n_prices, error)
+VALUES %s
+ON CONFLICT (network, target_schema, token_address, window_start, window_end) DO UPDATE SET
+    status = EXCLUDED.status,
+    n_prices = EXCLUDED.n_prices,
+    error = EXCLUDED.error,
+    attempts = public.fetch_journal.attempts + 1,
+    updated_at = NOW();
+"""
+
+SELECT_FINISHED_FETCH_WINDOWS_SQL = """
+SELECT token_address, window_start, window_end
+FROM public.fetch_journal
+WHERE network = %s AND target_schema = %s AND status IN ('completed', 'empty');
+"""
+
+SELECT_EMPTY_FETCH_WINDOWS_SQL = """
+SELECT token_address, window_start, window_end
+FROM public.fetch_journal
+WHERE network = %s AND target_schema = %s AND status = 'empty';
+"""
+
+SELECT_COMPLETED_FETCH_TOKENS_SQL = """
+SELECT DISTINCT token_address
+FROM public.fetch_journal
+WHERE network = %s AND target_schema = %s AND status = 'completed';
+"""
+
+# First priced day per token; inception_date is NULL when the probe found no prices
+CREATE_TOKEN_INCEPTION_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS public.token_inception(
+    network TEXT NOT NULL,
+    token_address TEXT NOT NULL,
+    inception_date DATE,
+    probed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (network, token_address)
+)
+"""
+
+UPSERT_TOKEN_INCEPTION_SQL = """
+INSERT INTO public.token_inception(network, token_address, inception_date)
+VALUES %s
+ON CONFLICT (network, token_address) DO UPDATE SET
+    inception_date = EXCLUDED.inception_date,
+    probed_at = NOW();
+"""
+
+SELECT_TOKEN_INCEPTION_SQL = """
+SELECT token_address, inception_date
+FROM public.token_inception
+WHERE network = %s;
+"""
+
+# Tokens whose last fetch returned no prices ('empty') or only errors ('failed')
+CREATE_DEAD_TOKENS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS public.dead_tokens(
+    network TEXT NOT NULL,
+    token_address TEXT NOT NULL,
+    reason TEXT NOT NULL CHECK (reason IN ('empty', 'failed')),
+    error TEXT,
+    probes INTEGER NOT NULL DEFAULT 1,
+    first_seen TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_probed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (network, token_address)
+)
+"""
+
+UPSERT_DEAD_TOKENS_SQL = """
+INSERT INTO public.dead_tokens(network, token_address, reason, error)
+VALUES %s
+ON CONFLICT (network, token_address) DO UPDATE SET
+    reason = EXCLUDED.reason,
+    error = EXCLUDED.error,
+    probes = public.dead_tokens.probes + 1,
+    last_probed_at = NOW();
+"""
+
+DELETE_DEAD_TOKENS_SQL = """
+DELETE FROM public.dead_tokens
+WHERE network = %s AND token_address = ANY(%s);
+"""
+
+# Dead tokens not yet due for a re-probe; intervals are per reason (empty, failed)
+SELECT_DEAD_TOKENS_SQL = """
+SELECT token_address
+FROM public.dead_tokens
+WHERE network = %s
+  AND last_probed_at > NOW() - CASE reason WHEN 'empty' THEN %s ELSE %s END;
+"""
+
+# Session-local staging table for COPY-based price ingest; temporary tables are
+# never WAL-logged and ON COMMIT DELETE ROWS empties it after every merge
+CREATE_PRICES_STAGING_TABLE_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS prices_staging(
+    token_address TEXT NOT NULL,
+    value NUMERIC,
+    timestamp TIMESTAMPTZ NOT NULL,
+    market_cap NUMERIC,
+    total_volume NUMERIC
+) ON COMMIT DELETE ROWS
+"""
+
+COPY_PRICES_STAGING_SQL = """
+COPY prices_staging(token_address, value, timestamp, market_cap, total_volume)
+FROM STDIN WITH (FORMAT csv)
+"""
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting.data_cleaner import apply_quality_filters
+from src.backtesting.engine import BacktestData, Day, run_backtest_engine, run_vectorized_backtest
+from src.backtesting.indicators import calculate_indicators
+from src.backtesting.slippage import slippage_cost
+from src.backtesting.strategies import (
+    contrarian, equal_strategy, golden_cross, high_volatility, low_volatility, sma_strategy, sma_strategy_20,
+)
+from src.backtesting.transaction_costs import apply_transaction_costs
+from test.backtesting.test_universe import _prices_hitting_every_rule
+
+
+def _reference_loop(df, select_today, rebalance_days=7, exit_today=None, quality_filters=True):
+    """The day loop every strategy module used to copy, with the selection pluggable."""
+    dates = sorted(df["timestamp"].unique())
+    capital = 10000
+    current_positions = {}
+    portfolio_history = []
+    last_rebalance_idx = -rebalance_days
+
+    for i, current_date in enumerate(dates):
+        if i - last_rebalance_idx >= rebalance_days:
+            today = df[df["timestamp"] == current_date]
+            if quality_filters:
+                today = today[today["token_address"].isin(apply_quality_filters(df, current_date))]
+            selected = select_today(today)
+            current_positions = {}
+            if not selected.empty:
+                allocation = capital / len(selected)
+                for _, row in selected.iterrows():
+                    tx_cost = apply_transaction_costs(allocation)
+                    entry_price = row["value"] * (1 + tx_cost / allocation)
+                    current_positions[row["token_address"]] = {"entry_price": entry_price, "allocation": allocation}
+            last_rebalance_idx = i
+
+        daily_return = 0.0
+        exits = []
+        for token, pos in current_positions.items():
+            today_row = df[(df["timestamp"] == current_date) & (df["token_address"] == token)]
+            if i == 0 or today_row.empty:
+                continue
+            yesterday_row = df[(df["timestamp"] == dates[i - 1]) & (df["token_address"] == token)]
+            if yesterday_row.empty:
+                continue
+            today_price = today_row["value"].iloc[0]
+            yesterday_price = yesterday_row["value"].iloc[0]
+            pnl = (today_price - pos["entry_price"]) / pos["entry_price"]
+            weight = pos["allocation"] / capital
+            if pnl < -0.08:
+                slippage = slippage_cost(pos["allocation"], pool_liquidity=100_000_000)
+                tx_cost = apply_transaction_costs(pos["allocation"]) / pos["allocation"]
+                daily_return += ((today_price - yesterday_price) / yesterday_price) * weight
+                daily_return -= slippage + tx_cost
+                exits.append(token)
+            else:
+                daily_return += ((today_price - yesterday_price) / yesterday_price) * weight
+
+        if exit_today is not None:
+            for token in list(current_positions.keys()):
+                today_row = df[(df["timestamp"] == current_date) & (df["token_address"] == token)]
+                if not today_row.empty and exit_today(today_row.iloc[0]):
+                    exits.append(token)
+
+        for token in exits:
+            current_positions.pop(token, None)
+        capital *= (1 + daily_return)
+        portfolio_history.append({"date": current_date, "portfolio_value": capital, "n_tokens": len(current_positions)})
+
+    return pd.DataFrame(portfolio_history)
+
+
+@pytest.fixture(scope="module")
+def df():
+    return calculate_indicators(_prices_hitting_every_rule(n_tokens=10, seed=5))
+
+
+def _sma_19(today):
+    today = today[["token_address", "value", "sma_19"]].dropna()
+    return today[today["value"] > today["sma_19"]]
+
+
+def _golden_cross(today):
+    today = today[["token_address", "value", "sma_20", "sma_50", "momentum_30d"]].dropna()
+    return today[(today["sma_20"] > today["sma_50"]) & (today["momentum_30d"] > 0)]
+
+
+def _golden_cross_exit(row):
+    return row["sma_20"] <= row["sma_50"] or row["momentum_30d"] <= 0
+
+
+def _contrarian(today):
+    today = today[["token_address", "value", "volatility_30d", "momentum_30d"]].dropna()
+    if today.empty:
+        return today
+    low_vol = today.nsmallest(max(1, int(len(today) * 0.3)), "volatility_30d")
+    return low_vol[low_vol["momentum_30d"] < 0]
+
+
+def _high_volatility(today):
+    today = today.dropna(subset=["volatility_30d"])
+    return today.nlargest(max(1, int(len(today) * 0.1)), "volatility_30d")
+
+
+@pytest.mark.parametrize("strategy, select_today, options", [
+    (sma_strategy, _sma_19, {}),
+    (golden_cross, _golden_cross, {"exit_today": _golden_cross_exit}),
+    (contrarian, _contrarian, {}),
+    (high_volatility, _high_volatility, {}),
+    (equal_strategy, lambda today: today, {"quality_filters": False}),
+])
+@pytest.mark.parametrize("rebalance_days", [3, 7])
+def test_ported_strategies_match_the_reference_loop(df, strategy, select_today, options, rebalance_days):
+    expected = _reference_loop(df, select_today, rebalance_days=rebalance_days, **options)
+    result = strategy.backtest_strategy(df, rebalance_days=rebalance_days)
+
+    assert expected["n_tokens"].sum() > 0
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+@pytest.mark.parametrize("strategy", [sma_strategy, sma_strategy_20, high_volatility, low_volatility, equal_strategy])
+@pytest.mark.parametrize("rebalance_days", [1, 7])
+def test_vectorized_backtest_matches_the_day_loop(df, strategy, rebalance_days):
+    expected = strategy.backtest_strategy(df, rebalance_days=rebalance_days)
+    result = strategy.backtest_strategy(df, rebalance_days=rebalance_days, vectorized=True)
+
+    assert expected["n_tokens"].sum() > 0
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-10, check_dtype=False)
+
+
+def test_vectorized_backtest_keeps_unallocated_weight_in_cash():
+    prices = [100.0, 110.0, 99.0, 104.0]
+    df = pd.DataFrame({
+        "token_address": "0xa",
+        "timestamp": pd.date_range("2024-01-01", periods=4, tz="UTC"),
+        "value": prices,
+    })
+    data = BacktestData(df)
+    weights = np.full((4, 1), np.nan)
+    weights[0] = 0.5
+
+    result = run_vectorized_backtest(data, weights, initial_capital=1000, rebalance_days=4)
+
+    # A fixed $500 allocation earns each day's price change; $500 stays in cash
+    returns = np.diff(prices) / prices[:-1]
+    expected = 1000 + 500 * np.r_[0, np.cumsum(returns)]
+    np.testing.assert_allclose(result["portfolio_value"], expected, rtol=1e-12)
+    assert result["n_tokens"].tolist() == [1, 1, 1, 1]
+
+
+def test_vectorized_backtest_rejects_exit_signals(df):
+    data = BacktestData(df, golden_cross.required_indicators())
+    with pytest.raises(ValueError, match="exit signals"):
+        run_backtest_engine(data, golden_cross.select, exit_signal=golden_cross.exit_signal, vectorized=True)
+
+
+def test_day_ranking_breaks_ties_like_dataframe():
+    df = pd.DataFrame({
+        "token_address": ["0xd", "0xa", "0xc", "0xb", "0xe"],
+        "timestamp": pd.Timestamp("2024-01-01", tz="UTC"),
+        "value": 1.0,
+        "volatility_30d": [2.0, 1.0, 2.0, 1.0, np.nan],
+    })
+    day = Day(BacktestData(df, ["volatility_30d"]), 0)
+    tokens = day.data.panel.tokens
+    today = day.rows("volatility_30d", eligible=False)
+    ranked = df.dropna()
+
+    for n in (1, 2, 3, 4):
+        assert tokens[day.nsmallest(n, "volatility_30d", today)].tolist() == \
+            ranked.nsmallest(n, "volatility_30d")["token_address"].tolist()
+        assert tokens[day.nlargest(n, "volatility_30d", today)].tolist() == \
+            ranked.nlargest(n, "volatility_30d")["token_address"].tolist()
+    assert tokens[day.in_row_order(today)].tolist() == ["0xd", "0xa", "0xc", "0xb"]
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.backtesting import indicators
+from src.backtesting.indicator_cache import IndicatorCache
+from src.backtesting.indicators import calculate_indicators
+from test.backtesting.test_indicators import _random_prices
+
+
+def test_cached_columns_are_loaded_instead_of_computed(tmp_path, mocker):
+    df = _random_prices()
+    cache = IndicatorCache(tmp_path)
+    expected = calculate_indicators(df, columns=["sma_19", "bb_position"], cache=cache)
+
+    resolve = mocker.spy(indicators, "_resolve")
+    result = calculate_indicators(df, columns=["sma_19", "bb_position"], cache=cache)
+
+    resolve.assert_not_called()
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_only_missing_columns_are_computed(tmp_path, mocker):
+    df = _random_prices()
+    cache = IndicatorCache(tmp_path)
+    calculate_indicators(df, columns=["sma_19"], cache=cache)
+
+    resolve = mocker.spy(indicators, "_resolve")
+    result = calculate_indicators(df, columns=["sma_19", "rsi"], cache=cache)
+
+    assert {call.args[0] for call in resolve.call_args_list} == {"rsi", "price_delta"}
+    pd.testing.assert_frame_equal(result, calculate_indicators(df, columns=["sma_19", "rsi"]), check_exact=True)
+
+
+def test_fingerprint_changes_with_prices():
+    df = _random_prices()
+    changed = df.copy()
+    changed.loc[0, "value"] *= 1.01
+
+    assert IndicatorCache.fingerprint(df) == IndicatorCache.fingerprint(df.copy())
+    assert IndicatorCache.fingerprint(changed) != IndicatorCache.fingerprint(df)
+
+
+def test_evict_removes_least_recently_used_columns(tmp_path):
+    cache = IndicatorCache(tmp_path)
+    array = np.zeros(1000)
+    for i, column in enumerate(["sma_5", "sma_6", "sma_7"]):
+        cache.put("f" * 64, "rolling-v1", column, array)
+        path = cache._path("f" * 64, "rolling-v1", column)
+        os.utime(path, (1000 + i, 1000 + i))
+    cache.get("f" * 64, "rolling-v1", "sma_5")  # now the most recently used
+
+    cache.max_bytes = 2 * cache._path("f" * 64, "rolling-v1", "sma_5").stat().st_size
+    cache.evict()
+
+    assert cache.get("f" * 64, "rolling-v1", "sma_6") is None
+    assert cache.get("f" * 64, "rolling-v1", "sma_5") is not None
+    assert cache.get("f" * 64, "rolling-v1", "sma_7") is not None
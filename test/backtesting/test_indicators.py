@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.backtesting.indicators import (
+    INDICATOR_COLUMNS,
+    calculate_indicators,
+    calculate_indicators_legacy,
+    indicator_closure,
+)
+
+
+def _random_prices(n_tokens=12, n_days=260, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2023-01-01", periods=n_days, freq="D", tz="UTC")
+    frames = []
+    for t in range(n_tokens):
+        # Tokens list at different dates, have gaps and some missing volumes
+        start = rng.integers(0, n_days // 2)
+        days = dates[start:][rng.random(n_days - start) > 0.1]
+        volume = rng.random(len(days)) * 1e6
+        volume[rng.random(len(days)) < 0.05] = np.nan
+        frames.append(pd.DataFrame({
+            "token_address": f"0x{t:040x}",
+            "timestamp": days,
+            "value": np.exp(np.cumsum(rng.normal(0, 0.05, len(days)))),
+            "market_cap": rng.random(len(days)) * 1e8,
+            "total_volume": volume,
+        }))
+    # Interleave rows so tokens are not contiguous in the input
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def test_calculate_indicators_matches_legacy_loop_exactly():
+    df = _random_prices()
+
+    expected = calculate_indicators_legacy(df)
+    result = calculate_indicators(df)
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_indicator_closure_resolves_dependencies_first():
+    closure = indicator_closure(["bb_position", "mom_vol_ratio"])
+
+    assert set(closure) == {
+        "sma_20", "bb_middle", "bb_std", "bb_lower", "bb_upper", "bb_position",
+        "returns", "momentum_30d", "volatility_30d", "mom_vol_ratio",
+    }
+    assert closure.index("sma_20") < closure.index("bb_middle") < closure.index("bb_upper")
+    assert closure.index("returns") < closure.index("volatility_30d") < closure.index("mom_vol_ratio")
+
+
+def test_indicator_closure_rejects_unknown_names():
+    with pytest.raises(KeyError):
+        indicator_closure(["not_an_indicator"])
+
+
+def test_calculate_indicators_computes_only_requested_columns():
+    df = _random_prices()
+    full = calculate_indicators(df)
+
+    result = calculate_indicators(df, columns=["rsi", "sma_19", "bb_position", "sma_45"])
+
+    assert list(result.columns) == list(df.columns) + ["sma_19", "bb_position", "rsi", "sma_45"]
+    for column in ("sma_19", "bb_position", "rsi"):
+        pd.testing.assert_series_equal(result[column], full[column], check_exact=True)
+    expected_sma_45 = full.groupby("token_address")["value"].transform(lambda v: v.rolling(45).mean())
+    pd.testing.assert_series_equal(result["sma_45"], expected_sma_45, check_names=False)
+
+
+def test_prefix_kernel_matches_rolling_kernel():
+    df = _random_prices()
+    columns = [f"sma_{w}" for w in range(5, 201, 15)] + INDICATOR_COLUMNS
+
+    expected = calculate_indicators(df, columns=columns)
+    result = calculate_indicators(df, columns=columns, kernel="prefix")
+
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-7)
+
+
+def test_unknown_kernel_is_rejected():
+    with pytest.raises(ValueError):
+        calculate_indicators(_random_prices(n_tokens=1, n_days=10), kernel="fft")
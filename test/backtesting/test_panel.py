@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from src.backtesting.panel import PricePanel
+
+
+def _frame():
+    return pd.DataFrame({
+        "token_address": ["0xbbb", "0xaaa", "0xaaa", "0xbbb"],
+        "timestamp": pd.to_datetime(["2024-01-01", "2024-01-01", "2024-01-02", "2024-01-03"], utc=True),
+        "value": [10.0, 1.0, 2.0, 30.0],
+        "market_cap": [100.0, 5.0, 6.0, 300.0],
+        "total_volume": [1.0, 0.0, 0.5, 3.0],
+    })
+
+
+def test_price_panel_from_frame_aligns_dates_and_tokens():
+    panel = PricePanel.from_frame(_frame())
+
+    assert panel.shape == (3, 2)
+    assert panel.tokens.tolist() == ["0xaaa", "0xbbb"]
+    assert panel.valid.tolist() == [[True, True], [True, False], [False, True]]
+    assert panel.get("2024-01-02", "0xaaa") == 2.0
+    assert np.isnan(panel.get("2024-01-02", "0xbbb"))
+    assert np.isnan(panel.get("2024-01-02", "0xccc"))
+    assert panel.get(pd.Timestamp("2024-01-03", tz="UTC"), "0xbbb", field="market_cap") == 300.0
+    np.testing.assert_array_equal(panel.row("2024-01-01"), [1.0, 10.0])
+
+
+def test_price_panel_save_and_load_round_trip(tmp_path):
+    panel = PricePanel.from_frame(_frame())
+    panel.save(tmp_path)
+
+    loaded = PricePanel.load(tmp_path)
+
+    assert isinstance(loaded.value, np.memmap)
+    assert loaded.dates.equals(panel.dates)
+    assert loaded.tokens.equals(panel.tokens)
+    np.testing.assert_array_equal(loaded.valid, panel.valid)
+    for field in ("value", "market_cap", "total_volume"):
+        np.testing.assert_array_equal(loaded.fields[field], panel.fields[field])
@@ -0,0 +1,109 @@
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from src.backtesting.snapshot import PriceSnapshot, SnapshotError
+
+
+def _prices(rows):
+    return pd.DataFrame({
+        "token_address": [r[0] for r in rows],
+        "timestamp": pd.to_datetime([r[1] for r in rows], utc=True),
+        "value": [float(r[2]) for r in rows],
+        "market_cap": [1e6] * len(rows),
+        "total_volume": [np.nan] * len(rows),
+    })
+
+
+def _db_service(watermark, n_rows, frames):
+    db_service = MagicMock()
+    db_service.get_price_watermark.return_value = (watermark, n_rows)
+    db_service.read_prices.side_effect = frames
+    return db_service
+
+
+W1 = datetime(2024, 1, 3, tzinfo=timezone.utc)
+W2 = datetime(2024, 1, 4, tzinfo=timezone.utc)
+
+
+def test_snapshot_builds_and_loads(tmp_path):
+    df = _prices([("0xbbb", "2024-01-01", 3), ("0xaaa", "2024-01-02", 2), ("0xaaa", "2024-01-01", 1)])
+    snapshot = PriceSnapshot(tmp_path)
+
+    n = snapshot.refresh(_db_service(W1, 3, [df]))
+    loaded = snapshot.load()
+
+    assert n == 3
+    # Sorted by (token_address, timestamp)
+    assert loaded["token_address"].tolist() == ["0xaaa", "0xaaa", "0xbbb"]
+    assert loaded["value"].tolist() == [1.0, 2.0, 3.0]
+    assert loaded["timestamp"].iloc[0] == pd.Timestamp("2024-01-01", tz="UTC")
+    assert loaded["total_volume"].isna().all()
+    assert snapshot.read_meta()["n_rows"] == 3
+
+
+def test_snapshot_refresh_merges_only_changed_rows(tmp_path):
+    snapshot = PriceSnapshot(tmp_path)
+    snapshot.refresh(_db_service(W1, 2, [_prices([("0xaaa", "2024-01-01", 1), ("0xaaa", "2024-01-02", 2)])]))
+
+    # One corrected row and one new row since the watermark
+    changed = _prices([("0xaaa", "2024-01-02", 5), ("0xaaa", "2024-01-03", 6)])
+    db_service = _db_service(W2, 3, [changed])
+    n = snapshot.refresh(db_service)
+
+    assert n == 2
+    assert db_service.read_prices.call_args.kwargs["changed_since"] < W1
+    assert snapshot.load()["value"].tolist() == [1.0, 5.0, 6.0]
+    assert snapshot.read_meta()["watermark"] == W2.isoformat()
+
+
+def test_snapshot_refresh_is_a_noop_when_up_to_date(tmp_path):
+    snapshot = PriceSnapshot(tmp_path)
+    snapshot.refresh(_db_service(W1, 1, [_prices([("0xaaa", "2024-01-01", 1)])]))
+
+    db_service = _db_service(W1, 1, [])
+    assert snapshot.refresh(db_service) == 0
+    db_service.read_prices.assert_not_called()
+
+
+def test_snapshot_rebuilds_when_row_count_disagrees(tmp_path):
+    snapshot = PriceSnapshot(tmp_path)
+    snapshot.refresh(_db_service(W1, 2, [_prices([("0xaaa", "2024-01-01", 1), ("0xbbb", "2024-01-01", 2)])]))
+
+    # A row was deleted upstream: the merge keeps 2 rows, the table has 1
+    full = _prices([("0xaaa", "2024-01-01", 1)])
+    db_service = _db_service(W2, 1, [_prices([]), full])
+    snapshot.refresh(db_service)
+
+    assert db_service.read_prices.call_count == 2
+    assert snapshot.load()["token_address"].tolist() == ["0xaaa"]
+
+
+def test_snapshot_detects_corruption(tmp_path):
+    snapshot = PriceSnapshot(tmp_path)
+    snapshot.refresh(_db_service(W1, 1, [_prices([("0xaaa", "2024-01-01", 1)])]))
+
+    values = np.load(snapshot.path / "value.npy")
+    values[0] = 42.0
+    np.save(snapshot.path / "value.npy", values)
+
+    # A later run loading the snapshot
+    with pytest.raises(SnapshotError):
+        PriceSnapshot(tmp_path).load()
+
+
+def test_snapshot_is_checksummed_once_per_run(tmp_path, mocker):
+    PriceSnapshot(tmp_path).refresh(_db_service(W1, 1, [_prices([("0xaaa", "2024-01-01", 1)])]))
+
+    for db_service in (_db_service(W1, 1, []), _db_service(W2, 2, [_prices([("0xaaa", "2024-01-02", 2)])])):
+        snapshot = PriceSnapshot(tmp_path)
+        checksum = mocker.spy(PriceSnapshot, "_checksum")
+        snapshot.refresh(db_service)
+        snapshot.load()
+        snapshot.load()
+
+        # Up to date: validated once; merged: the old files once, the new ones while writing
+        assert checksum.call_count == (1 if db_service.read_prices.call_count == 0 else 2)
+        mocker.stop(checksum)
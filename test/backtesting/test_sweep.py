@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting.engine import BacktestData
+from src.backtesting.indicators import calculate_indicators
+from src.backtesting.performance import calculate_performance_metrics
+from src.backtesting.strategies import equal_strategy, golden_cross, high_volatility, sma_strategy
+from src.backtesting.sweep import (
+    SharedBacktestData, job_indicators, parameter_grid, run_backtests, run_sweep, sweep_indicators,
+)
+from test.backtesting.test_universe import _prices_hitting_every_rule
+
+
+@pytest.fixture(scope="module")
+def grid():
+    return parameter_grid({"sma_period": [5, 50], "rebalance_days": [1, 7]})
+
+
+@pytest.fixture(scope="module")
+def data(grid):
+    columns = sweep_indicators(sma_strategy, grid)
+    df = calculate_indicators(_prices_hitting_every_rule(n_tokens=10, seed=5), columns=columns)
+    return BacktestData(df, columns)
+
+
+def test_parameter_grid_varies_the_last_axis_fastest():
+    assert parameter_grid({"a": [1, 2], "b": ["x", "y"]}) == [
+        {"a": 1, "b": "x"}, {"a": 1, "b": "y"}, {"a": 2, "b": "x"}, {"a": 2, "b": "y"},
+    ]
+    assert sweep_indicators(sma_strategy, parameter_grid({"sma_period": [5, 50, 5]})) == ["sma_5", "sma_50"]
+
+
+def test_shared_data_attaches_without_copying(data):
+    with SharedBacktestData(data) as shared:
+        attached, handles = SharedBacktestData.attach(shared.spec)
+
+        for name, array in data.panel.fields.items():
+            np.testing.assert_array_equal(attached.panel.fields[name], array)
+        np.testing.assert_array_equal(attached.row_order, data.row_order)
+        np.testing.assert_array_equal(attached.universe.eligible, data.universe.eligible)
+        assert not attached.value.flags.writeable
+        assert attached.value.base is not None
+
+        result = sma_strategy.backtest_strategy(None, sma_period=5, data=attached)
+        pd.testing.assert_frame_equal(result, sma_strategy.backtest_strategy(None, sma_period=5, data=data))
+        del attached, result
+        for shm in handles:
+            shm.close()
+
+
+def test_sweep_matches_single_runs_for_any_worker_count(data, grid):
+    progress = []
+    serial = run_sweep(data, sma_strategy, grid, workers=1, progress=lambda *args: progress.append(args))
+    parallel = run_sweep(data, sma_strategy, grid, workers=2)
+
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert [done for done, _, _ in progress] == [1, 2, 3, 4]
+    assert serial[["sma_period", "rebalance_days"]].to_dict("records") == grid
+
+    portfolio = sma_strategy.backtest_strategy(None, sma_period=50, rebalance_days=1, data=data)
+    expected = calculate_performance_metrics(portfolio, verbose=False)
+    assert serial.iloc[2].drop(["sma_period", "rebalance_days"]).to_dict() == expected
+
+
+def test_different_strategies_share_one_panel():
+    jobs = [
+        (sma_strategy, {"sma_period": 5, "rebalance_days": 3}),
+        (golden_cross, {"rebalance_days": 3}),
+        (high_volatility, {"top_pct": 0.2, "rebalance_days": 3}),
+        (equal_strategy, {"vectorized": True, "rebalance_days": 3}),
+    ]
+    columns = job_indicators(jobs)
+    df = calculate_indicators(_prices_hitting_every_rule(n_tokens=10, seed=5), columns=columns)
+    data = BacktestData(df, columns)
+
+    portfolios = run_backtests(data, jobs, workers=2)
+
+    for (module, params), result in zip(jobs, portfolios):
+        pd.testing.assert_frame_equal(result, module.backtest_strategy(df, **params))
+
+
+def test_sweep_reports_missing_indicators(data):
+    with pytest.raises(KeyError, match="volatility_30d"):
+        run_sweep(data, high_volatility, [{"top_pct": 0.1}], workers=1)
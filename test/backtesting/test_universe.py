@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from src.backtesting.data_cleaner import apply_quality_filters
+from src.backtesting.indicator_cache import IndicatorCache
+from src.backtesting.indicators import calculate_indicators
+from src.backtesting.strategies import sma_strategy
+from src.backtesting.universe import Universe
+from test.backtesting.test_indicators import _random_prices
+
+
+def _prices_hitting_every_rule(n_tokens=20, n_days=200, seed=3):
+    rng = np.random.default_rng(seed)
+    df = _random_prices(n_tokens=n_tokens, n_days=n_days, seed=seed)
+    # Market caps around the 5M threshold, zero-volume days and price spikes
+    df["market_cap"] = rng.choice([1e6, 4.99e6, 5e6, 6e6], len(df), p=[0.05, 0.05, 0.05, 0.85])
+    df.loc[rng.random(len(df)) < 0.05, "total_volume"] = 0.0
+    spike = rng.random(len(df)) < 0.01
+    df.loc[spike, "value"] *= rng.choice([0.2, 3.0, 3.1], spike.sum())
+    return df
+
+
+def test_universe_matches_apply_quality_filters_on_every_date():
+    df = _prices_hitting_every_rule()
+    universe = Universe.from_frame(df)
+
+    n_selected = 0
+    for date in sorted(df["timestamp"].unique()):
+        expected = apply_quality_filters(df, date)
+        assert universe.eligible_tokens(date) == expected
+        n_selected += len(expected)
+    assert n_selected > 0
+
+
+def test_universe_dates_between_and_before_rows():
+    df = _prices_hitting_every_rule()
+    universe = Universe.from_frame(df)
+    first, last = df["timestamp"].min(), df["timestamp"].max()
+
+    assert universe.eligible_tokens(first - pd.Timedelta(days=1)) == []
+    assert universe.eligible_tokens(last + pd.Timedelta(days=3)) == apply_quality_filters(df, last)
+
+
+def test_universe_round_trips_through_disk_and_cache(tmp_path):
+    df = _prices_hitting_every_rule()
+    universe = Universe.from_frame(df, cache=IndicatorCache(tmp_path / "cache"))
+    universe.save(tmp_path / "universe")
+
+    loaded = Universe.load(tmp_path / "universe")
+    cached = Universe.from_frame(df, cache=IndicatorCache(tmp_path / "cache"))
+
+    for other in (loaded, cached):
+        np.testing.assert_array_equal(other.eligible, universe.eligible)
+        assert other.dates.equals(universe.dates)
+        assert other.tokens.equals(universe.tokens)
+
+
+class _ApplyQualityFilters:
+    """The per-date reference selection, behind the Universe interface."""
+
+    def __init__(self, df):
+        self.df = df
+        self.tokens = pd.Index(sorted(df["token_address"].unique()))
+
+    def row(self, date):
+        return self.tokens.isin(apply_quality_filters(self.df, date))
+
+
+def test_strategy_selections_are_unchanged():
+    df = calculate_indicators(_prices_hitting_every_rule(n_tokens=10), columns=["sma_5"])
+
+    expected = sma_strategy.backtest_strategy(df, sma_period=5, universe=_ApplyQualityFilters(df))
+    result = sma_strategy.backtest_strategy(df, sma_period=5)
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.backtesting.window_sums import WindowSums
+
+
+def _tokens(lengths, seed=0):
+    """Token-contiguous random walks of very different magnitudes."""
+    rng = np.random.default_rng(seed)
+    values, token_start, start = [], [], 0
+    for i, n in enumerate(lengths):
+        values.append(10.0 ** (4 * i - 6) * np.exp(np.cumsum(rng.normal(0, 0.1, n))))
+        token_start.append(np.full(n, start))
+        start += n
+    return np.concatenate(values), np.concatenate(token_start)
+
+
+def _rolling(values, token_start, window, how):
+    series = pd.Series(values)
+    grouped = series.groupby(token_start).rolling(window, min_periods=window)
+    return getattr(grouped, how)().to_numpy()
+
+
+@pytest.mark.parametrize("window", [1, 2, 5, 20, 50])
+def test_mean_and_std_match_rolling_per_token(window):
+    values, token_start = _tokens([3, 60, 120, 40])
+    values[[70, 150]] = np.nan
+    sums = WindowSums(values, token_start)
+
+    np.testing.assert_allclose(sums.mean(window), _rolling(values, token_start, window, "mean"), rtol=1e-10)
+    if window > 1:
+        np.testing.assert_allclose(sums.std(window), _rolling(values, token_start, window, "std"), rtol=1e-8)
+
+
+def test_cancelling_windows_are_recomputed_exactly():
+    # A long flat stretch after a large move, then zeros: prefix-sum differences
+    # cancel almost completely there
+    values = np.concatenate([np.linspace(1e6, 1e6 + 1, 200), np.full(30, 1.0), np.zeros(20)])
+    token_start = np.zeros(len(values), dtype=int)
+    sums = WindowSums(values, token_start)
+
+    assert (sums.mean(10)[-10:] == 0.0).all()
+    assert (sums.std(10)[-10:] == 0.0).all()
+    # Compared with a direct computation: pandas' running std is itself off by
+    # ~1e-6 relative on the 1e6-offset stretch
+    direct = np.concatenate([np.full(19, np.nan), sliding_window_view(values, 20).std(axis=1, ddof=1)])
+    np.testing.assert_allclose(sums.std(20), direct, rtol=1e-12, atol=1e-15)
@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import MagicMock
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
+
+from src.data.coverage import TokenCoverage
 
 
 def test_get_live_latest_timestamp_returns_latest_ts(mocker):
@@ -26,7 +28,19 @@ def test_get_live_latest_timestamp_returns_latest_ts(mocker):
     mock_db_service.get_latest_price_date.assert_called_once_with(schema="live")
 
 
-def test_get_prices_uses_fallback_when_no_latest(mocker):
+def _patch_live_db(mocker, coverage):
+    mock_conn = MagicMock()
+    mock_conn.__enter__.return_value = mock_conn
+    mocker.patch("psycopg2.connect", return_value=mock_conn)
+
+    mock_db_service = MagicMock()
+    mock_db_service.get_price_coverage.return_value = coverage
+    mock_db_service.get_empty_fetch_windows.return_value = set()
+    mocker.patch("src.data.DBService", return_value=mock_db_service)
+    return mock_db_service
+
+
+def test_get_prices_uses_fallback_when_no_coverage(mocker):
     # Arrange
     fixed_now = datetime(2026, 1, 28, 10, 0, 0, tzinfo=timezone.utc)
 
@@ -36,11 +50,12 @@ def test_get_prices_uses_fallback_when_no_latest(mocker):
     mock_datetime.now.return_value = fixed_now
 
     mocker.patch("src.bot.historical_prices.DEFAULT_LOOKBACK_DAYS", 120)
-    mocker.patch("src.bot.historical_prices.get_live_latest_timestamp", return_value=None)
+    mock_db_service = _patch_live_db(mocker, coverage={})
 
     mock_check = mocker.patch("src.bot.historical_prices.check_new_tokens")
     mock_get_tokens = mocker.patch("src.data.get_available_tokens", return_value=["t1", "t2"])
-    mock_fetch = mocker.patch("src.data.fetch_historical_prices")
+    mock_iter = mocker.patch("src.data.iter_planned_prices", return_value=iter([]))
+    mock_stream = mocker.patch("src.data.stream_prices_to_db", return_value=0)
 
     # Act
     from src.bot.historical_prices import get_prices
@@ -49,26 +64,68 @@ def test_get_prices_uses_fallback_when_no_latest(mocker):
     # Assert
     mock_check.assert_called_once()
     mock_get_tokens.assert_called_once()
+    mock_db_service.get_price_coverage.assert_called_once_with(schema="live")
 
-    expected_start = fixed_now - timedelta(days=120)
-    mock_fetch.assert_called_once_with(["t1", "t2"], start_date=expected_start)
+    expected_start = datetime(2025, 9, 30)
+    expected_end = datetime(2026, 1, 28)
+    windows = mock_iter.call_args.args[0]
+    assert windows == [("t1", expected_start, expected_end), ("t2", expected_start, expected_end)]
+    assert mock_stream.call_args.kwargs["schema"] == "live"
 
 
-def test_get_prices_uses_latest_timestamp_when_present(mocker):
+def test_get_prices_fetches_only_missing_days(mocker):
     # Arrange
-    latest_ts = datetime(2026, 1, 10, 8, 30, tzinfo=timezone.utc)
+    fixed_now = datetime(2026, 1, 28, 10, 0, 0, tzinfo=timezone.utc)
+    mock_datetime = mocker.patch("src.bot.historical_prices.datetime")
+    mock_datetime.now.return_value = fixed_now
 
-    mocker.patch("src.bot.historical_prices.get_live_latest_timestamp", return_value=latest_ts)
+    coverage = {
+        # Up to date: nothing to fetch
+        "current": TokenCoverage(date(2025, 1, 1), date(2026, 1, 28), 393, []),
+        # Behind with a hole: fetch the hole and the tail
+        "behind": TokenCoverage(date(2025, 1, 1), date(2026, 1, 20), 370, [(date(2025, 11, 1), date(2025, 11, 3))]),
+    }
+    _patch_live_db(mocker, coverage=coverage)
 
-    mock_check = mocker.patch("src.bot.historical_prices.check_new_tokens")
-    mock_get_tokens = mocker.patch("src.data.get_available_tokens", return_value=["a"])
-    mock_fetch = mocker.patch("src.data.fetch_historical_prices")
+    mocker.patch("src.bot.historical_prices.check_new_tokens")
+    mocker.patch("src.data.get_available_tokens", return_value=["current", "behind"])
+    mock_iter = mocker.patch("src.data.iter_planned_prices", return_value=iter([]))
+    mocker.patch("src.data.stream_prices_to_db", return_value=0)
 
     # Act
     from src.bot.historical_prices import get_prices
     get_prices()
 
-    # Assert
-    mock_check.assert_called_once()
-    mock_get_tokens.assert_called_once()
-    mock_fetch.assert_called_once_with(["a"], start_date=latest_ts)
+    # Assert: hole and tail fit in a single 365-day request
+    windows = mock_iter.call_args.args[0]
+    assert windows == [("behind", datetime(2025, 11, 1), datetime(2026, 1, 28))]
+
+
+def test_get_prices_skips_gaps_the_journal_marks_empty(mocker):
+    # Arrange
+    fixed_now = datetime(2026, 1, 28, 10, 0, 0, tzinfo=timezone.utc)
+    mock_datetime = mocker.patch("src.bot.historical_prices.datetime")
+    mock_datetime.now.return_value = fixed_now
+
+    coverage = {
+        "behind": TokenCoverage(date(2025, 1, 1), date(2026, 1, 20), 370, [(date(2025, 11, 1), date(2025, 11, 3))]),
+    }
+    mock_db_service = _patch_live_db(mocker, coverage=coverage)
+    mock_db_service.get_empty_fetch_windows.return_value = {("behind", date(2025, 11, 1), date(2025, 11, 3))}
+
+    mocker.patch("src.bot.historical_prices.check_new_tokens")
+    mocker.patch("src.data.get_available_tokens", return_value=["behind"])
+    mock_iter = mocker.patch("src.data.iter_planned_prices", return_value=iter([]))
+    mock_stream = mocker.patch("src.data.stream_prices_to_db", return_value=0)
+
+    # Act
+    from src.bot.historical_prices import get_prices
+    get_prices()
+
+    # Assert: only the tail is requested, and new windows are journaled
+    windows = mock_iter.call_args.args[0]
+    assert windows == [("behind", datetime(2026, 1, 21), datetime(2026, 1, 28))]
+    network, schema = mock_db_service.get_empty_fetch_windows.call_args.args
+    assert schema == "live"
+    assert mock_stream.call_args.kwargs["journal_network"] == network
+    assert mock_stream.call_args.kwargs["schema"] == "live"
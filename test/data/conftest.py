@@ -0,0 +1,17 @@
+import pytest
+
+from src.data.rate_limiter import AdaptiveRateLimiter
+
+
+@pytest.fixture
+def fake_clock_limiter():
+    """AdaptiveRateLimiter on a fake clock: sleeps are recorded and advance the clock instantly."""
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = AdaptiveRateLimiter(requests_per_hour=3600, burst=10, clock=lambda: now[0], sleep=sleep)
+    return limiter, sleeps
@@ -0,0 +1,108 @@
+import pytest
+from datetime import date, datetime
+
+from src.data.coverage import TokenCoverage, merge_ranges, missing_ranges, plan_fetch_windows, subtract_ranges
+
+
+def test_missing_ranges_for_uncovered_token():
+    assert missing_ranges(None, date(2024, 1, 1), date(2024, 3, 1)) == [(date(2024, 1, 1), date(2024, 3, 1))]
+
+
+def test_missing_ranges_head_gaps_and_tail():
+    coverage = TokenCoverage(
+        date(2024, 2, 1), date(2024, 5, 1), 80,
+        [(date(2024, 3, 1), date(2024, 3, 5)), (date(2024, 4, 10), date(2024, 4, 10))],
+    )
+
+    result = missing_ranges(coverage, date(2024, 1, 1), date(2024, 5, 10))
+
+    assert result == [
+        (date(2024, 1, 1), date(2024, 1, 31)),
+        (date(2024, 3, 1), date(2024, 3, 5)),
+        (date(2024, 4, 10), date(2024, 4, 10)),
+        (date(2024, 5, 2), date(2024, 5, 10)),
+    ]
+
+
+def test_missing_ranges_up_to_date_token_needs_nothing():
+    coverage = TokenCoverage(date(2024, 1, 1), date(2024, 5, 10), 131, [])
+    assert missing_ranges(coverage, date(2024, 3, 1), date(2024, 5, 10)) == []
+
+
+def test_merge_ranges_combines_ranges_within_request_limit():
+    ranges = [
+        (date(2024, 1, 1), date(2024, 1, 10)),
+        (date(2024, 6, 1), date(2024, 6, 2)),
+        (date(2024, 12, 30), date(2025, 1, 5)),
+    ]
+
+    # 2024-01-01 + 364 days = 2024-12-30: the third range is split at the window edge
+    assert merge_ranges(ranges, max_days=365) == [
+        (date(2024, 1, 1), date(2024, 12, 30)),
+        (date(2024, 12, 31), date(2025, 1, 5)),
+    ]
+
+
+def test_merge_ranges_splits_long_ranges():
+    windows = merge_ranges([(date(2021, 1, 1), date(2023, 12, 31))], max_days=365)
+
+    assert len(windows) == 3
+    assert windows[0] == (date(2021, 1, 1), date(2021, 12, 31))
+    assert windows[-1] == (date(2023, 1, 1), date(2023, 12, 31))
+    assert all((e - s).days < 365 for s, e in windows)
+
+
+def test_plan_fetch_windows_returns_datetimes_per_token():
+    coverage = {"0xaaa": TokenCoverage(date(2024, 1, 1), date(2024, 3, 1), 61, [])}
+
+    plan = plan_fetch_windows(["0xaaa", "0xbbb", "0xaaa"], coverage, date(2024, 1, 1), date(2024, 3, 3))
+
+    assert plan == [
+        ("0xaaa", datetime(2024, 3, 2), datetime(2024, 3, 3)),
+        ("0xbbb", datetime(2024, 1, 1), datetime(2024, 3, 3)),
+    ]
+
+
+def test_missing_ranges_clips_gaps_to_requested_range():
+    coverage = TokenCoverage(
+        first_day=date(2024, 1, 1),
+        last_day=date(2024, 12, 31),
+        n_days=300,
+        gaps=[(date(2024, 2, 1), date(2024, 3, 31)), (date(2024, 10, 1), date(2024, 11, 30))],
+    )
+
+    ranges = missing_ranges(coverage, date(2024, 3, 1), date(2024, 10, 15))
+
+    assert ranges == [(date(2024, 3, 1), date(2024, 3, 31)), (date(2024, 10, 1), date(2024, 10, 15))]
+
+
+def test_missing_ranges_skips_gaps_outside_requested_range():
+    coverage = TokenCoverage(date(2024, 1, 1), date(2024, 12, 31), 360, [(date(2024, 2, 1), date(2024, 2, 5))])
+
+    assert missing_ranges(coverage, date(2024, 6, 1), date(2024, 12, 31)) == []
+
+
+def test_subtract_ranges_removes_covered_days():
+    ranges = [(date(2024, 1, 1), date(2024, 1, 31)), (date(2024, 3, 1), date(2024, 3, 5))]
+    holes = [(date(2024, 1, 10), date(2024, 1, 12)), (date(2024, 1, 25), date(2024, 2, 10)), (date(2024, 3, 1), date(2024, 3, 5))]
+
+    assert subtract_ranges(ranges, holes) == [(date(2024, 1, 1), date(2024, 1, 9)), (date(2024, 1, 13), date(2024, 1, 24))]
+
+
+def test_plan_fetch_windows_skips_known_empty_gaps_but_retries_the_tail():
+    coverage = {
+        "0xaaa": TokenCoverage(date(2023, 3, 1), date(2023, 12, 20), 290, [(date(2023, 6, 1), date(2023, 6, 10))]),
+    }
+    known_empty = {
+        ("0xaaa", date(2023, 1, 1), date(2023, 2, 28)),
+        ("0xaaa", date(2023, 6, 1), date(2023, 6, 10)),
+        ("0xaaa", date(2023, 12, 21), date(2023, 12, 31)),
+        ("0xbbb", date(2023, 1, 1), date(2023, 12, 31)),
+    }
+
+    plan = plan_fetch_windows(["0xaaa", "0xbbb"], coverage, date(2023, 1, 1), date(2023, 12, 31), known_empty=known_empty)
+
+    assert plan == [
+        ("0xaaa", datetime(2023, 12, 21), datetime(2023, 12, 31)),
+        ("0xbbb", datetime(2023, 1, 1), datetime(2023, 12, 31)),
+    ]
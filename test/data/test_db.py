@@ -1,13 +1,23 @@
 import pytest
 import pandas as pd
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock
 from psycopg2.extras import execute_values
-from src.data.db import DBService
+from src.data.db import DBService, UpsertCounts
 from src.sql.public import (
     INSERT_CONTRACTS_SQL,
     CREATE_CONTRACTS_TABLE_SQL,
     SELECT_CONTRACTS_SQL,
+    CREATE_FETCH_JOURNAL_TABLE_SQL,
+    UPSERT_FETCH_JOURNAL_SQL,
+    SELECT_FINISHED_FETCH_WINDOWS_SQL,
+    SELECT_COMPLETED_FETCH_TOKENS_SQL,
+    SELECT_EMPTY_FETCH_WINDOWS_SQL,
+    CREATE_DEAD_TOKENS_TABLE_SQL,
+    UPSERT_DEAD_TOKENS_SQL,
+    SELECT_DEAD_TOKENS_SQL,
+    CREATE_PRICES_STAGING_TABLE_SQL,
+    COPY_PRICES_STAGING_SQL,
 )
 
 def test_dbservice_store_tokens(mocker):
@@ -96,6 +106,8 @@ def test_dbservice_store_prices(mocker, schema):
     mock_conn = MagicMock()
     mock_cursor = MagicMock()
     mock_cursor.connection.encoding = "UTF8"
+    # prices table not created yet
+    mock_cursor.fetchone.return_value = None
     mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
     mock_execute_values = mocker.patch("src.data.db.execute_values")
@@ -132,6 +144,111 @@ def test_dbservice_store_prices(mocker, schema):
 
     mock_conn.commit.assert_called()
 
+def test_dbservice_store_prices_creates_schema_once(mocker):
+    mocker.patch("src.data.db.execute_values")
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = None
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    db_service = DBService(mock_conn)
+    db_service.ensure_price_schema("live")
+    n_ddl = mock_cursor.execute.call_count
+    db_service.ensure_price_schema("live")
+    db_service.store_prices("0xaaa", [{"value": "1", "timestamp": "2024-01-01T00:00:00Z"}], schema="live")
+
+    # Catalog lookup, then the DDL
+    assert n_ddl == 7
+    assert mock_cursor.execute.call_count == n_ddl
+
+
+def test_dbservice_ensure_price_schema_skips_ddl_for_an_up_to_date_table(mocker):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = (1,)
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    DBService(mock_conn).ensure_price_schema("live")
+
+    # Only the catalog lookup: no ALTER TABLE or CREATE INDEX locking the table
+    mock_cursor.execute.assert_called_once()
+    query, params = mock_cursor.execute.call_args.args
+    assert "information_schema.columns" in query and params == ("live",)
+
+
+def test_dbservice_store_prices_reports_upsert_counts(mocker):
+    mock_execute_values = mocker.patch("src.data.db.execute_values", return_value=[(True,), (False,)])
+    prices = [{"value": str(i), "timestamp": f"2024-01-0{i}T00:00:00Z"} for i in range(1, 5)]
+
+    db_service = DBService(MagicMock())
+    counts = db_service.store_prices("0xaaa", prices, schema="live")
+
+    # Two rows written (one new, one changed), two identical rows left alone
+    assert counts == UpsertCounts(inserted=1, updated=1, skipped=2)
+    insert_sql = str(mock_execute_values.call_args[0][1])
+    assert "IS DISTINCT FROM" in insert_sql and "RETURNING" in insert_sql
+    assert mock_execute_values.call_args.kwargs["fetch"] is True
+
+
+@pytest.mark.parametrize("schema", ["backtest", "live"])
+def test_dbservice_store_prices_bulk(schema):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.connection.encoding = "UTF8"
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    copied = []
+    mock_cursor.copy_expert.side_effect = lambda statement, f: copied.append(f.read())
+    mock_cursor.fetchone.return_value = (1, 0)
+
+    prices_by_token = {
+        "0xaaa": [
+            {"value": "1.5", "timestamp": "2024-01-01T00:00:00Z", "marketCap": "100", "totalVolume": "10"},
+            {"value": "1.6", "timestamp": "2024-01-01T00:00:00Z", "marketCap": None, "totalVolume": "11"},
+            {"value": None, "timestamp": "2024-01-02T00:00:00Z"},
+        ],
+        "0xbbb": [{"value": "2", "timestamp": "2024-01-01T00:00:00Z", "marketCap": "200", "totalVolume": "20"}],
+    }
+
+    db_service = DBService(mock_conn)
+    counts = db_service.store_prices_bulk(prices_by_token, schema=schema)
+
+    assert counts == UpsertCounts(inserted=1, updated=0, skipped=1)
+    assert mock_cursor.copy_expert.call_args[0][0] == COPY_PRICES_STAGING_SQL
+    # Duplicates keep the last row, missing values become NULLs (empty CSV fields)
+    assert copied == ["0xaaa,1.6,2024-01-01T00:00:00Z,,11\r\n0xbbb,2,2024-01-01T00:00:00Z,200,20\r\n"]
+
+    executed_sql = [str(c.args[0]) for c in mock_cursor.execute.call_args_list]
+    assert CREATE_PRICES_STAGING_TABLE_SQL in executed_sql
+    merge_sql = executed_sql[-1]
+    assert "INSERT INTO" in merge_sql and schema in merge_sql and "FROM prices_staging" in merge_sql
+    assert "IS DISTINCT FROM" in merge_sql
+    mock_conn.commit.assert_called()
+
+
+def test_dbservice_store_prices_bulk_dedups_spellings_of_one_instant():
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    copied = []
+    mock_cursor.copy_expert.side_effect = lambda statement, f: copied.append(f.read())
+    mock_cursor.fetchone.return_value = (1, 0)
+
+    prices_by_token = {
+        "0xaaa": [
+            {"value": "1.5", "timestamp": "2024-01-01T00:00:00Z"},
+            {"value": "1.6", "timestamp": "2024-01-01T00:00:00+00:00"},
+            {"value": "1.7", "timestamp": "2024-01-01T01:00:00+01:00"},
+            {"value": "2.0", "timestamp": "2024-01-02T00:00:00.000Z"},
+        ],
+    }
+
+    counts = DBService(mock_conn).store_prices_bulk(prices_by_token)
+
+    # One row per instant, holding its last occurrence
+    assert copied == ["0xaaa,1.7,2024-01-01T01:00:00+01:00,,\r\n0xaaa,2.0,2024-01-02T00:00:00.000Z,,\r\n"]
+    assert counts == UpsertCounts(inserted=1, updated=0, skipped=1)
+
+
 @pytest.mark.parametrize("schema", ["backtest", "live"])
 def test_dbservice_get_prices(mocker, schema):
     mock_conn = MagicMock()
@@ -147,6 +264,7 @@ def test_dbservice_get_prices(mocker, schema):
             "251110346.4283975",
             "37756712.67544287",
             "2026-01-04 12:35:23.576 +0100",
+            "2026-02-01 09:00:00.000 +0100",
         ),
         (
             "0xabcdefabcdefabcdefabcdefabcdefabcdef",
@@ -156,9 +274,22 @@ def test_dbservice_get_prices(mocker, schema):
             "123456789.12345",
             "9876543.21",
             "2026-01-01 08:00:00.000 +01:00",
+            "2026-02-01 09:00:00.000 +0100",
         ),
     ]
-    mock_cursor.fetchall.return_value = mock_data
+    # The table has updated_at as an eighth column: SELECT * would return it too
+    table_columns = [
+        "uid", "token_address", "value", "timestamp", "market_cap", "total_volume", "created_at", "updated_at",
+    ]
+
+    def fetchall():
+        query = str(mock_cursor.execute.call_args[0][0])
+        if "SELECT *" in query:
+            return mock_data
+        selected = [i for i, c in enumerate(table_columns) if f"Identifier('{c}')" in query]
+        return [tuple(row[i] for i in selected) for row in mock_data]
+
+    mock_cursor.fetchall.side_effect = fetchall
     mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
     db_service = DBService(mock_conn)
@@ -167,13 +298,13 @@ def test_dbservice_get_prices(mocker, schema):
     result = db_service.get_prices(schema=schema)
 
     executed_sql = str(mock_cursor.execute.call_args[0][0])
-    assert "SELECT * FROM" in executed_sql
+    assert "SELECT *" not in executed_sql
     assert schema in executed_sql
     assert ".prices" in executed_sql
 
 
     expected_df = pd.DataFrame(
-        mock_data,
+        [row[:7] for row in mock_data],
         columns=[
             "uid",
             "token_address",
@@ -192,6 +323,101 @@ def test_dbservice_get_prices(mocker, schema):
 
     pd.testing.assert_frame_equal(result, expected_df)
 
+@pytest.mark.parametrize("schema", ["backtest", "live"])
+def test_dbservice_read_prices_pushes_filters_into_copy(schema):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mock_cursor.mogrify.side_effect = lambda query, params: f"{query!r} {params!r}".encode()
+    mock_cursor.copy_expert.side_effect = lambda statement, f: f.write(
+        "0xaaa,1.5,1704067200,1000.25,\n0xbbb,2,1704153600,,30\n"
+    )
+
+    db_service = DBService(mock_conn)
+    df = db_service.read_prices(
+        schema=schema,
+        columns=["token_address", "value", "timestamp", "market_cap", "total_volume"],
+        start=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        tokens=["0xaaa", "0xbbb"],
+        exclude_tokens=["0xusdc"],
+    )
+
+    statement = mock_cursor.copy_expert.call_args[0][0]
+    assert "COPY" in statement and "TO STDOUT" in statement and schema in statement
+    assert "timestamp >= %s" in statement and "NOT (token_address = ANY(%s))" in statement
+    assert "uid" not in statement and "created_at" not in statement
+
+    assert df["token_address"].tolist() == ["0xaaa", "0xbbb"]
+    assert df["value"].dtype == "float64" and df["value"].tolist() == [1.5, 2.0]
+    assert df["market_cap"].isna().tolist() == [False, True]
+    assert df["total_volume"].isna().tolist() == [True, False]
+    assert df["timestamp"].tolist() == [
+        pd.Timestamp("2024-01-01", tz="UTC"),
+        pd.Timestamp("2024-01-02", tz="UTC"),
+    ]
+
+
+def test_dbservice_read_prices_projects_columns():
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mock_cursor.mogrify.side_effect = lambda query, params: repr(query).encode()
+
+    df = DBService(mock_conn).read_prices(columns=["token_address", "value"])
+
+    assert list(df.columns) == ["token_address", "value"]
+    assert df.empty
+    with pytest.raises(ValueError):
+        DBService(mock_conn).read_prices(columns=["uid"])
+
+
+def _streaming_conn(chunks):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mock_cursor.fetchmany.side_effect = list(chunks) + [[]]
+    return mock_conn, mock_cursor
+
+
+def test_dbservice_iter_prices_streams_chunks_from_named_cursor():
+    ts = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    mock_conn, mock_cursor = _streaming_conn([
+        [("0xaaa", 1.0, ts), ("0xaaa", 2.0, ts)],
+        [("0xbbb", 3.0, ts)],
+    ])
+
+    chunks = list(DBService(mock_conn).iter_prices(
+        schema="live", columns=["token_address", "value", "timestamp"], chunk_size=2,
+    ))
+
+    assert mock_conn.cursor.call_args.kwargs["name"]
+    query = str(mock_cursor.execute.call_args[0][0])
+    assert "ORDER BY token_address, timestamp" in query and "live" in query
+    mock_cursor.fetchmany.assert_called_with(2)
+    assert [len(c) for c in chunks] == [2, 1]
+    assert chunks[0]["value"].dtype == "float64"
+    assert str(chunks[0]["timestamp"].dt.tz) == "UTC"
+    mock_conn.commit.assert_called()
+
+
+def test_dbservice_iter_prices_by_token_yields_complete_groups():
+    mock_conn, _ = _streaming_conn([
+        [("0xaaa", 1.0), ("0xaaa", 2.0), ("0xbbb", 3.0)],
+        [("0xbbb", 4.0), ("0xbbb", 5.0), ("0xbbb", 6.0)],
+        [("0xccc", 7.0)],
+    ])
+
+    chunks = list(DBService(mock_conn).iter_prices(
+        columns=["token_address", "value"], chunk_size=3, by_token=True,
+    ))
+
+    assert [c["token_address"].unique().tolist() for c in chunks] == [["0xaaa"], ["0xbbb"], ["0xccc"]]
+    assert chunks[1]["value"].tolist() == [3.0, 4.0, 5.0, 6.0]
+
+    with pytest.raises(ValueError):
+        list(DBService(mock_conn).iter_prices(columns=["value"], by_token=True))
+
+
 @pytest.mark.parametrize("schema", ["backtest", "live"])
 def test_dbservice_get_latest_price_date_returns_datetime(mocker, schema):
     mock_conn = MagicMock()
@@ -347,3 +573,127 @@ def test_dbservice_get_prices_distinct_tokens_raises_and_logs(mocker):
     logger_mock.exception.assert_called_once_with(
         "Failed to get all distinct token addresses in price table"
     )
+
+
+def test_dbservice_record_fetch_windows(mocker):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.connection.encoding = "UTF8"
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    mock_execute_values = mocker.patch("src.data.db.execute_values")
+
+    entries = [
+        ("0xaaa", datetime(2024, 1, 1).date(), datetime(2024, 12, 30).date(), "completed", 365, None),
+        ("0xbbb", datetime(2024, 1, 1).date(), datetime(2024, 12, 30).date(), "failed", 0, "boom"),
+    ]
+
+    db_service = DBService(mock_conn)
+    db_service.record_fetch_windows("arb-mainnet", entries)
+
+    assert mock_cursor.execute.call_args_list[0][0][0] == CREATE_FETCH_JOURNAL_TABLE_SQL
+    assert mock_execute_values.call_args[0][1] == UPSERT_FETCH_JOURNAL_SQL
+    assert mock_execute_values.call_args[0][2] == [("arb-mainnet", "backtest", *e) for e in entries]
+    mock_conn.commit.assert_called()
+
+
+def test_dbservice_get_finished_fetch_windows(mocker):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.connection.encoding = "UTF8"
+    window = (datetime(2024, 1, 1).date(), datetime(2024, 12, 30).date())
+    mock_cursor.fetchall.return_value = [("0xaaa", *window), ("0xbbb", *window)]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    db_service = DBService(mock_conn)
+    result = db_service.get_finished_fetch_windows("arb-mainnet")
+
+    select_call = mock_cursor.execute.call_args_list[1]
+    assert select_call[0] == (SELECT_FINISHED_FETCH_WINDOWS_SQL, ("arb-mainnet", "backtest"))
+    assert result == {("0xaaa", *window), ("0xbbb", *window)}
+
+
+def test_dbservice_get_completed_fetch_tokens(mocker):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = [("0xaaa",), ("0xbbb",)]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    db_service = DBService(mock_conn)
+    result = db_service.get_completed_fetch_tokens("arb-mainnet")
+
+    assert mock_cursor.execute.call_args_list[1][0] == (SELECT_COMPLETED_FETCH_TOKENS_SQL, ("arb-mainnet", "backtest"))
+    assert result == {"0xaaa", "0xbbb"}
+
+
+def test_dbservice_get_empty_fetch_windows(mocker):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    window = (datetime(2024, 1, 1).date(), datetime(2024, 12, 30).date())
+    mock_cursor.fetchall.return_value = [("0xaaa", *window)]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    db_service = DBService(mock_conn)
+    result = db_service.get_empty_fetch_windows("arb-mainnet", schema="live")
+
+    assert mock_cursor.execute.call_args_list[1][0] == (SELECT_EMPTY_FETCH_WINDOWS_SQL, ("arb-mainnet", "live"))
+    assert result == {("0xaaa", *window)}
+
+
+def test_dbservice_mark_dead_tokens(mocker):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mock_execute_values = mocker.patch("src.data.db.execute_values")
+
+    db_service = DBService(mock_conn)
+    db_service.mark_dead_tokens("arb-mainnet", {"0xaaa": ("empty", None), "0xbbb": ("failed", "boom")})
+
+    assert mock_cursor.execute.call_args_list[0][0][0] == CREATE_DEAD_TOKENS_TABLE_SQL
+    assert mock_execute_values.call_args[0][1] == UPSERT_DEAD_TOKENS_SQL
+    assert mock_execute_values.call_args[0][2] == [
+        ("arb-mainnet", "0xaaa", "empty", None),
+        ("arb-mainnet", "0xbbb", "failed", "boom"),
+    ]
+    mock_conn.commit.assert_called()
+
+
+def test_dbservice_get_dead_tokens(mocker):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = [("0xaaa",), ("0xbbb",)]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    db_service = DBService(mock_conn)
+    result = db_service.get_dead_tokens("arb-mainnet", timedelta(days=30), timedelta(hours=24))
+
+    select_call = mock_cursor.execute.call_args_list[1]
+    assert select_call[0] == (SELECT_DEAD_TOKENS_SQL, ("arb-mainnet", timedelta(days=30), timedelta(hours=24)))
+    assert result == {"0xaaa", "0xbbb"}
+
+
+@pytest.mark.parametrize("schema", ["backtest", "live"])
+def test_dbservice_get_price_coverage(mocker, schema):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.connection.encoding = "UTF8"
+    d = lambda day: datetime(2024, 1, day).date()
+    mock_cursor.fetchall.return_value = [
+        ("0xaaa", d(1), d(20), 15, [d(5), d(12)], [d(7), d(14)]),
+        ("0xbbb", d(3), d(4), 2, [], []),
+    ]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    db_service = DBService(mock_conn)
+    result = db_service.get_price_coverage(schema=schema)
+
+    executed_sql = str(mock_cursor.execute.call_args[0][0])
+    assert "LAG(" in executed_sql
+    assert "GROUP BY token_address" in executed_sql
+    assert schema in executed_sql
+    assert mock_cursor.execute.call_count == 1
+
+    assert result["0xaaa"].first_day == d(1)
+    assert result["0xaaa"].last_day == d(20)
+    assert result["0xaaa"].gaps == [(d(5), d(7)), (d(12), d(14))]
+    assert result["0xbbb"].gaps == []
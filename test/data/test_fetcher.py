@@ -1,6 +1,13 @@
 import re
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from datetime import datetime
 from unittest.mock import MagicMock
+
+import pytest
+import requests
+
 from src.data.fetcher import get_available_tokens, get_token_prices
 
 ETH_ADDRESS_REGEX = re.compile(r"^0x[a-fA-F0-9]{40}$")
@@ -16,7 +23,7 @@ def test_get_available_tokens_format(mocker):
     }
 
     mocker.patch(
-        "src.data.fetcher.requests.get",
+        "src.data.fetcher.http_client.get",
         return_value=fake_response,
     )
 
@@ -48,7 +55,7 @@ def test_get_token_prices(mocker):
     }
 
     mock_get = mocker.patch(
-        "src.data.fetcher.requests.post",
+        "src.data.fetcher.http_client.post",
         return_value=fake_response,
     )
 
@@ -73,3 +80,88 @@ def test_get_token_prices(mocker):
     }
 
     mock_get.assert_called_once()
+
+
+class _StubAlchemy(BaseHTTPRequestHandler):
+    """Local stand-in for the Alchemy prices API returning scripted 429s."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests += 1
+        if self.server.throttle_remaining > 0:
+            self.server.throttle_remaining -= 1
+            body = json.dumps({"error": {"message": "Too many requests"}}).encode()
+            self.send_response(429)
+            if self.server.retry_after is not None:
+                self.send_header("Retry-After", self.server.retry_after)
+        else:
+            body = json.dumps({"data": {"prices": [{"value": "1.00", "timestamp": "2024-01-01T00:00:00Z"}]}}).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_alchemy(mocker):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StubAlchemy)
+    httpd.requests = 0
+    httpd.throttle_remaining = 0
+    httpd.retry_after = "0"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    settings = mocker.patch("src.data.fetcher.alchemy_settings")
+    settings.get_token_historical_prices_url = f"http://127.0.0.1:{httpd.server_port}/historical"
+    settings.headers = {"Content-Type": "application/json"}
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_get_token_prices_retries_after_429_and_backs_off(stub_alchemy, fake_clock_limiter):
+    stub_alchemy.throttle_remaining = 2
+    stub_alchemy.retry_after = "0"
+    limiter, _ = fake_clock_limiter
+
+    prices = list(get_token_prices(
+        "arb-mainnet", "0xaaa", datetime(2024, 1, 1), datetime(2024, 1, 2), rate_limiter=limiter,
+    ))
+
+    assert prices == [{"value": "1.00", "timestamp": "2024-01-01T00:00:00Z"}]
+    assert stub_alchemy.requests == 3
+    # Two throttles in a row (no pause left in between) halve the rate twice, success ramps slightly
+    assert limiter.requests_per_hour < 3600 / 2
+
+
+def test_get_token_prices_uses_jittered_backoff_without_retry_after(stub_alchemy, mocker, fake_clock_limiter):
+    stub_alchemy.throttle_remaining = 1
+    stub_alchemy.retry_after = None
+    mocker.patch("src.data.fetcher.backoff_delay", return_value=0.0)
+    limiter, _ = fake_clock_limiter
+    mock_throttle = mocker.spy(limiter, "record_throttle")
+
+    prices = list(get_token_prices(
+        "arb-mainnet", "0xaaa", datetime(2024, 1, 1), datetime(2024, 1, 2), rate_limiter=limiter,
+    ))
+
+    assert len(prices) == 1
+    mock_throttle.assert_called_once_with(0.0)
+
+
+def test_get_token_prices_raises_after_max_retries(stub_alchemy, fake_clock_limiter):
+    stub_alchemy.throttle_remaining = 10
+    limiter, _ = fake_clock_limiter
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(get_token_prices(
+            "arb-mainnet", "0xaaa", datetime(2024, 1, 1), datetime(2024, 1, 2),
+            max_retries=2, rate_limiter=limiter,
+        ))
+
+    assert stub_alchemy.requests == 3
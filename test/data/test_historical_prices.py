@@ -1,12 +1,17 @@
+import threading
+import time
+
 import pytest
 from unittest.mock import MagicMock
 from datetime import datetime, timedelta
 
 from src.data.historical_prices import (
     fetch_historical_prices,
+    iter_historical_prices,
     MAX_DAYS_PER_REQUEST,
     DEFAULT_START_DATE,
     DEFAULT_END_DATE,
+    split_date_range,
 )
 
 
@@ -124,3 +129,131 @@ def test_fetch_historical_prices_defaults_to_eth_launch_and_now(mocker):
     assert first_call.kwargs["start"] == DEFAULT_START_DATE
     assert first_call.kwargs["end"] <= DEFAULT_END_DATE
 
+
+def test_fetch_historical_prices_concurrent_matches_sequential(mocker):
+    """
+    Test that the thread-pool mode returns the same prices, in window order,
+    as the sequential mode.
+    """
+    tokens = [f"0x{i:040x}" for i in range(5)]
+
+    def mock_get_token_prices(network, address, start, end):
+        return iter([{"value": f"{address}-{start.date()}", "timestamp": start.isoformat()}])
+
+    mocker.patch(
+        "src.data.historical_prices.get_token_prices",
+        side_effect=mock_get_token_prices,
+    )
+
+    start_date = datetime(2020, 1, 1)
+    end_date = datetime(2023, 6, 30)
+
+    sequential = fetch_historical_prices(tokens, start_date=start_date, end_date=end_date)
+    concurrent = fetch_historical_prices(
+        tokens, start_date=start_date, end_date=end_date, max_workers=4
+    )
+
+    assert concurrent == sequential
+    assert list(concurrent.keys()) == tokens
+    assert all(len(prices) == 4 for prices in concurrent.values())
+
+
+def test_fetch_historical_prices_skips_token_after_failed_window(mocker):
+    """
+    Test that a failing window drops the token and stops further requests for it.
+    """
+    good, bad = "0xgood", "0xbad"
+
+    def mock_get_token_prices(network, address, start, end):
+        if address == bad:
+            raise RuntimeError("boom")
+        return iter([{"value": "1.00", "timestamp": start.isoformat()}])
+
+    mock_get_prices = mocker.patch(
+        "src.data.historical_prices.get_token_prices",
+        side_effect=mock_get_token_prices,
+    )
+
+    result = fetch_historical_prices(
+        [bad, good], start_date=datetime(2020, 1, 1), end_date=datetime(2022, 12, 31)
+    )
+
+    assert list(result.keys()) == [good]
+    bad_calls = [c for c in mock_get_prices.call_args_list if c.kwargs["address"] == bad]
+    assert len(bad_calls) == 1
+
+
+def test_iter_historical_prices_keeps_windows_in_flight_when_one_fails(mocker):
+    """
+    Test that a failing window does not discard the token's other windows already fetched.
+    """
+    failing_start = datetime(2021, 1, 1) - timedelta(days=1)
+    fail_first = threading.Event()
+
+    def mock_get_token_prices(network, address, start, end):
+        if start <= failing_start <= end:
+            fail_first.set()
+            raise RuntimeError("boom")
+        # Finish only after the failure has been reported
+        fail_first.wait(timeout=5)
+        time.sleep(0.05)
+        return iter([{"value": "1.00", "timestamp": start.isoformat()}])
+
+    mocker.patch("src.data.historical_prices.get_token_prices", side_effect=mock_get_token_prices)
+
+    start_date, end_date = datetime(2020, 1, 1), datetime(2022, 12, 31)
+    batches = list(iter_historical_prices(["0xaaa"], start_date=start_date, end_date=end_date, max_workers=4))
+
+    # Every window was in flight before the failure, and every one is yielded
+    assert len(batches) == len(split_date_range(start_date, end_date))
+    failed = [b for b in batches if b.error is not None]
+    assert len(failed) == 1 and failed[0].prices == []
+    assert batches[0] is failed[0]
+    assert all(len(b.prices) == 1 for b in batches if b.error is None)
+
+
+def test_iter_historical_prices_skips_finished_windows(mocker):
+    """
+    Test that windows listed in skip_windows are not requested again.
+    """
+    token = "0x32eb7902d4134bf98a28b963d26de779af92a212"
+    mock_get_prices = mocker.patch(
+        "src.data.historical_prices.get_token_prices",
+        side_effect=lambda network, address, start, end: iter([{"value": "1.00"}]),
+    )
+
+    start_date = datetime(2020, 1, 1)
+    end_date = datetime(2021, 12, 30)
+    first_end = start_date + timedelta(days=MAX_DAYS_PER_REQUEST - 1)
+    skip = {(token, start_date.date(), first_end.date())}
+
+    batches = list(iter_historical_prices([token], start_date=start_date, end_date=end_date, skip_windows=skip))
+
+    assert mock_get_prices.call_count == 1
+    assert [b.start for b in batches] == [first_end + timedelta(days=1)]
+
+
+def test_iter_historical_prices_starts_token_at_its_start_date(mocker):
+    """
+    Test that per-token start dates (e.g. inception dates) skip the windows before them,
+    staying on the shared window grid.
+    """
+    mock_get_prices = mocker.patch(
+        "src.data.historical_prices.get_token_prices",
+        side_effect=lambda network, address, start, end: iter([]),
+    )
+    inception = datetime(2023, 3, 1)
+
+    list(iter_historical_prices(
+        ["0xnew", "0xold"],
+        start_date=datetime(2015, 7, 30),
+        end_date=datetime(2023, 12, 31),
+        start_dates={"0xnew": inception},
+    ))
+
+    new_calls = [c for c in mock_get_prices.call_args_list if c.kwargs["address"] == "0xnew"]
+    old_calls = [c for c in mock_get_prices.call_args_list if c.kwargs["address"] == "0xold"]
+    grid = split_date_range(datetime(2015, 7, 30), datetime(2023, 12, 31))
+    assert [(c.kwargs["start"], c.kwargs["end"]) for c in new_calls] == [w for w in grid if w[1] >= inception]
+    assert new_calls[0].kwargs["start"] <= inception
+    assert [(c.kwargs["start"], c.kwargs["end"]) for c in old_calls] == grid
@@ -0,0 +1,74 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.data.http_client import HTTPClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        self.server.client_ports.append(self.client_address[1])
+        self.server.encodings.append(self.headers.get("Accept-Encoding"))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.client_ports = []
+    httpd.encodings = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_http_client_reuses_connections(server):
+    client = HTTPClient(pool_maxsize=2)
+    url = f"http://127.0.0.1:{server.server_port}/tokens"
+
+    for _ in range(5):
+        resp = client.get(url)
+        assert resp.json() == {"ok": True}
+    client.close()
+
+    # All requests went over a single keep-alive connection
+    assert len(set(server.client_ports)) == 1
+    assert all("gzip" in e for e in server.encodings)
+
+
+def test_http_client_shares_one_session_per_host():
+    client = HTTPClient()
+
+    a = client.session("https://api.g.alchemy.com/prices/v1/key/tokens/historical")
+    b = client.session("https://api.g.alchemy.com/other")
+    c = client.session("https://api.1inch.dev/swap/v6.1/42161/tokens")
+
+    assert a is b
+    assert a is not c
+
+
+def test_http_client_applies_per_host_timeouts(mocker):
+    client = HTTPClient(timeouts={"api.1inch.dev": 5.0}, default_timeout=42.0)
+    session = client.session("https://api.1inch.dev/")
+    mock_request = mocker.patch.object(session, "request")
+
+    client.get("https://api.1inch.dev/swap/v6.1/42161/tokens")
+    assert mock_request.call_args.kwargs["timeout"] == 5.0
+
+    client.get("https://api.1inch.dev/swap", timeout=1.0)
+    assert mock_request.call_args.kwargs["timeout"] == 1.0
+
+    assert client.timeout("https://api.g.alchemy.com/x") == 42.0
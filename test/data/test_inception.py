@@ -0,0 +1,146 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from src.data.historical_prices import PriceBatch, split_date_range
+from src.data.inception import MAX_FALLBACK_PROBES, find_inception_date, probe_inception, resolve_inception_dates
+
+START = datetime(2015, 7, 30)
+END = datetime(2025, 12, 31)
+
+
+def _fake_api(listing: datetime, delisting: datetime = datetime.max):
+    """get_token_prices stand-in returning daily prices from `listing` until `delisting`."""
+    def get_token_prices(network, address, start, end):
+        day = max(start, listing)
+        while day <= min(end, delisting):
+            yield {"value": "1.0", "timestamp": day.strftime("%Y-%m-%dT00:00:00Z")}
+            day += timedelta(days=1)
+    return get_token_prices
+
+
+@pytest.mark.parametrize("listing", [
+    datetime(2015, 7, 30),
+    datetime(2016, 3, 14),
+    datetime(2021, 11, 2),
+    datetime(2023, 6, 1),
+    datetime(2025, 12, 31),
+])
+def test_find_inception_date_locates_first_priced_day(mocker, listing):
+    mock_get = mocker.patch("src.data.inception.get_token_prices", side_effect=_fake_api(listing))
+
+    result = find_inception_date("0xaaa", start_date=START, end_date=END)
+
+    assert result == listing.date()
+    # One coarse probe plus a binary search over the windows
+    n_windows = len(split_date_range(START, END))
+    assert mock_get.call_count <= 1 + n_windows.bit_length()
+
+
+def test_probe_inception_returns_probed_windows_of_the_fetch_grid(mocker):
+    listing = datetime(2021, 11, 2)
+    mocker.patch("src.data.inception.get_token_prices", side_effect=_fake_api(listing))
+
+    inception, batches = probe_inception("0xaaa", start_date=START, end_date=END)
+
+    assert inception == listing.date()
+    grid = split_date_range(START, END)
+    assert all((b.start, b.end) in grid for b in batches)
+    assert all(b.token_address == "0xaaa" and b.error is None for b in batches)
+    first = min((b for b in batches if b.prices), key=lambda b: b.start)
+    assert first.prices[0]["timestamp"] == "2021-11-02T00:00:00Z"
+
+
+def test_find_inception_date_is_not_fooled_by_a_short_empty_final_window(mocker):
+    # Prices are published daily at midnight; nothing yet for 2027-07-27 00:00-12:00
+    listing, end = datetime(2024, 3, 1), datetime(2027, 7, 27, 12)
+    mocker.patch(
+        "src.data.inception.get_token_prices",
+        side_effect=_fake_api(listing, delisting=datetime(2027, 7, 26)),
+    )
+
+    assert find_inception_date("0xaaa", start_date=START, end_date=end) == listing.date()
+
+
+def test_probe_inception_bounds_the_scan_for_tokens_without_recent_prices(mocker):
+    listing = datetime(2018, 5, 9)
+    mock_get = mocker.patch(
+        "src.data.inception.get_token_prices",
+        side_effect=_fake_api(listing, delisting=datetime(2021, 1, 31)),
+    )
+
+    inception, batches = probe_inception("0xaaa", start_date=START, end_date=END)
+
+    assert inception is None
+    assert mock_get.call_count == MAX_FALLBACK_PROBES
+    assert [b.prices for b in batches] == [[]] * MAX_FALLBACK_PROBES
+
+
+def test_probe_inception_finds_delisted_tokens_below_journalled_empty_windows(mocker):
+    listing = datetime(2018, 5, 9)
+    mock_get = mocker.patch(
+        "src.data.inception.get_token_prices",
+        side_effect=_fake_api(listing, delisting=datetime(2021, 1, 31)),
+    )
+
+    # Each re-probe continues below the windows earlier probes journalled as empty
+    known_empty = set()
+    for _ in range(len(split_date_range(START, END))):
+        inception, batches = probe_inception("0xaaa", start_date=START, end_date=END, known_empty=known_empty)
+        if inception is not None:
+            break
+        known_empty.update((b.token_address, b.start.date(), b.end.date()) for b in batches if not b.prices)
+
+    assert inception == listing.date()
+    requested = {(c.kwargs["start"], c.kwargs["end"]) for c in mock_get.call_args_list}
+    assert len(requested) == mock_get.call_count
+
+
+def test_find_inception_date_returns_none_only_without_any_prices(mocker):
+    mock_get = mocker.patch(
+        "src.data.inception.get_token_prices",
+        side_effect=lambda network, address, start, end: iter([]),
+    )
+
+    assert find_inception_date("0xaaa", start_date=START, end_date=END) is None
+    assert mock_get.call_count == MAX_FALLBACK_PROBES
+
+
+def test_resolve_inception_dates_probes_only_uncached_tokens(mocker):
+    db_service = MagicMock()
+    db_service.get_inception_dates.return_value = {"0xaaa": datetime(2020, 1, 1).date()}
+
+    batch = PriceBatch("0xbbb", START, END, [{"value": "1.0", "timestamp": "2024-02-02T00:00:00Z"}])
+    mock_find = mocker.patch(
+        "src.data.inception.probe_inception",
+        side_effect=lambda token, network, start, end, known_empty: (
+            (None, []) if token == "0xccc" else (datetime(2024, 2, 2).date(), [batch])
+        ),
+    )
+    probed = []
+
+    result = resolve_inception_dates(
+        ["0xaaa", "0xbbb", "0xccc"], db_service, network="arb-mainnet", on_probed=probed.extend,
+    )
+
+    assert result == {
+        "0xaaa": datetime(2020, 1, 1).date(),
+        "0xbbb": datetime(2024, 2, 2).date(),
+        "0xccc": None,
+    }
+    assert sorted(c.args[0] for c in mock_find.call_args_list) == ["0xbbb", "0xccc"]
+    db_service.store_inception_dates.assert_called_once_with(
+        "arb-mainnet", {"0xbbb": datetime(2024, 2, 2).date(), "0xccc": None}
+    )
+    assert probed == [batch]
+
+
+def test_resolve_inception_dates_reprobes_unpriced_tokens(mocker):
+    db_service = MagicMock()
+    db_service.get_inception_dates.return_value = {"0xaaa": datetime(2020, 1, 1).date(), "0xccc": None}
+    mock_find = mocker.patch("src.data.inception.probe_inception", return_value=(datetime(2024, 2, 2).date(), []))
+
+    result = resolve_inception_dates(["0xaaa", "0xccc"], db_service, reprobe_unpriced=True)
+
+    assert result == {"0xaaa": datetime(2020, 1, 1).date(), "0xccc": datetime(2024, 2, 2).date()}
+    assert [c.args[0] for c in mock_find.call_args_list] == ["0xccc"]
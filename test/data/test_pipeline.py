@@ -0,0 +1,283 @@
+import threading
+import time
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from src.data.db import UpsertCounts
+from src.data.historical_prices import PriceBatch
+from src.data.pipeline import run_price_pipeline, stream_prices_to_db
+
+
+def _batch(token, n, error=None):
+    prices = [{"value": str(i), "timestamp": f"2024-01-{i + 1:02d}T00:00:00Z"} for i in range(n)]
+    return PriceBatch(token, datetime(2024, 1, 1), datetime(2024, 12, 30), [] if error else prices, error)
+
+
+def _recording_db_service():
+    """MagicMock DBService recording copies of every bulk write as (token, n_rows, schema)."""
+    db_service = MagicMock()
+    db_service.writes = []
+
+    def store_prices_bulk(prices_by_token, schema):
+        db_service.writes.append([(t, len(p), schema) for t, p in prices_by_token.items()])
+        return UpsertCounts(sum(len(p) for p in prices_by_token.values()), 0, 0)
+
+    db_service.store_prices_bulk.side_effect = store_prices_bulk
+    return db_service
+
+
+def test_stream_prices_to_db_flushes_in_batches():
+    db_service = _recording_db_service()
+    batches = [_batch("0xaaa", 3), _batch("0xbbb", 3), _batch("0xaaa", 2), _batch("0xccc", 1)]
+
+    total = stream_prices_to_db(iter(batches), db_service, schema="live", batch_size=5)
+
+    assert total == 9
+    # First flush after 6 buffered rows, second flush holds the rest
+    assert db_service.writes == [
+        [("0xaaa", 3, "live"), ("0xbbb", 3, "live")],
+        [("0xaaa", 2, "live"), ("0xccc", 1, "live")],
+    ]
+    db_service.store_prices.assert_not_called()
+
+
+def test_stream_prices_to_db_skips_failed_and_empty_batches():
+    db_service = _recording_db_service()
+    batches = [_batch("0xaaa", 0), _batch("0xbbb", 0, error=RuntimeError("boom")), _batch("0xccc", 2)]
+
+    total = stream_prices_to_db(iter(batches), db_service)
+
+    assert total == 2
+    assert db_service.writes == [[("0xccc", 2, "backtest")]]
+
+
+def test_stream_prices_to_db_journals_windows_per_schema():
+    db_service = _recording_db_service()
+
+    stream_prices_to_db(iter([_batch("0xaaa", 2)]), db_service, schema="live", journal_network="arb-mainnet")
+
+    network, entries = db_service.record_fetch_windows.call_args.args
+    assert (network, entries[0][0], entries[0][3]) == ("arb-mainnet", "0xaaa", "completed")
+    assert db_service.record_fetch_windows.call_args.kwargs == {"schema": "live"}
+
+
+def test_stream_prices_to_db_applies_backpressure():
+    """The producer must never run more than queue_size batches ahead of the writer."""
+    produced = 0
+    max_lead = 0
+    written = 0
+    lock = threading.Lock()
+
+    def producer():
+        nonlocal produced
+        for _ in range(50):
+            with lock:
+                produced += 1
+            yield _batch("0xaaa", 1)
+
+    def store_prices_bulk(prices_by_token, schema):
+        nonlocal written, max_lead
+        with lock:
+            written += sum(len(p) for p in prices_by_token.values())
+            max_lead = max(max_lead, produced - written)
+        return UpsertCounts(1, 0, 0)
+
+    db_service = MagicMock()
+    db_service.store_prices_bulk.side_effect = store_prices_bulk
+
+    total = stream_prices_to_db(producer(), db_service, batch_size=1, queue_size=4)
+
+    assert total == 50
+    # queue_size queued + one being put + one being written
+    assert max_lead <= 4 + 2
+
+
+def test_stream_prices_to_db_propagates_producer_errors():
+    def producer():
+        yield _batch("0xaaa", 1)
+        raise RuntimeError("fetch crashed")
+
+    with pytest.raises(RuntimeError, match="fetch crashed"):
+        stream_prices_to_db(producer(), MagicMock())
+
+
+def test_stream_prices_to_db_stops_fetching_when_the_writer_fails():
+    """A failed write stops the producer between windows before the call returns."""
+    produced = 0
+    closed = threading.Event()
+
+    def producer():
+        nonlocal produced
+        try:
+            while True:
+                produced += 1
+                yield _batch("0xaaa", 1)
+        finally:
+            closed.set()
+
+    db_service = MagicMock()
+    db_service.store_prices_bulk.side_effect = RuntimeError("db down")
+
+    with pytest.raises(RuntimeError, match="db down"):
+        stream_prices_to_db(producer(), db_service, batch_size=1, queue_size=4)
+
+    assert closed.is_set()
+    stopped_at = produced
+    time.sleep(0.1)
+    assert produced == stopped_at
+    # queue_size queued + one being put + one being written
+    assert stopped_at <= 4 + 2
+
+
+def test_run_price_pipeline_streams_fetched_windows(mocker):
+    mocker.patch("src.data.pipeline.resolve_inception_dates", return_value={})
+    mock_iter = mocker.patch(
+        "src.data.pipeline.iter_historical_prices",
+        return_value=iter([_batch("0xaaa", 2), _batch("0xbbb", 1)]),
+    )
+    db_service = _recording_db_service()
+    db_service.get_finished_fetch_windows.return_value = set()
+
+    total = run_price_pipeline(["0xaaa", "0xbbb"], db_service, max_workers=3, batch_size=10)
+
+    assert total == 3
+    assert mock_iter.call_args.kwargs["max_workers"] == 3
+    db_service.ensure_price_schema.assert_called_once_with("backtest")
+    db_service.store_prices_bulk.assert_called_once()
+
+
+def test_run_price_pipeline_resumes_from_fetch_journal(mocker):
+    mocker.patch("src.data.pipeline.resolve_inception_dates", return_value={})
+    finished = {("0xaaa", datetime(2024, 1, 1).date(), datetime(2024, 12, 30).date())}
+    mock_iter = mocker.patch(
+        "src.data.pipeline.iter_historical_prices",
+        return_value=iter([
+            _batch("0xbbb", 2),
+            _batch("0xccc", 0),
+            _batch("0xddd", 0, error=RuntimeError("boom")),
+        ]),
+    )
+    db_service = _recording_db_service()
+    db_service.get_finished_fetch_windows.return_value = finished
+
+    run_price_pipeline(["0xaaa", "0xbbb", "0xccc", "0xddd"], db_service, network="arb-mainnet")
+
+    db_service.get_finished_fetch_windows.assert_called_once_with("arb-mainnet", "backtest")
+    assert mock_iter.call_args.kwargs["skip_windows"] == finished
+
+    network, entries = db_service.record_fetch_windows.call_args.args
+    assert network == "arb-mainnet"
+    assert db_service.record_fetch_windows.call_args.kwargs == {"schema": "backtest"}
+    assert [(e[0], e[3], e[4]) for e in entries] == [
+        ("0xbbb", "completed", 2),
+        ("0xccc", "empty", 0),
+        ("0xddd", "failed", 0),
+    ]
+    assert entries[2][5] == "boom"
+
+
+def test_run_price_pipeline_without_resume_skips_journal(mocker):
+    mock_iter = mocker.patch(
+        "src.data.pipeline.iter_historical_prices",
+        return_value=iter([_batch("0xaaa", 1)]),
+    )
+    db_service = _recording_db_service()
+
+    run_price_pipeline(["0xaaa"], db_service, resume=False, discover_inception=False)
+
+    assert mock_iter.call_args.kwargs["skip_windows"] is None
+    db_service.get_finished_fetch_windows.assert_not_called()
+    db_service.record_fetch_windows.assert_not_called()
+
+
+def test_run_price_pipeline_starts_tokens_at_inception(mocker):
+    mocker.patch(
+        "src.data.pipeline.resolve_inception_dates",
+        return_value={"0xaaa": datetime(2023, 5, 1).date(), "0xdead": None},
+    )
+    mock_iter = mocker.patch("src.data.pipeline.iter_historical_prices", return_value=iter([]))
+
+    run_price_pipeline(["0xaaa", "0xbbb", "0xdead"], MagicMock(), resume=False)
+
+    assert mock_iter.call_args.args[0] == ["0xaaa", "0xbbb"]
+    assert mock_iter.call_args.kwargs["start_dates"] == {"0xaaa": datetime(2023, 5, 1)}
+
+
+def test_run_price_pipeline_stores_probed_windows_instead_of_refetching(mocker):
+    probe_batches = [_batch("0xaaa", 3), PriceBatch("0xaaa", datetime(2023, 1, 1), datetime(2023, 12, 31), [])]
+
+    def resolve(tokens, db_service, **kwargs):
+        kwargs["on_probed"](probe_batches)
+        return {"0xaaa": datetime(2024, 1, 1).date()}
+
+    mocker.patch("src.data.pipeline.resolve_inception_dates", side_effect=resolve)
+    mock_iter = mocker.patch("src.data.pipeline.iter_historical_prices", return_value=iter([]))
+    db_service = _recording_db_service()
+    db_service.get_dead_tokens.return_value = set()
+    db_service.get_finished_fetch_windows.return_value = set()
+
+    run_price_pipeline(["0xaaa"], db_service, network="arb-mainnet")
+
+    assert db_service.writes == [[("0xaaa", 3, "backtest")]]
+    _, entries = db_service.record_fetch_windows.call_args.args
+    assert [(e[0], e[3]) for e in entries] == [("0xaaa", "completed"), ("0xaaa", "empty")]
+    assert mock_iter.call_args.kwargs["skip_windows"] == {
+        ("0xaaa", b.start.date(), b.end.date()) for b in probe_batches
+    }
+    db_service.clear_dead_tokens.assert_called_once_with("arb-mainnet", ["0xaaa"])
+
+
+def test_stream_prices_to_db_updates_dead_tokens():
+    db_service = _recording_db_service()
+    batches = [
+        _batch("0xaaa", 0),
+        _batch("0xbbb", 0, error=RuntimeError("boom")),
+        _batch("0xccc", 0),
+        _batch("0xccc", 2),
+        _batch("0xlive", 0),
+    ]
+
+    stream_prices_to_db(iter(batches), db_service, dead_token_network="arb-mainnet", live_tokens=["0xlive"])
+
+    db_service.mark_dead_tokens.assert_called_once_with(
+        "arb-mainnet", {"0xaaa": ("empty", None), "0xbbb": ("failed", "boom")}
+    )
+    db_service.clear_dead_tokens.assert_called_once_with("arb-mainnet", ["0xccc"])
+
+
+def test_run_price_pipeline_skips_dead_tokens(mocker):
+    mock_resolve = mocker.patch(
+        "src.data.pipeline.resolve_inception_dates",
+        return_value={"0xaaa": datetime(2023, 5, 1).date(), "0xnone": None},
+    )
+    mock_iter = mocker.patch("src.data.pipeline.iter_historical_prices", return_value=iter([]))
+    db_service = _recording_db_service()
+    db_service.get_dead_tokens.return_value = {"0xdead"}
+
+    run_price_pipeline(["0xaaa", "0xdead", "0xnone"], db_service, network="arb-mainnet", resume=False)
+
+    assert mock_resolve.call_args.args[0] == ["0xaaa", "0xnone"]
+    assert mock_resolve.call_args.kwargs["reprobe_unpriced"] is True
+    assert mock_iter.call_args.args[0] == ["0xaaa"]
+    db_service.mark_dead_tokens.assert_called_once_with("arb-mainnet", {"0xnone": ("empty", None)})
+
+
+def test_run_price_pipeline_keeps_resumed_tokens_with_prices_alive(mocker):
+    # Earlier windows were completed (and skipped via the journal); only the newest is fetched, empty
+    finished = {("0xaaa", datetime(2023, 1, 1).date(), datetime(2023, 12, 31).date())}
+    mocker.patch(
+        "src.data.pipeline.iter_historical_prices",
+        return_value=iter([_batch("0xaaa", 0), _batch("0xbbb", 0), _batch("0xccc", 0)]),
+    )
+    db_service = _recording_db_service()
+    db_service.get_dead_tokens.return_value = set()
+    db_service.get_finished_fetch_windows.return_value = finished
+    db_service.get_completed_fetch_tokens.return_value = {"0xaaa"}
+    db_service.get_prices_distinct_tokens.return_value = ["0xbbb", "0xother"]
+
+    run_price_pipeline(["0xaaa", "0xbbb", "0xccc"], db_service, network="arb-mainnet", discover_inception=False)
+
+    db_service.get_completed_fetch_tokens.assert_called_once_with("arb-mainnet", "backtest")
+    db_service.get_prices_distinct_tokens.assert_called_once_with("backtest")
+    db_service.mark_dead_tokens.assert_called_once_with("arb-mainnet", {"0xccc": ("empty", None)})
@@ -0,0 +1,166 @@
+import threading
+import pytest
+
+from src.data.rate_limiter import (
+    AdaptiveRateLimiter,
+    TokenBucketRateLimiter,
+    backoff_delay,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+def test_token_bucket_allows_burst_then_spaces_requests():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(requests_per_hour=3600, burst=3, clock=clock, sleep=clock.sleep)
+
+    # Burst of 3 goes through immediately
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    # Following reservations queue up one second apart (1 request/second)
+    assert limiter.acquire() == pytest.approx(1.0)
+    assert limiter.acquire() == pytest.approx(2.0)
+    assert clock.sleeps == [pytest.approx(1.0), pytest.approx(2.0)]
+
+
+def test_token_bucket_refills_over_time_up_to_burst():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(requests_per_hour=360, burst=2, clock=clock, sleep=clock.sleep)
+
+    limiter.acquire()
+    limiter.acquire()
+
+    # 10 seconds per slot; after an hour the bucket is full again but capped at burst
+    clock.now = 3600.0
+    assert limiter.acquire() == 0.0
+    assert limiter.acquire() == 0.0
+    assert limiter.acquire() == pytest.approx(10.0)
+
+
+def test_token_bucket_is_thread_safe():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(requests_per_hour=3600, burst=1, clock=clock, sleep=clock.sleep)
+
+    waits = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            w = limiter.reserve()
+            with lock:
+                waits.append(w)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Every reservation gets a distinct slot: 0, 1, 2, ... seconds
+    assert sorted(round(w) for w in waits) == list(range(400))
+
+
+@pytest.mark.parametrize("rph, burst", [(0, 1), (-5, 1), (100, 0)])
+def test_token_bucket_rejects_invalid_configuration(rph, burst):
+    with pytest.raises(ValueError):
+        TokenBucketRateLimiter(requests_per_hour=rph, burst=burst)
+
+
+def test_token_bucket_pause_holds_back_requests():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(requests_per_hour=3600, burst=5, clock=clock, sleep=clock.sleep)
+
+    limiter.record_throttle(30)
+
+    assert limiter.acquire() == pytest.approx(30.0)
+
+
+def test_token_bucket_pause_reaches_workers_already_waiting():
+    clock = FakeClock()
+    throttles = [30.0]
+
+    def sleep(seconds):
+        clock.sleeps.append(seconds)
+        if throttles:
+            # Another worker gets a 429 halfway through this worker's sleep
+            clock.now += seconds / 2
+            limiter.record_throttle(throttles.pop())
+            clock.now += seconds / 2
+        else:
+            clock.now += seconds
+
+    limiter = TokenBucketRateLimiter(requests_per_hour=3600, burst=3, clock=clock, sleep=sleep)
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    # The slot at t=1 falls inside the pause (t=0.5 to 30.5): wait again until it ends
+    assert limiter.acquire() == pytest.approx(30.5)
+    assert clock.sleeps == [pytest.approx(1.0), pytest.approx(29.5)]
+
+    # Requests then resume one per second instead of in a burst
+    assert [limiter.acquire() for _ in range(3)] == [pytest.approx(1.0)] * 3
+    assert clock.now == pytest.approx(33.5)
+
+
+def test_adaptive_limiter_decreases_on_throttle_and_ramps_back():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(
+        requests_per_hour=200,
+        max_requests_per_hour=300,
+        increase_step=10,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    # Additive increase up to the configured ceiling
+    for _ in range(20):
+        limiter.record_success({})
+    assert limiter.requests_per_hour == 300
+
+    # Multiplicative decrease, and the throttled rate becomes the observed ceiling
+    limiter.record_throttle(5)
+    assert limiter.requests_per_hour == 150
+    assert limiter.observed_ceiling == 300
+
+    # A second 429 during the pause (another worker) does not halve again
+    limiter.record_throttle(5)
+    assert limiter.requests_per_hour == 150
+
+    clock.now = 10.0
+    for _ in range(15):
+        limiter.record_success({})
+    assert limiter.requests_per_hour == 300
+
+
+def test_adaptive_limiter_spreads_remaining_quota_until_reset():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(requests_per_hour=300, clock=clock, sleep=clock.sleep)
+
+    limiter.record_success({"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "360"})
+    assert limiter.requests_per_hour == pytest.approx(100)
+
+    limiter.record_success({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "120"})
+    assert limiter.reserve() >= 120
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after({"Retry-After": "7"}) == 7.0
+    assert parse_retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, now=1445412470.0) == 10.0
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    assert parse_retry_after({}) is None
+
+
+def test_backoff_delay_is_jittered_exponential_and_capped():
+    assert backoff_delay(0, 5, 300, rng=lambda: 0.0) == 2.5
+    assert backoff_delay(3, 5, 300, rng=lambda: 1.0) == 40.0
+    assert backoff_delay(10, 5, 300, rng=lambda: 1.0) == 300.0
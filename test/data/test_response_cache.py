@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+
+from src.data.fetcher import get_token_prices
+from src.data.response_cache import CacheMissError, ResponseCache
+
+# 2024-03-01T00:00:00Z
+NOW = 1709251200.0
+
+CLOSED = {"network": "arb-mainnet", "address": "0xaaa", "startTime": "2024-01-01T00:00:00Z",
+          "endTime": "2024-01-31T00:00:00Z", "interval": "1d", "withMarketData": True}
+OPEN = dict(CLOSED, startTime="2024-02-01T00:00:00Z", endTime="2024-03-01T00:00:00Z")
+RESPONSE = {"data": {"prices": [{"value": "1.00", "timestamp": "2024-01-01T00:00:00Z"}]}}
+EMPTY = {"data": {"prices": []}}
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_key_ignores_payload_key_order():
+    reordered = dict(reversed(list(CLOSED.items())))
+    assert ResponseCache.key(reordered) == ResponseCache.key(CLOSED)
+    assert ResponseCache.key(OPEN) != ResponseCache.key(CLOSED)
+
+
+def test_cache_round_trip(tmp_path):
+    cache = ResponseCache(tmp_path, clock=_Clock(NOW))
+
+    assert cache.get(CLOSED) is None
+    cache.put(CLOSED, RESPONSE)
+
+    assert cache.get(CLOSED) == RESPONSE
+    key = ResponseCache.key(CLOSED)
+    assert (tmp_path / key[:2] / f"{key}.json.gz").exists()
+
+
+def test_cache_expires_only_open_windows(tmp_path):
+    clock = _Clock(NOW)
+    cache = ResponseCache(tmp_path, open_window_ttl=60, clock=clock)
+    cache.put(CLOSED, RESPONSE)
+    cache.put(OPEN, RESPONSE)
+
+    clock.now += 3600
+
+    assert cache.get(CLOSED) == RESPONSE
+    assert cache.get(OPEN) is None
+
+
+def test_cache_expires_empty_responses(tmp_path):
+    clock = _Clock(NOW)
+    cache = ResponseCache(tmp_path, open_window_ttl=60, clock=clock)
+    cache.put(CLOSED, EMPTY)
+
+    assert cache.get(CLOSED) == EMPTY
+    clock.now += 3600
+    assert cache.get(CLOSED) is None
+
+
+def test_cache_treats_windows_as_final_only_after_the_settle_period(tmp_path):
+    # The window's last day ended 1 day before NOW, within the 7-day settle period
+    recent = dict(CLOSED, endTime="2024-02-28T00:00:00Z")
+    clock = _Clock(NOW)
+    cache = ResponseCache(tmp_path, open_window_ttl=60, settle_period=7 * 86400, clock=clock)
+    cache.put(recent, RESPONSE)
+
+    # Stored before the window settled: expires like an open window, even once settled
+    clock.now += 30 * 86400
+    assert cache.get(recent) is None
+
+    cache.put(recent, RESPONSE)
+    clock.now += 365 * 86400
+    assert cache.get(recent) == RESPONSE
+
+
+def test_offline_cache_replays_stale_entries_and_raises_on_miss(tmp_path):
+    clock = _Clock(NOW)
+    ResponseCache(tmp_path, clock=clock).put(OPEN, RESPONSE)
+    clock.now += 10 * 86400
+
+    offline = ResponseCache(tmp_path, offline=True, clock=clock)
+
+    assert offline.get(OPEN) == RESPONSE
+    with pytest.raises(CacheMissError):
+        offline.get(CLOSED)
+
+
+def test_get_token_prices_serves_from_cache(tmp_path, mocker, fake_clock_limiter):
+    fake_response = mocker.Mock()
+    fake_response.status_code = 200
+    fake_response.json.return_value = RESPONSE
+    mock_post = mocker.patch("src.data.fetcher.http_client.post", return_value=fake_response)
+    cache = ResponseCache(tmp_path)
+    limiter, sleeps = fake_clock_limiter
+
+    for _ in range(2):
+        prices = list(get_token_prices(
+            "arb-mainnet", "0xaaa", datetime(2024, 1, 1), datetime(2024, 1, 31), cache=cache, rate_limiter=limiter,
+        ))
+        assert prices == RESPONSE["data"]["prices"]
+
+    mock_post.assert_called_once()
+    assert sleeps == []
+
+
+def test_get_token_prices_offline_never_hits_network(tmp_path, mocker):
+    mock_post = mocker.patch("src.data.fetcher.http_client.post")
+    cache = ResponseCache(tmp_path, offline=True)
+
+    with pytest.raises(CacheMissError):
+        list(get_token_prices("arb-mainnet", "0xaaa", datetime(2024, 1, 1), datetime(2024, 1, 31), cache=cache))
+
+    mock_post.assert_not_called()